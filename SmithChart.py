@@ -1,9 +1,41 @@
-import matplotlib
-matplotlib.use('Qt5Agg')  # Use Qt5Agg to match Spyder's default backend
-import matplotlib.pyplot as plt
+import time
+startup_clock = time.perf_counter()
+import json
+import os
+import threading
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
+from smith_engine import (COMPONENT_TYPES, LINE_TYPES, SPEED_OF_LIGHT, component_unit, electrical_length,
+                          impedance_to_gamma, gamma_to_impedance, return_loss_db)
+from network import Element, Network
+import instrumentation
+# matplotlib is imported by draw_smith_chart once the controls are up, and the Touchstone
+# reader and matching synthesizer only when their buttons are first used
+
+# Startup timing report (phase name -> seconds), printed on first paint and written to
+# the JSON file named by SMITHCHART_TIMING if that is set
+startup_timing = {}
+
+def mark_startup(phase):
+    global startup_clock
+    now = time.perf_counter()
+    startup_timing[phase] = now - startup_clock
+    startup_clock = now
+
+def report_startup():
+    total = sum(startup_timing.values())
+    print("Startup: " + ", ".join(f"{phase} {seconds:.3f} s" for phase, seconds in startup_timing.items())
+          + f", total {total:.3f} s")
+    timing_path = os.environ.get('SMITHCHART_TIMING')
+    if timing_path:
+        with open(timing_path, 'w') as f:
+            json.dump(dict(startup_timing, total=total), f, indent=2)
+
+mark_startup('imports')
+
+# Opt-in hot path instrumentation (SMITHCHART_PROFILE), set up before any Tk callback is registered
+instrumentation.enable_from_environment()
 
 # Global variables
 Z0 = 50  # Characteristic impedance (50 Ω)
@@ -11,252 +43,490 @@ gamma_value = 0.50  # Initial reflection coefficient magnitude
 show_circle = False
 db_value = -6.0  # Initial dB value corresponding to gamma_value
 load_impedance = None  # Initial load impedance (R + jX)
-current_impedance = None  # Current impedance after matching
-impedance_points = []  # List to store impedance points for plotting trajectory
+network = Network()  # Load and matching elements; caches the impedance after every element
+selected_element = 0  # Element edited, inserted before or deleted by the network controls
+edit_live = False  # Component controls edit the selected element instead of configuring a new one
+tolerance_result = None  # Last Monte Carlo run (tolerance.ToleranceResult)
+tolerance_key = None  # (Z0, trajectory points) the run was made for, the cloud hides once they change
+show_cloud = True  # Draw the Monte Carlo density cloud
+analysis_band_points = 101  # Frequency points of the Monte Carlo and optimizer band
 frequency = 1e9  # Initial frequency for reactance calculations (1 GHz)
 gamma_patch = None  # Initialize gamma_patch at the module level
-smith_chart_patches = []  # Store original Smith Chart patches
-smith_chart_lines = []  # Store original Smith Chart lines
+smith_chart_artists = []  # Artists of the static Smith Chart grid
+grid_density = 'Standard'  # Key of smith_geometry.GRID_DENSITIES
+show_admittance = False  # Overlay the admittance (conductance/susceptance) chart
+show_sweep = False  # Draw the whole network across a frequency sweep
+sweep_start = 100e6  # Sweep start frequency (100 MHz)
+sweep_stop = 10e9  # Sweep stop frequency (10 GHz)
+sweep_points = 10001  # Number of frequency points in the sweep
+show_tdr = False  # Time-domain reflectometry of the network across the sweep band, in its own window
+tdr_mode = 'Low-pass Step'  # Key of TDR_MODES
+tdr_window = 'Kaiser'  # Window of the TDR transform ('Kaiser', 'Hann' or 'None')
+max_trajectory_labels = 12  # Label the load and only the latest points of long trajectories
+snap_pixels = 8  # Hover and click snap to data points within this many pixels
+l_match_index = 0  # Which closed-form L-section solution Auto L-Match applies next
+measured_frequencies = None  # Frequencies (Hz) of a load read from a Touchstone file
+measured_load = None  # Load impedance at each measured frequency
+twoport_data = None  # Transistor S-parameters (and noise parameters) read from a .s2p file
+twoport_circles = []  # (kind, frequencies, centers (n, m), radii (n, m)) at every frequency of twoport_data
+show_stability = True  # Draw source and load stability circles
+show_gain = True  # Draw constant available gain circles
+show_noise = True  # Draw constant noise figure circles
+circles_all = False  # Circles at every frequency instead of the one nearest the frequency slider
+matching_target = None  # Impedance picked (as Γ_S/Γ_L) as the Auto L-Match target instead of Z0
+target_pick = None  # 'Γ_S' or 'Γ_L' while the next chart click picks the target
+population_loads = None  # Loads of a population of units to match with one network, (P,) or (P, F)
+population_frequencies = None  # Band of a (P, F) population, None for loads that do not depend on frequency
+max_population_points = 20000  # Population clouds are drawn strided down to this many markers each
+population_version = 0  # Bumped whenever the population changes, part of the key of the cached evaluation
+population_job = None  # Robust optimization running in a background thread
 
 def update_circle():
     global gamma_patch, show_circle, gamma_value
     if gamma_patch is not None:  # Check if gamma_patch has been initialized
         gamma_patch.set_radius(gamma_value)
         gamma_patch.set_visible(show_circle)
-        plt.gcf().canvas.draw()
-
-def impedance_to_gamma(Z):
-    """Convert impedance to reflection coefficient."""
-    z_normalized = Z / Z0
-    gamma = (z_normalized - 1) / (z_normalized + 1)
-    return gamma
-
-def gamma_to_impedance(gamma):
-    """Convert reflection coefficient to impedance."""
-    z_normalized = (1 + gamma) / (1 - gamma)
-    return z_normalized * Z0
-
-def add_series_component(Z, reactance):
-    """Add a series component (inductor or capacitor) with given reactance."""
-    return Z + 1j * reactance
-
-def add_shunt_component(Z, reactance):
-    """Add a shunt component (inductor or capacitor) with given reactance."""
-    Y = 1 / Z  # Current admittance
-    Y_component = -1j / reactance if reactance != 0 else 0  # Admittance of shunt component (Y = -j / X)
-    Y_new = Y + Y_component
-    return 1 / Y_new if Y_new != 0 else Z
+        draw_smith_chart.blit_overlay()  # Only the overlay changes, the cached chart is reused
 
 def draw_smith_chart():
-    global gamma_patch, smith_chart_patches, smith_chart_lines
+    global gamma_patch, smith_chart_artists
     print("Starting draw_smith_chart...")  # Debug print
+    mark_startup('controls')
+    import matplotlib
+    if not os.environ.get('MPLBACKEND'):  # benchmarks.py runs the chart headless with MPLBACKEND=Agg
+        matplotlib.use('Qt5Agg')  # Use Qt5Agg to match Spyder's default backend
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgba
+    from smith_geometry import GRID_DENSITIES, chart_geometry, grid_values
+    from smith_plot import DecimatedLine, density_image, draw_chart_grid, format_impedance, label_position
+    from spatial_index import GridIndex
+    mark_startup('matplotlib import')
+
+    # Grid curves and labels, loaded from the on-disk cache after the first run
+    geometry, cached = chart_geometry(*grid_values(GRID_DENSITIES[grid_density]), z0=Z0)
+    mark_startup('geometry (cached)' if cached else 'geometry (computed)')
+
     # Create figure and axes
     fig = plt.figure(figsize=(12, 10))
+    instrumentation.instrument_canvas(fig.canvas)  # Times every draw and blit while profiling
     ax = fig.add_axes([0.15, 0.05, 0.80, 0.90])
-    ax.set_aspect('equal')
-    ax.set_xlim(-1.2, 1.2)
-    ax.set_ylim(-1.2, 1.2)
-    ax.axis('off')
-
-    # Draw the outer boundary
-    outer_circle = plt.Circle((0, 0), 1, fill=False, color='black', linewidth=1.5)
-    ax.add_patch(outer_circle)
-    smith_chart_patches = [outer_circle]
-
-    # Constant resistance circles
-    resistance_values = [0, 0.5, 1, 2, 5]
-    r_colors = ['blue', 'green', 'red', 'purple', 'orange']
-    for r, color in zip(resistance_values, r_colors):
-        if r == 0:
-            line, = ax.plot(-1, 0, 'o', color=color, markersize=5)
-            smith_chart_lines.append(line)
-        else:
-            center_x = r / (1 + r)
-            radius = 1 / (1 + r)
-            circle = plt.Circle((center_x, 0), radius, fill=False, color=color, linewidth=1)
-            ax.add_patch(circle)
-            smith_chart_patches.append(circle)
-
-    # Constant reactance arcs
-    reactance_values = [0, 0.5, 1, 2]
-    x_colors = ['gray', 'cyan', 'magenta', 'brown']
-    for i, (x, color) in enumerate(zip(reactance_values, x_colors)):
-        if x == 0:
-            line, = ax.plot([-1, 1], [0, 0], color=color, linewidth=1, linestyle='--')
-            smith_chart_lines.append(line)
-        else:
-            center_x = 1
-            center_y = 1 / x
-            radius = 1 / x
-            theta_max = 2 * np.arctan(1 / x)
-            theta = np.linspace(0, theta_max, 100)
-            x_upper = center_x - radius * np.cos(theta)
-            y_upper = center_y - radius * np.sin(theta)
-            x_lower = x_upper
-            y_lower = -y_upper
-            mask_upper = (x_upper**2 + y_upper**2) <= 1.01
-            mask_lower = (x_lower**2 + y_lower**2) <= 1.01
-            line_upper, = ax.plot(x_upper[mask_upper], y_upper[mask_upper], color=color, linewidth=1, linestyle='--')
-            line_lower, = ax.plot(x_lower[mask_lower], y_lower[mask_lower], color=color, linewidth=1, linestyle='--')
-            smith_chart_lines.extend([line_upper, line_lower])
-
-    # Labels
-    labels = [
-        ('0 Ω', -1.05, 0.0, 'blue', 9, 'right', 'center', 0),
-        ('25 Ω', -0.20, 0.05, 'green', 9, 'right', 'center', 0),
-        ('50 Ω', 0.15, 0.05, 'red', 9, 'right', 'center', 0),
-        ('100 Ω', 0.50, 0.05, 'purple', 9, 'right', 'center', 0),
-        ('250 Ω', 0.90, 0.10, 'orange', 9, 'right', 'center', 0),
-        ('j0 Ω', -0.75, 0.025, 'gray', 9, 'left', 'bottom', 0),
-        ('j25 Ω', -0.52, 0.65, 'cyan', 9, 'center', 'center', -45),
-        ('-j25 Ω', -0.52, -0.65, 'cyan', 9, 'center', 'center', 45),
-        ('j50 Ω', -0.01, 0.75, 'magenta', 9, 'center', 'center', -70),
-        ('-j50 Ω', -0.01, -0.75, 'magenta', 9, 'center', 'center', 70),
-        ('j100 Ω', 0.45, 0.402, 'brown', 9, 'center', 'center', -85),
-        ('-j100 Ω', 0.45, -0.402, 'brown', 9, 'center', 'center', 85),
-    ]
-    for text, x, y, color, fontsize, ha, va, rotation in labels:
-        ax.text(x, y, text, color=color, fontsize=fontsize, ha=ha, va=va, 
-                rotation=rotation, rotation_mode='anchor')
+    smith_chart_artists = draw_chart_grid(ax, Z0, geometry, show_admittance)
 
     # Dynamic impedance display for mouse movement
-    coord_text = ax.text(0.05, 0.95, '', transform=ax.transAxes, fontsize=10, 
+    coord_text = ax.text(0.05, 0.95, '', transform=ax.transAxes, fontsize=10, animated=True,
                          bbox=dict(facecolor='white', alpha=0.8, edgecolor='black'))
 
+    # Hover and click snap to the nearest trajectory, sweep or measured point within snap_pixels.
+    # Each dataset has a grid index over its full-resolution Γ values, rebuilt lazily when it changes
+    snap_data = {name: [GridIndex(), None, None] for name in ('Trajectory', 'Sweep', 'Measured')}  # index, Hz, Z
+    snap_keys = {}
+
+    def set_snap_data(name, gamma, frequencies, impedances):
+        # The network and the measured load hand back the same array object while their data is unchanged
+        if snap_keys.get(name) != (id(impedances), Z0):
+            snap_keys[name] = (id(impedances), Z0)
+            snap_data[name][0].set_points(gamma)
+            snap_data[name][1:] = [frequencies, impedances]
+
+    def snap_point(gamma_x, gamma_y):
+        # Nearest data point as (readout text, Γ), or None when nothing is within snap_pixels
+        radius = snap_pixels * (ax.get_xlim()[1] - ax.get_xlim()[0]) / ax.bbox.width
+        best = None
+        for name, (index, frequencies, impedances) in snap_data.items():
+            if (name == 'Sweep' and not sweep_line.get_visible()) or (name == 'Measured' and not measured_line.get_visible()):
+                continue
+            k, distance = index.nearest(complex(gamma_x, gamma_y), radius)
+            if k is not None:
+                best, radius = (name, k, frequencies, impedances, index.points[k]), distance
+        if best is None:
+            return None
+        name, k, frequencies, impedances, gamma = best
+        point_name = f'Z{k}' if name == 'Trajectory' else 'Z'
+        return (f'{format_impedance(impedances[k], point_name)}\n'
+                f'Γ = {abs(gamma):.3f} ∠ {np.degrees(np.angle(gamma)):.1f}°, RL {return_loss_db(gamma):.1f} dB\n'
+                f'{name} @ {frequencies[k] / 1e6:.1f} MHz'), gamma
+
     def update_coords(event):
         if event.inaxes == ax:
             gamma_x = event.xdata
             gamma_y = event.ydata
-            if gamma_x**2 + gamma_y**2 <= 1:
-                gamma = complex(gamma_x, gamma_y)
-                z_normalized = (1 + gamma) / (1 - gamma)
-                Z = z_normalized * Z0
-                R = Z.real
-                X = Z.imag
-                if abs(X) < 0.1:
-                    coord_str = f'Z = {R:.1f} Ω'
-                else:
-                    sign = '+' if X >= 0 else '-'
-                    coord_str = f'Z = {R:.1f} {sign} j{abs(X):.1f} Ω'
-                coord_text.set_text(coord_str)
+            snapped = snap_point(gamma_x, gamma_y)
+            if snapped is not None:
+                coord_str = snapped[0]
+            elif gamma_x**2 + gamma_y**2 <= 1:
+                coord_str = format_impedance(gamma_to_impedance(complex(gamma_x, gamma_y), Z0))
             else:
-                coord_text.set_text('Outside Smith Chart')
+                coord_str = 'Outside Smith Chart'
         else:
-            coord_text.set_text('')
-        fig.canvas.draw_idle()
+            coord_str = ''
+        if coord_str != coord_text.get_text():  # Nothing to redraw if the readout did not change
+            coord_text.set_text(coord_str)
+            blit_overlay()
 
     fig.canvas.mpl_connect('motion_notify_event', update_coords)
 
     # Title centered above chart
-    fig.text(0.5, 0.97, f"Smith Chart (Z₀ = {Z0} Ω) with Constant Resistance and Reactance", 
-             fontsize=12, ha='center', va='top')
+    chart_title = fig.text(0.5, 0.97, f"Smith Chart (Z₀ = {Z0} Ω) with Constant Resistance and Reactance",
+                           fontsize=12, ha='center', va='top')
 
     # Reflection coefficient circle (initially off)
-    gamma_circle = plt.Circle((0, 0), gamma_value, fill=False, color='black', linestyle='dotted', linewidth=1.5)
-    ax.add_patch(gamma_circle)
+    gamma_circle = plt.Circle((0, 0), gamma_value, fill=False, color='black', linestyle='dotted', linewidth=1.5,
+                              animated=True)
     global gamma_patch
     gamma_patch = ax.add_patch(gamma_circle)
     gamma_patch.set_visible(show_circle)
     print("Gamma circle created, initial radius:", gamma_value, "visibility:", show_circle)  # Debug print
 
-    # Click event handling for marking a single impedance
-    click_marker = None
-    click_text = None
+    # Click marker and label for marking a single impedance (hidden until the first click)
+    click_marker, = ax.plot([], [], 'ro', markersize=8, animated=True)
+    click_text = ax.text(0, 0, '', fontsize=10, color='black', animated=True, visible=False,
+                         bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
+    # Blitting: the static chart is cached as a background bitmap after every full draw,
+    # and hover, click and |Γ| changes only redraw these animated overlay artists on top of it
+    overlay_artists = [gamma_patch, click_marker, click_text, coord_text]
+    background = None
+
+    def draw_overlay():
+        for artist in overlay_artists:
+            ax.draw_artist(artist)
+
+    def on_draw(event):
+        nonlocal background
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_overlay()
+
+    def on_resize(event):
+        nonlocal background
+        background = None  # Cached bitmap no longer matches the canvas size
+
+    def blit_overlay():
+        if background is None:
+            fig.canvas.draw_idle()  # Full redraw, on_draw recaptures the background
+            return
+        fig.canvas.restore_region(background)
+        draw_overlay()
+        fig.canvas.blit(fig.bbox)
+
+    fig.canvas.mpl_connect('draw_event', on_draw)
+    fig.canvas.mpl_connect('resize_event', on_resize)
 
     def on_click(event):
-        nonlocal click_marker, click_text
         if event.inaxes != ax:
             return
         gamma_x = event.xdata
         gamma_y = event.ydata
-        if gamma_x**2 + gamma_y**2 > 1:
+        if target_pick is not None:  # The click picks Γ_S/Γ_L for the matching target
+            if gamma_x**2 + gamma_y**2 < 1:
+                set_matching_target(complex(gamma_x, gamma_y))
+            return
+        snapped = snap_point(gamma_x, gamma_y)
+        if snapped is not None:  # Mark the data point itself, with its frequency, Γ and return loss
+            impedance_str, gamma = snapped
+            gamma_x, gamma_y = gamma.real, gamma.imag
+        elif gamma_x**2 + gamma_y**2 > 1:
             return
-
-        # Remove previous marker and text if they exist
-        if click_marker is not None:
-            click_marker.remove()
-        if click_text is not None:
-            click_text.remove()
-
-        # Calculate impedance
-        gamma = complex(gamma_x, gamma_y)
-        z_normalized = (1 + gamma) / (1 - gamma)
-        Z = z_normalized * Z0
-        R = Z.real
-        X = Z.imag
-        if abs(X) < 0.1:
-            impedance_str = f'Z = {R:.1f} Ω'
         else:
-            sign = '+' if X >= 0 else '-'
-            impedance_str = f'Z = {R:.1f} {sign} j{abs(X):.1f} Ω'
+            impedance_str = format_impedance(gamma_to_impedance(complex(gamma_x, gamma_y), Z0))
 
-        # Add colored dot
-        click_marker, = ax.plot(gamma_x, gamma_y, 'ro', markersize=8)
+        # Move colored dot
+        click_marker.set_data([gamma_x], [gamma_y])
 
-        # Add impedance text next to the dot
-        offset = 0.1
-        ha = 'left' if gamma_x < 0 else 'right'
-        va = 'bottom' if gamma_y < 0 else 'top'
-        text_x = gamma_x + offset if gamma_x < 0 else gamma_x - offset
-        text_y = gamma_y + offset if gamma_y < 0 else gamma_y - offset
-        click_text = ax.text(text_x, text_y, impedance_str, fontsize=10, ha=ha, va=va, 
-                             color='black', bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+        # Move impedance text next to the dot
+        text_x, text_y, ha, va = label_position(gamma_x, gamma_y)
+        click_text.set_position((text_x, text_y))
+        click_text.set_text(impedance_str)
+        click_text.set_ha(ha)
+        click_text.set_va(va)
+        click_text.set_visible(True)
 
-        fig.canvas.draw_idle()
+        blit_overlay()
 
     fig.canvas.mpl_connect('button_press_event', on_click)
 
+    # Trajectory layer: one scatter artist for all markers, one polyline for the connecting
+    # segments and one label per point. Artists are created once and updated in place, and
+    # only the points from the first changed one onward are recomputed and relabelled.
+    trajectory_markers = ax.scatter([], [], s=64, zorder=3)  # s=64 matches markersize=8
+    trajectory_line, = ax.plot([], [], 'g-', linewidth=1)  # True element paths (arcs), not straight segments
+    trajectory_labels = []
+    drawn_points = []  # Trajectory points as of the last update
+    trajectory_gamma = np.empty(0, dtype=complex)
+    # Measured data and sweeps can have millions of points, so they are drawn decimated to the
+    # pixels of the current view (redone on zoom and pan) while readouts use the full data
+    measured_line = ax.add_line(DecimatedLine([], [], color='steelblue', linewidth=1))
+    sweep_line = ax.add_line(DecimatedLine([], [], color='darkorange', linewidth=1.5))
+    # Monte Carlo density cloud over the Γ plane, between the grid and the trajectory
+    tolerance_cloud = ax.imshow(np.zeros((2, 2, 4)), extent=(-1, 1, -1, 1), origin='lower', zorder=1.5,
+                                interpolation='nearest', visible=False)
+    cloud_result = None  # tolerance_result shown by tolerance_cloud
+    # Live feed: the samples in the ring buffer as a trace, the newest one as a marker. Both are
+    # overlay artists, so a new frame of samples is blitted over the cached chart
+    live_line, = ax.plot([], [], '-', color='crimson', linewidth=1, alpha=0.6, animated=True)
+    live_marker, = ax.plot([], [], 'o', color='crimson', markersize=6, animated=True)
+    overlay_artists[:0] = [live_line, live_marker]
+    # TDR window: created when TDR is first shown, dropped when closed. Its transform is kept while the
+    # mode, window, band and Z0 stay the same, so every update reuses the FFT size, window and buffers
+    tdr_figure = tdr_axes = tdr_trace = None
+    tdr_transform = None
+    tdr_key = None
+    # Instrumentation report in the corner while profiling, refreshed by refresh_profile and blitted like the readout
+    profile_text = None
+    if instrumentation.recorder is not None:
+        profile_text = fig.text(0.005, 0.005, '', fontsize=8, family='monospace', va='bottom', animated=True,
+                                bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+        overlay_artists.append(profile_text)
+
+    # Two-port design circles (stability, gain, noise) of every shown frequency in one collection,
+    # and the Γ_S/Γ_L picked as the matching target
+    design_circles = ax.add_collection(LineCollection([], linewidths=1, zorder=2))
+    target_marker, = ax.plot([], [], '*', color='darkviolet', markersize=14, zorder=4)
+    # Load population: every unit's load and its image through the network over the band as marker
+    # clouds (a marker per point draws far faster than a scatter), and the worst point of the image
+    population_cloud, = ax.plot([], [], '.', color='gray', markersize=2, alpha=0.4, zorder=1.6)
+    population_image, = ax.plot([], [], '.', color='teal', markersize=2, alpha=0.4, zorder=2.5)
+    population_worst, = ax.plot([], [], 'x', color='red', markersize=10, markeredgewidth=2, zorder=4)
+    population_key = None  # (network, Z0, population, band) the clouds were computed for
+
     # Plot load impedance and matching trajectory
     def plot_impedance_trajectory():
-        global gamma_patch
-        # Clear only dynamic elements (impedance markers, trajectory lines, and labels)
-        for artist in ax.patches[len(smith_chart_patches):]:  # Skip original Smith Chart patches
-            artist.remove()
-        for line in ax.lines[len(smith_chart_lines):]:  # Skip original Smith Chart lines
-            line.remove()
-        for text in ax.texts[len(labels):]:  # Skip the chart labels
-            text.remove()
-
-        # Re-add or update the reflection circle
-        if gamma_patch is None:
-            gamma_circle = plt.Circle((0, 0), gamma_value, fill=False, color='black', linestyle='dotted', linewidth=1.5)
-            ax.add_patch(gamma_circle)
-            gamma_patch = gamma_circle
+        nonlocal drawn_points, trajectory_gamma, cloud_result
         gamma_patch.set_radius(gamma_value)
         gamma_patch.set_visible(show_circle)
 
-        if impedance_points:
-            # Plot each point and connect them with lines
-            for i, Z in enumerate(impedance_points):
-                gamma = impedance_to_gamma(Z)
-                gamma_x, gamma_y = gamma.real, gamma.imag
-                # Plot point
-                color = 'blue' if i == 0 else 'green'  # Blue for initial load, green for matching points
-                ax.plot(gamma_x, gamma_y, 'o', color=color, markersize=8)
-                # Add impedance label
-                R = Z.real
-                X = Z.imag
-                if abs(X) < 0.1:
-                    impedance_str = f'Z{i} = {R:.1f} Ω'
+        # Find the first point that differs from what is already on the chart; the network
+        # itself only recomputes the points after the first edited element
+        impedance_points = network.points()
+        n = len(impedance_points)
+        first = 0
+        while first < min(n, len(drawn_points)) and drawn_points[first] == impedance_points[first]:
+            first += 1
+
+        # Drop labels of points that no longer exist
+        for text in trajectory_labels[n:]:
+            text.remove()
+        del trajectory_labels[n:]
+
+        if first < n or n < len(drawn_points):
+            new_gamma = impedance_to_gamma(np.asarray(impedance_points[first:], dtype=complex), Z0)
+            trajectory_gamma = np.concatenate([trajectory_gamma[:first], new_gamma])
+            # Only the changed points are re-indexed; point k is at element k's frequency (the load at the first)
+            snap_index = snap_data['Trajectory'][0]
+            snap_index.truncate(first)
+            snap_index.extend(new_gamma)
+            point_frequencies = [element.frequency for element in network] or [frequency]
+            snap_data['Trajectory'][1:] = [point_frequencies[:1] + point_frequencies, list(impedance_points)]
+            points = np.column_stack([trajectory_gamma.real, trajectory_gamma.imag])
+            colors = np.tile(to_rgba('green'), (n, 1))  # Blue for initial load, green for matching points
+            colors[:1] = to_rgba('blue')
+            trajectory_markers.set_offsets(points.reshape(-1, 2))
+            trajectory_markers.set_facecolors(colors)
+            trajectory_markers.set_edgecolors(colors)
+            # Each element's path is sampled adaptively and cached by the network like its points
+            path = np.concatenate([trajectory_gamma[:1]] + network.paths(Z0))
+            trajectory_line.set_data(path.real, path.imag)
+
+            # Add or update impedance labels for the changed points only
+            for i in range(first, n):
+                gamma_x, gamma_y = trajectory_gamma[i].real, trajectory_gamma[i].imag
+                text_x, text_y, ha, va = label_position(gamma_x, gamma_y)
+                impedance_str = format_impedance(impedance_points[i], f'Z{i}')
+                if i < len(trajectory_labels):
+                    trajectory_labels[i].set_position((text_x, text_y))
+                    trajectory_labels[i].set_text(impedance_str)
+                    trajectory_labels[i].set_ha(ha)
+                    trajectory_labels[i].set_va(va)
                 else:
-                    sign = '+' if X >= 0 else '-'
-                    impedance_str = f'Z{i} = {R:.1f} {sign} j{abs(X):.1f} Ω'
-                offset = 0.1
-                ha = 'left' if gamma_x < 0 else 'right'
-                va = 'bottom' if gamma_y < 0 else 'top'
-                text_x = gamma_x + offset if gamma_x < 0 else gamma_x - offset
-                text_y = gamma_y + offset if gamma_y < 0 else gamma_y - offset
-                ax.text(text_x, text_y, impedance_str, fontsize=10, ha=ha, va=va, 
-                        color='black', bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
-                # Connect points with lines
-                if i > 0:
-                    prev_gamma = impedance_to_gamma(impedance_points[i-1])
-                    ax.plot([prev_gamma.real, gamma_x], [prev_gamma.imag, gamma_y], 'g-', linewidth=1)
+                    trajectory_labels.append(ax.text(text_x, text_y, impedance_str, fontsize=10, ha=ha, va=va,
+                                                     color='black',
+                                                     bbox=dict(facecolor='white', alpha=0.8, edgecolor='none')))
+            drawn_points = list(impedance_points)
+
+            # Text is the expensive part of a redraw, so long ladders only keep the newest labels visible
+            for i in range(max(1, first - max_trajectory_labels), n):
+                trajectory_labels[i].set_visible(i == 0 or i > n - max_trajectory_labels)
+
+        # Measured load from a Touchstone file, drawn as a single trace
+        if measured_load is not None:
+            measured_gamma = impedance_to_gamma(measured_load, Z0)
+            measured_line.set_data(measured_gamma.real, measured_gamma.imag)
+            set_snap_data('Measured', measured_gamma, measured_frequencies, measured_load)
+        measured_line.set_visible(measured_load is not None)
+
+        # Whole network across the frequency sweep, drawn as a single trace
+        sweep_info.set('')
+        if show_sweep and load_impedance is not None:
+            if measured_load is not None:  # Sweep the measured load over its own frequency points
+                frequencies = measured_frequencies
+                sweep_impedance = network.sweep(frequencies, measured_load)
+            else:
+                frequencies = np.linspace(sweep_start, sweep_stop, sweep_points)
+                sweep_impedance = network.sweep(frequencies)
+            gamma = impedance_to_gamma(sweep_impedance, Z0)
+            set_snap_data('Sweep', gamma, frequencies, sweep_impedance)
+            return_loss = return_loss_db(gamma)
+            sweep_line.set_data(gamma.real, gamma.imag)
+            best = np.argmax(return_loss)
+            info = f'Best RL {return_loss[best]:.1f} dB at {frequencies[best] / 1e6:.0f} MHz'
+            matched = frequencies[return_loss >= 10]
+            if matched.size:
+                info += f', RL ≥ 10 dB: {matched[0] / 1e6:.0f}–{matched[-1] / 1e6:.0f} MHz'
+            sweep_info.set(info)
+        sweep_line.set_visible(show_sweep and load_impedance is not None)
+
+        if show_tdr and load_impedance is not None:
+            update_tdr()
+
+        # Monte Carlo cloud of every trajectory point, only while the network and Z0 match the run
+        if tolerance_result is not None and tolerance_result is not cloud_result:
+            tolerance_cloud.set_data(density_image(tolerance_result.density.sum(axis=0)))
+            cloud_result = tolerance_result
+        tolerance_cloud.set_visible(show_cloud and tolerance_result is not None
+                                    and tolerance_key == (Z0, tuple(impedance_points)))
+
+        shown = population_loads is not None and update_population()
+        for artist in (population_cloud, population_image, population_worst):
+            artist.set_visible(shown)
+
+        fig.canvas.draw_idle()
 
+    def update_population():
+        nonlocal population_key
+        from robust_match import evaluate_population
+        # Every unit at every frequency through the network in one broadcasted evaluation, only when the
+        # network, Z0, population or band changed (not for |Γ| slider flushes and the like)
+        band, loads = population_band()
+        key = (tuple(network.components()), Z0, population_version, band.tobytes())
+        if key == population_key:
+            return True
+        try:
+            result = evaluate_population(loads, network.components(), band, Z0)
+        except (ValueError, MemoryError) as e:
+            population_key = None
+            population_info.set(f'Population not evaluated: {e}')
+            return False
+        population_key = key
+        stride = max(1, result.gamma.size // max_population_points)
+        load_gamma = impedance_to_gamma(np.ravel(loads)[::max(1, np.size(loads) // max_population_points)], Z0)
+        image = result.gamma.ravel()[::stride]
+        population_cloud.set_data(load_gamma.real, load_gamma.imag)
+        population_image.set_data(image.real, image.imag)
+        worst = result.gamma[result.worst_index]
+        population_worst.set_data([worst.real], [worst.imag])
+        unit, k = result.worst_index
+        population_info.set(f'{len(loads)} units x {len(band)} freqs: worst |Γ| {result.worst_gamma:.3f} '
+                            f'(RL {return_loss_db(result.worst_gamma):.1f} dB, unit {unit} at {band[k] / 1e6:.0f} MHz), '
+                            + "units' worst " + ', '.join(f'p{q} {value:.3f}' for q, value in result.percentiles.items()))
+        return True
+
+    def update_tdr():
+        nonlocal tdr_figure, tdr_axes, tdr_trace, tdr_transform, tdr_key
+        from tdr import TDRTransform, harmonic_grid, resample
+        mode, response = TDR_MODES[tdr_mode]
+        key = (mode, tdr_window, sweep_start, sweep_stop, sweep_points, Z0)
+        new_transform = key != tdr_key
+        if new_transform:
+            # Low-pass needs harmonics of the step (Δf to the sweep stop), band-pass transforms the sweep band
+            grid = (harmonic_grid(sweep_stop, sweep_points) if mode == 'lowpass'
+                    else np.linspace(sweep_start, sweep_stop, sweep_points))
+            tdr_transform = TDRTransform(grid, mode, tdr_window.lower(), Z0)
+            tdr_key = key
+        grid = tdr_transform.frequencies
+        if measured_load is not None:  # The measured load through the network, resampled onto the grid
+            gamma = resample(measured_frequencies,
+                             impedance_to_gamma(network.sweep(measured_frequencies, measured_load), Z0), grid)
+        else:
+            gamma = impedance_to_gamma(network.sweep(grid), Z0)
+        result = tdr_transform(gamma)
+
+        if tdr_figure is None:
+            tdr_figure = plt.figure('TDR', figsize=(8, 4), layout='constrained')
+            instrumentation.instrument_canvas(tdr_figure.canvas)
+            tdr_axes = tdr_figure.add_subplot()
+            tdr_trace = tdr_axes.add_line(DecimatedLine([], [], color='purple', linewidth=1.5))
+            tdr_axes.set_xlabel('Time (ns, round trip)')
+            tdr_axes.grid(True, alpha=0.3)
+            # One-way distance of a round trip in air; divide by √εeff for a line
+            tdr_axes.secondary_xaxis('top', functions=(lambda ns: ns * SPEED_OF_LIGHT / 2e6,
+                                                       lambda mm: mm * 2e6 / SPEED_OF_LIGHT)).set_xlabel(
+                'Distance in air (mm)')
+            tdr_figure.canvas.mpl_connect('close_event', on_tdr_close)
+            tdr_figure.show()
+            new_transform = True
+        tdr_trace.set_data(result.time * 1e9, getattr(result, response))
+        if new_transform:  # Otherwise keep the time range the user zoomed to
+            tdr_axes.set_xlim(result.time[0] * 1e9, result.time[-1] * 1e9)
+        tdr_axes.set_ylabel({'impedance': 'Impedance (Ω)', 'impulse': 'Impulse response (ρ)'}[response])
+        tdr_axes.relim()
+        tdr_axes.autoscale_view(scalex=False)
+        tdr_figure.suptitle(f'{tdr_mode}, {tdr_window} window, {grid[0] / 1e6:.0f}–{grid[-1] / 1e6:.0f} MHz, '
+                           f'{len(grid)} points', fontsize=10)
+        tdr_figure.canvas.draw_idle()
+
+    def on_tdr_close(event):
+        global show_tdr
+        nonlocal tdr_figure
+        tdr_figure = None
+        show_tdr = False
+        tdr_var.set(False)
+
+    def close_tdr():
+        if tdr_figure is not None:
+            plt.close(tdr_figure)  # on_tdr_close forgets it
+
+    # Replace the grid after a Z0, density or admittance overlay change
+    def redraw_grid():
+        global smith_chart_artists
+        nonlocal drawn_points, trajectory_gamma
+        for artist in smith_chart_artists:
+            artist.remove()
+        geometry, _ = chart_geometry(*grid_values(GRID_DENSITIES[grid_density]), z0=Z0)
+        smith_chart_artists = draw_chart_grid(ax, Z0, geometry, show_admittance)
+        chart_title.set_text(f"Smith Chart (Z₀ = {Z0} Ω) with Constant Resistance and Reactance")
+        # Every Γ depends on Z0, so the whole trajectory is recomputed
+        drawn_points = []
+        trajectory_gamma = np.empty(0, dtype=complex)
+        plot_impedance_trajectory()
+
+    def show_live(gamma):
+        live_line.set_data(gamma.real, gamma.imag)
+        live_marker.set_data(gamma.real[-1:], gamma.imag[-1:])
+        blit_overlay()
+
+    def show_circles(gamma, colors, linestyles):
+        # gamma: complex (k, points) circle vertices in the chart's Γ plane
+        design_circles.set_segments(np.stack([gamma.real, gamma.imag], axis=-1))
+        design_circles.set_color(colors)
+        design_circles.set_linestyle(linestyles)
         fig.canvas.draw_idle()
 
-    # Store plot_impedance_trajectory for access in other functions
+    def show_target(gamma):
+        target_marker.set_data([] if gamma is None else [gamma.real], [] if gamma is None else [gamma.imag])
+        fig.canvas.draw_idle()
+
+    def show_profile(text):
+        profile_text.set_text(text)
+        blit_overlay()
+
+    # Store the update functions for access in other functions
     draw_smith_chart.plot_impedance_trajectory = plot_impedance_trajectory
+    draw_smith_chart.blit_overlay = blit_overlay
+    draw_smith_chart.redraw_grid = redraw_grid
+    draw_smith_chart.show_live = show_live
+    draw_smith_chart.show_profile = show_profile
+    draw_smith_chart.close_tdr = close_tdr
+    draw_smith_chart.show_circles = show_circles
+    draw_smith_chart.show_target = show_target
+
+    # Report startup timing once the chart has been painted for the first time
+    def on_first_draw(event):
+        fig.canvas.mpl_disconnect(first_draw_id)
+        mark_startup('first paint')
+        report_startup()
+
+    first_draw_id = fig.canvas.mpl_connect('draw_event', on_first_draw)
+    mark_startup('chart build')
 
     # Show the Matplotlib figure
     plt.show()
@@ -264,12 +534,85 @@ def draw_smith_chart():
 # Create Tkinter window for controls
 root = tk.Tk()
 root.title("Return Loss and Impedance Matching Controls")
-root.geometry("650x250")  # Adjusted height and width for new controls
+root.geometry("650x530")  # Adjusted height and width for new controls
 
 # Frame for controls
 control_frame = tk.Frame(root)
 control_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
 
+# |Γ|/dB update scheduler: control handlers only change the state, and the sliders and chart
+# are synced at most once per display frame however many events arrive in it
+frame_ms = 16  # One update per ~60 Hz frame
+burst_idle_ms = 500  # Report coalescing once the controls have been quiet this long
+pending_update = None  # after() id of the scheduled flush
+pending_trajectory = False  # The network changed, redraw the trajectory rather than just the overlay
+update_sources = set()  # Sliders that caused the pending change, not written back while dragged
+burst_events = 0  # Control events in the current burst
+burst_draws = 0  # Chart updates in the current burst
+avoided_draws = 0  # Redundant draws avoided since startup
+burst_report = None  # after() id of the burst report
+
+def set_gamma_state(gamma=None, db=None, source=None):
+    global gamma_value, db_value
+    if gamma is not None:
+        gamma_value = gamma
+        db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
+    else:
+        db_value = db
+        gamma_value = round(10**(db_value / 20), 2)
+    # Entries are cheap and the step handlers read them, so they follow the state right away
+    gamma_entry.delete(0, tk.END)
+    gamma_entry.insert(0, f'{gamma_value:.2f}')  # Two decimal places
+    db_entry.delete(0, tk.END)
+    db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')  # One decimal place
+    if source is not None:
+        update_sources.add(source)
+    schedule_update()
+
+def schedule_update(trajectory=False):
+    global pending_update, pending_trajectory, burst_events
+    burst_events += 1
+    pending_trajectory = pending_trajectory or trajectory
+    if pending_update is None:
+        pending_update = root.after(frame_ms, flush_update)
+
+def flush_update():
+    global pending_update, pending_trajectory, burst_draws, burst_report
+    pending_update = None
+    # A slider being dragged keeps its own position, the other one follows the state
+    skip = set(update_sources) if len(update_sources) == 1 else set()
+    update_sources.clear()
+    if gamma_slider not in skip:
+        gamma_slider.set(gamma_value)
+    if db_slider not in skip:
+        db_slider.set(db_value)
+    if pending_trajectory:
+        pending_trajectory = False
+        draw_smith_chart.plot_impedance_trajectory()  # Also applies the |Γ| circle state
+    else:
+        update_circle()
+    burst_draws += 1
+    if burst_report is not None:
+        root.after_cancel(burst_report)
+    burst_report = root.after(burst_idle_ms, report_burst)
+
+def report_burst():
+    global burst_events, burst_draws, avoided_draws, burst_report
+    avoided = max(0, burst_events - burst_draws)
+    avoided_draws += avoided
+    print(f"Controls: {burst_events} events, {burst_draws} draws, {avoided} redundant draws avoided "
+          f"({avoided_draws} total)")  # Debug print
+    burst_events = burst_draws = 0
+    burst_report = None
+
+def slider_echo(slider_value, state_value):
+    # Slider.set() calls the slider command back; a value the state already shows is only an echo
+    global burst_events
+    if slider_value == state_value:
+        burst_events += 1
+        return True
+    return False
+
 # Gamma (|Γ|) text box, buttons, and slider
 gamma_frame = tk.Frame(control_frame)
 gamma_frame.pack(side=tk.LEFT, padx=5)
@@ -283,61 +626,30 @@ gamma_entry = tk.Entry(gamma_input_frame)
 gamma_entry.insert(0, f'{gamma_value:.2f}')  # Two decimal places
 gamma_entry.pack(side=tk.LEFT, padx=5)
 
-def increment_gamma():
-    global gamma_value, db_value
+def step_gamma(step):
     try:
         current_gamma = float(gamma_entry.get())
-        new_gamma = round(min(1, current_gamma + 0.01), 2)  # Two decimal places
+        new_gamma = round(max(0, min(1, current_gamma + step)), 2)  # Two decimal places
         if new_gamma != current_gamma:
-            gamma_value = new_gamma
-            db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')
-            gamma_slider.set(gamma_value)  # Update slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
+            set_gamma_state(gamma=new_gamma)
     except ValueError:
         gamma_entry.delete(0, tk.END)
         gamma_entry.insert(0, f'{gamma_value:.2f}')
 
+def increment_gamma():
+    step_gamma(0.01)
+
 def decrement_gamma():
-    global gamma_value, db_value
-    try:
-        current_gamma = float(gamma_entry.get())
-        new_gamma = round(max(0, current_gamma - 0.01), 2)  # Two decimal places
-        if new_gamma != current_gamma:
-            gamma_value = new_gamma
-            db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')
-            gamma_slider.set(gamma_value)  # Update slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
-    except ValueError:
-        gamma_entry.delete(0, tk.END)
-        gamma_entry.insert(0, f'{gamma_value:.2f}')
+    step_gamma(-0.01)
 
 tk.Button(gamma_input_frame, text="↑", command=increment_gamma, width=2).pack(side=tk.LEFT)
 tk.Button(gamma_input_frame, text="↓", command=decrement_gamma, width=2).pack(side=tk.LEFT)
 
 def update_from_gamma(event=None):
-    global gamma_value, db_value
     try:
         new_gamma = float(gamma_entry.get())
         if 0 <= new_gamma <= 1:
-            gamma_value = round(new_gamma, 2)  # Two decimal places
-            db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')
-            gamma_slider.set(gamma_value)  # Update slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
+            set_gamma_state(gamma=round(new_gamma, 2))  # Two decimal places
         else:
             gamma_entry.delete(0, tk.END)
             gamma_entry.insert(0, f'{gamma_value:.2f}')
@@ -348,25 +660,8 @@ def update_from_gamma(event=None):
 gamma_entry.bind('<Return>', update_from_gamma)
 
 def scroll_gamma(event):
-    global gamma_value, db_value
-    try:
-        current_gamma = float(gamma_entry.get())
-        # Normalize delta (positive up, negative down)
-        step = 0.01 * (event.delta // 120)  # Positive for up, negative for down
-        new_gamma = round(max(0, min(1, current_gamma + step)), 2)  # Two decimal places
-        if new_gamma != current_gamma:
-            gamma_value = new_gamma
-            db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')
-            gamma_slider.set(gamma_value)  # Update slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
-    except ValueError:
-        gamma_entry.delete(0, tk.END)
-        gamma_entry.insert(0, f'{gamma_value:.2f}')
+    # Normalize delta (positive up, negative down)
+    step_gamma(0.01 * (event.delta // 120))
 
 # Bind mouse wheel events for gamma_entry
 gamma_entry.bind('<MouseWheel>', scroll_gamma)  # Windows
@@ -375,17 +670,9 @@ gamma_entry.bind('<Button-5>', lambda event: scroll_gamma(event.__setitem__('del
 
 # Slider for |Γ|
 def on_gamma_slider_change(value):
-    global gamma_value, db_value
     new_gamma = round(float(value), 2)
-    if new_gamma != gamma_value:
-        gamma_value = new_gamma
-        db_value = 20 * np.log10(gamma_value) if gamma_value > 0 else -float('inf')
-        gamma_entry.delete(0, tk.END)
-        gamma_entry.insert(0, f'{gamma_value:.2f}')
-        db_entry.delete(0, tk.END)
-        db_entry.insert(0, f'{db_value:.1f}' if db_value > -float('inf') else '-inf')
-        db_slider.set(db_value)  # Update dB slider position
-        update_circle()
+    if not slider_echo(new_gamma, gamma_value):
+        set_gamma_state(gamma=new_gamma, source=gamma_slider)
 
 gamma_slider = tk.Scale(gamma_frame, from_=0.0, to=1.0, resolution=0.01, orient=tk.HORIZONTAL, 
                         command=on_gamma_slider_change, length=150)
@@ -405,20 +692,21 @@ db_entry = tk.Entry(db_input_frame)
 db_entry.insert(0, f'{db_value:.1f}')  # One decimal place
 db_entry.pack(side=tk.LEFT, padx=5)
 
+def step_db(step):
+    try:
+        current_db = float(db_entry.get())
+        new_db = round(min(0, current_db + step), 1)  # One decimal place, constrained to 0
+        if new_db != current_db:
+            set_gamma_state(db=new_db)
+    except ValueError:
+        db_entry.delete(0, tk.END)
+        db_entry.insert(0, f'{db_value:.1f}')  # Reset to last valid global db_value
+
 def update_from_db(event=None):
-    global gamma_value, db_value
     try:
         new_db = float(db_entry.get())
         if new_db <= 0:
-            gamma_value = round(10**(new_db / 20), 2)
-            db_value = new_db  # Update global db_value with the new valid value
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            gamma_slider.set(gamma_value)  # Update |Γ| slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
+            set_gamma_state(db=new_db)
         else:
             db_entry.delete(0, tk.END)
             db_entry.insert(0, f'{db_value:.1f}')  # Use global db_value for reset
@@ -429,69 +717,17 @@ def update_from_db(event=None):
 db_entry.bind('<Return>', update_from_db)
 
 def increment_db():
-    global db_value, gamma_value
-    try:
-        current_db = float(db_entry.get())
-        new_db = round(min(0, current_db + 0.1), 1)  # One decimal place, constrained to 0
-        if new_db != current_db:
-            db_value = new_db
-            gamma_value = round(10**(db_value / 20), 2)
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            gamma_slider.set(gamma_value)  # Update |Γ| slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
-    except ValueError:
-        db_entry.delete(0, tk.END)
-        db_entry.insert(0, f'{db_value:.1f}')
+    step_db(0.1)
 
 def decrement_db():
-    global db_value, gamma_value
-    try:
-        current_db = float(db_entry.get())
-        new_db = round(current_db - 0.1, 1)  # One decimal place
-        if new_db != current_db:
-            db_value = new_db
-            gamma_value = round(10**(db_value / 20), 2)
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            gamma_slider.set(gamma_value)  # Update |Γ| slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
-    except ValueError:
-        db_entry.delete(0, tk.END)
-        db_entry.insert(0, f'{db_value:.1f}')
+    step_db(-0.1)
 
 tk.Button(db_input_frame, text="↑", command=increment_db, width=2).pack(side=tk.LEFT)
 tk.Button(db_input_frame, text="↓", command=decrement_db, width=2).pack(side=tk.LEFT)
 
 def scroll_db(event):
-    global gamma_value, db_value
-    try:
-        current_db = float(db_entry.get())
-        # Normalize delta (positive up, negative down)
-        step = 0.1 * (event.delta // 120)  # Positive for up, negative for down
-        new_db = round(current_db + step, 1)  # One decimal place
-        if new_db <= 0 and new_db != current_db:
-            gamma_value = round(10**(new_db / 20), 2)
-            db_value = new_db  # Update global db_value with the new valid value
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{new_db:.1f}')
-            gamma_entry.delete(0, tk.END)
-            gamma_entry.insert(0, f'{gamma_value:.2f}')
-            gamma_slider.set(gamma_value)  # Update |Γ| slider position
-            db_slider.set(db_value)  # Update dB slider position
-            update_circle()
-        elif new_db > 0:
-            db_entry.delete(0, tk.END)
-            db_entry.insert(0, f'{db_value:.1f}')  # Reset to last valid global db_value
-    except ValueError:
-        db_entry.delete(0, tk.END)
-        db_entry.insert(0, f'{db_value:.1f}')  # Reset to last valid global db_value
+    # Normalize delta (positive up, negative down)
+    step_db(0.1 * (event.delta // 120))
 
 # Bind mouse wheel events for db_entry
 db_entry.bind('<MouseWheel>', scroll_db)  # Windows
@@ -499,20 +735,15 @@ db_entry.bind('<Button-4>', lambda event: scroll_db(event.__setitem__('delta', 1
 db_entry.bind('<Button-5>', lambda event: scroll_db(event.__setitem__('delta', -120)))  # Linux (scroll down)
 
 # Slider for dB
+db_slider_min = -30.0
+
 def on_db_slider_change(value):
-    global gamma_value, db_value
     new_db = round(float(value), 1)
-    if new_db != db_value:
-        db_value = new_db
-        gamma_value = round(10**(db_value / 20), 2)
-        db_entry.delete(0, tk.END)
-        db_entry.insert(0, f'{db_value:.1f}')
-        gamma_entry.delete(0, tk.END)
-        gamma_entry.insert(0, f'{gamma_value:.2f}')
-        gamma_slider.set(gamma_value)  # Update |Γ| slider position
-        update_circle()
+    # The slider shows the state rounded to its resolution and clamped to its range
+    if not slider_echo(new_db, round(max(db_value, db_slider_min), 1)):
+        set_gamma_state(db=new_db, source=db_slider)
 
-db_slider = tk.Scale(db_frame, from_=-30.0, to=0.0, resolution=0.1, orient=tk.HORIZONTAL, 
+db_slider = tk.Scale(db_frame, from_=db_slider_min, to=0.0, resolution=0.1, orient=tk.HORIZONTAL, 
                      command=on_db_slider_change, length=150)
 db_slider.set(db_value)
 db_slider.pack(side=tk.TOP, pady=2)
@@ -524,7 +755,7 @@ tk.Checkbutton(control_frame, text="Show |Γ| Circle", variable=show_var).pack(s
 def update_show_circle():
     global show_circle
     show_circle = show_var.get()
-    update_circle()
+    schedule_update()
 
 show_var.trace('w', lambda *args: update_show_circle())
 
@@ -546,15 +777,17 @@ load_x_entry.insert(0, "25")
 load_x_entry.pack(side=tk.LEFT, padx=2)
 
 def set_load():
-    global load_impedance, current_impedance, impedance_points
+    global load_impedance, network, measured_frequencies, measured_load
     try:
         R = float(load_r_entry.get())
         X = float(load_x_entry.get())
         if R < 0:
             raise ValueError("Resistance must be non-negative")
         load_impedance = complex(R, X)
-        current_impedance = load_impedance
-        impedance_points = [load_impedance]  # Reset trajectory with initial load
+        measured_frequencies = None  # A typed load replaces any measured one
+        measured_load = None
+        network = Network(load_impedance)  # Reset trajectory with initial load
+        refresh_element_choice()
         draw_smith_chart.plot_impedance_trajectory()
     except ValueError:
         load_r_entry.delete(0, tk.END)
@@ -564,23 +797,54 @@ def set_load():
 
 tk.Button(load_frame, text="Set Load", command=set_load).pack(side=tk.LEFT, padx=5)
 
+def load_touchstone():
+    global load_impedance, network, measured_frequencies, measured_load
+    from tkinter import filedialog, messagebox
+    from touchstone import read_touchstone, touchstone_load
+    path = filedialog.askopenfilename(title="Load Touchstone File",
+                                      filetypes=[("Touchstone", "*.s1p *.s2p"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        frequencies, loads = touchstone_load(read_touchstone(path))
+        if frequencies.size == 0:
+            raise ValueError("File contains no data points")
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Load Touchstone File", str(e))
+        return
+    measured_frequencies, measured_load = frequencies, loads
+    # Matching steps use the measured load at the frequency slider value
+    load_impedance = complex(np.interp(frequency, frequencies, loads.real), np.interp(frequency, frequencies, loads.imag))
+    network = Network(load_impedance)
+    refresh_element_choice()
+    load_r_entry.delete(0, tk.END)
+    load_r_entry.insert(0, f'{load_impedance.real:.1f}')
+    load_x_entry.delete(0, tk.END)
+    load_x_entry.insert(0, f'{load_impedance.imag:.1f}')
+    draw_smith_chart.plot_impedance_trajectory()
+
+tk.Button(load_frame, text="Load File", command=load_touchstone).pack(side=tk.LEFT, padx=2)
+
 # Matching component controls
 component_frame = tk.Frame(matching_frame)
 component_frame.pack(side=tk.LEFT, padx=5)
 
 tk.Label(component_frame, text="Matching Component:").pack(side=tk.LEFT)
-component_type = ttk.Combobox(component_frame, values=["Series Inductor", "Series Capacitor", "Shunt Inductor", "Shunt Capacitor"], width=15)
+component_type = ttk.Combobox(component_frame, values=COMPONENT_TYPES, width=15)
 component_type.set("Series Inductor")
+component_type.bind("<<ComboboxSelected>>", lambda event: edit_selected_element())
 component_type.pack(side=tk.LEFT, padx=2)
 
 # Slider for component value
 def update_component_value(value):
     global component_value
     component_value = float(value)
+    if edit_live:
+        edit_selected_element()
 
 component_value = 1.0  # Initial value in nH/pF
 component_value_slider = tk.Scale(component_frame, from_=0.1, to=100.0, resolution=0.1, orient=tk.HORIZONTAL,
-                                  command=update_component_value, length=100, label="Value (nH/pF)")
+                                  command=update_component_value, length=100, label="Value (nH/pF/mm)")
 component_value_slider.set(component_value)
 component_value_slider.pack(side=tk.LEFT, padx=2)
 
@@ -588,6 +852,10 @@ component_value_slider.pack(side=tk.LEFT, padx=2)
 def update_frequency(value):
     global frequency
     frequency = float(value) * 1e6  # Convert MHz to Hz
+    if edit_live:
+        edit_selected_element()
+    if twoport_data is not None and not circles_all:
+        update_circles()  # Circles follow the design frequency
 
 frequency_value = 1000.0  # Initial value in MHz (1 GHz)
 frequency_slider = tk.Scale(component_frame, from_=100.0, to=10000.0, resolution=10.0, orient=tk.HORIZONTAL,
@@ -595,47 +863,771 @@ frequency_slider = tk.Scale(component_frame, from_=100.0, to=10000.0, resolution
 frequency_slider.set(frequency_value)
 frequency_slider.pack(side=tk.LEFT, padx=2)
 
+def line_parameters():
+    # Characteristic impedance and εeff for new line and stub elements, invalid entries fall back to Z0 and 1
+    try:
+        line_impedance = float(line_impedance_entry.get())
+        eeff = float(eeff_entry.get())
+        if line_impedance > 0 and eeff >= 1:
+            return line_impedance, eeff
+    except ValueError:
+        pass
+    return Z0, 1.0
+
+def apply_component(component, value):
+    # The element keeps the current frequency, its reactance is evaluated there
+    network.append(Element(component, value, frequency, *line_parameters()))
+
 def add_component():
-    global current_impedance, impedance_points
-    if current_impedance is None:
+    global selected_element
+    if load_impedance is None:
         set_load()  # Ensure a load is set
     try:
-        component = component_type.get()
-        # Calculate reactance using current slider values
-        if "Inductor" in component:
-            L = component_value * 1e-9  # Convert nH to H
-            reactance = 2 * np.pi * frequency * L
-        else:  # Capacitor
-            C = component_value * 1e-12  # Convert pF to F
-            reactance = -1 / (2 * np.pi * frequency * C) if C != 0 else 0
-        # Add component
-        if "Series" in component:
-            new_impedance = add_series_component(current_impedance, reactance)
-        else:  # Shunt
-            new_impedance = add_shunt_component(current_impedance, reactance)
-        current_impedance = new_impedance
-        impedance_points.append(current_impedance)
+        apply_component(component_type.get(), component_value)
+        selected_element = len(network) - 1
+        refresh_element_choice()
         draw_smith_chart.plot_impedance_trajectory()
     except ValueError:
         pass  # Slider values should always be valid
 
 tk.Button(component_frame, text="Add Component", command=add_component).pack(side=tk.LEFT, padx=5)
 
+def auto_match():
+    global network, selected_element, l_match_index
+    if load_impedance is None:
+        set_load()  # Ensure a load is set
+    # Every closed-form L-section for the load at the current frequency, repeated clicks cycle through them.
+    # They match to Z0, or present the picked Γ_S/Γ_L target (load = the 50 Ω termination for amplifier networks)
+    from matching_synth import l_section, solution_components
+    solutions = [solution_components(solution, frequency)
+                 for solution in l_section(load_impedance, Z0, matching_target)]
+    solutions = [components for components in solutions if components is not None]
+    if not solutions:
+        return
+    components = solutions[l_match_index % len(solutions)]
+    l_match_index += 1
+    network = Network(load_impedance)
+    for component, value in components:
+        apply_component(component, value)
+    selected_element = 0
+    refresh_element_choice()
+    draw_smith_chart.plot_impedance_trajectory()
+
+tk.Button(component_frame, text="Auto L-Match", command=auto_match).pack(side=tk.LEFT, padx=5)
+
 # Reset button
 def reset_matching():
-    global load_impedance, current_impedance, impedance_points
+    global load_impedance, network, measured_frequencies, measured_load
     load_impedance = None
-    current_impedance = None
-    impedance_points = []
+    measured_frequencies = None
+    measured_load = None
+    network = Network()
+    refresh_element_choice()
     draw_smith_chart.plot_impedance_trajectory()
 
 tk.Button(matching_frame, text="Reset Matching", command=reset_matching).pack(side=tk.LEFT, padx=5)
 
+# Network editing controls: pick an element, then edit it live with the component controls,
+# insert the configured component before it or delete it. Only the points from that element on are recomputed.
+network_frame = tk.Frame(root)
+network_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def element_label(k, element):
+    label = f'{k + 1}: {element.component} {element.value:g} {component_unit(element.component)}'
+    if element.component in LINE_TYPES:
+        degrees = np.degrees(electrical_length(element.value, element.frequency, element.eeff))
+        label += f' ({degrees:.0f}°, {element.line_impedance:g} Ω, εeff {element.eeff:g})'
+    return f'{label} @ {element.frequency / 1e6:.0f} MHz'
+
+def refresh_element_choice():
+    global selected_element
+    selected_element = min(selected_element, max(len(network) - 1, 0))
+    element_choice.config(values=[element_label(k, element) for k, element in enumerate(network)])
+    element_choice.set(element_label(selected_element, network[selected_element]) if len(network) else '')
+
+def select_element(event=None):
+    global selected_element, component_value, frequency
+    if not len(network):
+        return
+    selected_element = max(element_choice.current(), 0)
+    if edit_live:
+        # Move the component controls to the element, their callbacks then match it and change nothing
+        element = network[selected_element]
+        component_value, frequency = element.value, element.frequency
+        component_type.set(element.component)
+        if element.component in LINE_TYPES:
+            line_impedance_entry.delete(0, tk.END)
+            line_impedance_entry.insert(0, f'{element.line_impedance:g}')
+            eeff_entry.delete(0, tk.END)
+            eeff_entry.insert(0, f'{element.eeff:g}')
+        component_value_slider.set(element.value)
+        frequency_slider.set(element.frequency / 1e6)
+
+def update_edit_live():
+    global edit_live
+    edit_live = edit_var.get()
+    select_element()
+
+def edit_selected_element():
+    if not edit_live or not len(network):
+        return
+    element = network[selected_element]
+    line_impedance, eeff = line_parameters()
+    # Compare at the slider resolutions (0.1 nH/pF/mm, 10 MHz) so slider echoes do not round the element
+    if (component_type.get() == element.component and round(component_value, 1) == round(element.value, 1)
+            and round(frequency, -7) == round(element.frequency, -7)
+            and (element.component not in LINE_TYPES or (line_impedance, eeff) == (element.line_impedance, element.eeff))):
+        return
+    network.set_element(selected_element, component_type.get(), component_value, frequency, line_impedance, eeff)
+    refresh_element_choice()
+    schedule_update(trajectory=True)
+
+def insert_element():
+    if load_impedance is None:
+        set_load()  # Ensure a load is set
+    network.insert(selected_element, Element(component_type.get(), component_value, frequency, *line_parameters()))
+    refresh_element_choice()
+    draw_smith_chart.plot_impedance_trajectory()
+
+def delete_element():
+    if not len(network):
+        return
+    network.remove(selected_element)
+    refresh_element_choice()
+    draw_smith_chart.plot_impedance_trajectory()
+
+tk.Label(network_frame, text="Element:").pack(side=tk.LEFT)
+element_choice = ttk.Combobox(network_frame, values=[], width=45, state="readonly")
+element_choice.bind("<<ComboboxSelected>>", select_element)
+element_choice.pack(side=tk.LEFT, padx=2)
+edit_var = tk.BooleanVar(value=edit_live)
+tk.Checkbutton(network_frame, text="Edit Live", variable=edit_var, command=update_edit_live).pack(side=tk.LEFT, padx=5)
+tk.Button(network_frame, text="Insert Before", command=insert_element).pack(side=tk.LEFT, padx=2)
+tk.Button(network_frame, text="Delete", command=delete_element).pack(side=tk.LEFT, padx=2)
+
+# Line and stub parameters; the value slider sets their physical length in mm
+tk.Label(network_frame, text="Line Z (Ω):").pack(side=tk.LEFT, padx=(10, 0))
+line_impedance_entry = tk.Entry(network_frame, width=5)
+line_impedance_entry.insert(0, '50')
+line_impedance_entry.bind("<Return>", lambda event: edit_selected_element())
+line_impedance_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(network_frame, text="εeff:").pack(side=tk.LEFT)
+eeff_entry = tk.Entry(network_frame, width=4)
+eeff_entry.insert(0, '1')
+eeff_entry.bind("<Return>", lambda event: edit_selected_element())
+eeff_entry.pack(side=tk.LEFT, padx=2)
+
+# Monte Carlo tolerance analysis and optimization of the current network over the sweep band
+tolerance_frame = tk.Frame(root)
+tolerance_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def analysis_band():
+    # Band and load for the optimizer and Monte Carlo runs: the sweep range, or the measured
+    # load over (at most analysis_band_points of) its own frequencies
+    if measured_load is not None:
+        index = np.unique(np.linspace(0, len(measured_frequencies) - 1, analysis_band_points).astype(int))
+        return measured_frequencies[index], measured_load[index]
+    return np.linspace(sweep_start, sweep_stop, analysis_band_points), load_impedance
+
+def optimize_network():
+    if load_impedance is None or not len(network):
+        analysis_info.set('Add matching components first')
+        return
+    if any(element.component in LINE_TYPES for element in network):
+        analysis_info.set('The optimizer only tunes lumped L/C elements')
+        return
+    from optimizer import optimize
+    band, load = analysis_band()
+    start = time.perf_counter()
+    result = optimize(load, [element.component for element in network], band, 'worst', seed=1, z0=Z0)
+    for k, (component, value) in enumerate(result.components):
+        network.set_element(k, value=round(value, 3))
+    refresh_element_choice()
+    analysis_info.set(f'Optimized worst RL {return_loss_db(result.worst_gamma):.1f} dB over '
+                      f'{band[0] / 1e6:.0f}–{band[-1] / 1e6:.0f} MHz ({time.perf_counter() - start:.2f} s)')
+    draw_smith_chart.plot_impedance_trajectory()
+
+def run_monte_carlo():
+    global tolerance_result, tolerance_key
+    if load_impedance is None or not len(network):
+        analysis_info.set('Add matching components first')
+        return
+    try:
+        tolerance = float(tolerance_choice.get().strip('±%')) / 100
+        load_tolerance = float(load_tolerance_entry.get()) / 100
+        samples = int(samples_entry.get())
+        seed = int(seed_entry.get()) if seed_entry.get().strip() else None  # Blank seed gives a random run
+        if tolerance < 0 or load_tolerance < 0 or samples < 1:
+            raise ValueError("Invalid tolerance settings")
+    except ValueError:
+        analysis_info.set('Invalid tolerance settings')
+        return
+    from tolerance import monte_carlo, summary
+    band, load = analysis_band()
+    start = time.perf_counter()
+    tolerance_result = monte_carlo(load, list(network), band, samples, tolerance, load_tolerance, seed=seed, z0=Z0)
+    tolerance_key = (Z0, tuple(network.points()))
+    analysis_info.set(f'{summary(tolerance_result)} ({time.perf_counter() - start:.1f} s)')
+    draw_smith_chart.plot_impedance_trajectory()
+
+def update_show_cloud():
+    global show_cloud
+    show_cloud = cloud_var.get()
+    draw_smith_chart.plot_impedance_trajectory()
+
+tk.Label(tolerance_frame, text="Tolerance:").pack(side=tk.LEFT)
+tolerance_choice = ttk.Combobox(tolerance_frame, values=["±1%", "±2%", "±5%", "±10%"], width=5)
+tolerance_choice.set("±5%")
+tolerance_choice.pack(side=tk.LEFT, padx=2)
+tk.Label(tolerance_frame, text="Load ±%:").pack(side=tk.LEFT)
+load_tolerance_entry = tk.Entry(tolerance_frame, width=4)
+load_tolerance_entry.insert(0, "0")
+load_tolerance_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(tolerance_frame, text="Samples:").pack(side=tk.LEFT)
+samples_entry = tk.Entry(tolerance_frame, width=8)
+samples_entry.insert(0, "100000")
+samples_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(tolerance_frame, text="Seed:").pack(side=tk.LEFT)
+seed_entry = tk.Entry(tolerance_frame, width=5)
+seed_entry.insert(0, "1")
+seed_entry.pack(side=tk.LEFT, padx=2)
+tk.Button(tolerance_frame, text="Monte Carlo", command=run_monte_carlo).pack(side=tk.LEFT, padx=5)
+tk.Button(tolerance_frame, text="Optimize", command=optimize_network).pack(side=tk.LEFT, padx=2)
+cloud_var = tk.BooleanVar(value=show_cloud)
+tk.Checkbutton(tolerance_frame, text="Show Cloud", variable=cloud_var, command=update_show_cloud).pack(side=tk.LEFT)
+analysis_info = tk.StringVar(value='')
+tk.Label(root, textvariable=analysis_info, anchor='w').pack(side=tk.TOP, fill=tk.X, padx=10)
+
+# Frequency sweep controls
+sweep_frame = tk.Frame(root)
+sweep_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+tk.Label(sweep_frame, text="Sweep (MHz):").pack(side=tk.LEFT)
+sweep_start_entry = tk.Entry(sweep_frame, width=7)
+sweep_start_entry.insert(0, f'{sweep_start / 1e6:.0f}')
+sweep_start_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(sweep_frame, text="to").pack(side=tk.LEFT)
+sweep_stop_entry = tk.Entry(sweep_frame, width=7)
+sweep_stop_entry.insert(0, f'{sweep_stop / 1e6:.0f}')
+sweep_stop_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(sweep_frame, text="Points:").pack(side=tk.LEFT)
+sweep_points_entry = tk.Entry(sweep_frame, width=7)
+sweep_points_entry.insert(0, str(sweep_points))
+sweep_points_entry.pack(side=tk.LEFT, padx=2)
+
+def update_sweep():
+    global show_sweep, sweep_start, sweep_stop, sweep_points
+    try:
+        start = float(sweep_start_entry.get()) * 1e6  # Convert MHz to Hz
+        stop = float(sweep_stop_entry.get()) * 1e6
+        points = int(sweep_points_entry.get())
+        if start <= 0 or stop <= start or points < 2:
+            raise ValueError("Invalid sweep range")
+        sweep_start, sweep_stop, sweep_points = start, stop, points
+    except ValueError:
+        sweep_start_entry.delete(0, tk.END)
+        sweep_start_entry.insert(0, f'{sweep_start / 1e6:.0f}')
+        sweep_stop_entry.delete(0, tk.END)
+        sweep_stop_entry.insert(0, f'{sweep_stop / 1e6:.0f}')
+        sweep_points_entry.delete(0, tk.END)
+        sweep_points_entry.insert(0, str(sweep_points))
+    show_sweep = sweep_var.get()
+    draw_smith_chart.plot_impedance_trajectory()
+
+sweep_var = tk.BooleanVar(value=show_sweep)
+tk.Checkbutton(sweep_frame, text="Show Sweep", variable=sweep_var, command=update_sweep).pack(side=tk.LEFT, padx=5)
+tk.Button(sweep_frame, text="Update Sweep", command=update_sweep).pack(side=tk.LEFT, padx=5)
+sweep_info = tk.StringVar(value='')
+tk.Label(sweep_frame, textvariable=sweep_info).pack(side=tk.LEFT, padx=5)
+
+# Time-domain reflectometry controls; the view follows every network change like the sweep
+TDR_MODES = {  # Label -> (tdr.TDRTransform mode, TDRResult field plotted)
+    'Low-pass Step': ('lowpass', 'impedance'),
+    'Low-pass Impulse': ('lowpass', 'impulse'),
+    'Band-pass Impulse': ('bandpass', 'impulse'),
+}
+tdr_frame = tk.Frame(root)
+tdr_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def update_tdr_settings(event=None):
+    global show_tdr, tdr_mode, tdr_window
+    tdr_mode, tdr_window = tdr_mode_choice.get(), tdr_window_choice.get()
+    show_tdr = tdr_var.get()
+    if not show_tdr:
+        draw_smith_chart.close_tdr()
+    draw_smith_chart.plot_impedance_trajectory()
+
+tk.Label(tdr_frame, text="TDR:").pack(side=tk.LEFT)
+tdr_mode_choice = ttk.Combobox(tdr_frame, values=list(TDR_MODES), width=16, state="readonly")
+tdr_mode_choice.set(tdr_mode)
+tdr_mode_choice.bind("<<ComboboxSelected>>", update_tdr_settings)
+tdr_mode_choice.pack(side=tk.LEFT, padx=2)
+tk.Label(tdr_frame, text="Window:").pack(side=tk.LEFT)
+tdr_window_choice = ttk.Combobox(tdr_frame, values=["Kaiser", "Hann", "None"], width=7, state="readonly")
+tdr_window_choice.set(tdr_window)
+tdr_window_choice.bind("<<ComboboxSelected>>", update_tdr_settings)
+tdr_window_choice.pack(side=tk.LEFT, padx=2)
+tdr_var = tk.BooleanVar(value=show_tdr)
+tk.Checkbutton(tdr_frame, text="Show TDR", variable=tdr_var, command=update_tdr_settings).pack(side=tk.LEFT, padx=5)
+tk.Label(tdr_frame, text="(low-pass uses Points harmonics up to the sweep stop)").pack(side=tk.LEFT)
+
+# Two-port design: stability, available gain and noise circles of a transistor's S-parameters, and a
+# Γ_S/Γ_L picked on the chart as the Auto L-Match target
+GAIN_STEPS_DB = np.arange(0.5, 10, 1.0)  # Gain circles this far below the maximum gain at each frequency
+NOISE_STEPS_DB = np.array([0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 4, 6])  # Noise circles this far above NFmin
+CIRCLE_STYLES = {  # kind -> (color, linestyle)
+    'source stability': ('red', 'dashed'),
+    'load stability': ('magenta', 'dashed'),
+    'gain': ('royalblue', 'solid'),
+    'noise': ('seagreen', 'dotted'),
+}
+twoport_frame = tk.Frame(root)
+twoport_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def load_twoport():
+    global twoport_data, twoport_circles
+    from tkinter import filedialog, messagebox
+    from touchstone import read_touchstone
+    from twoport import available_gain_circles, max_gain_db, noise_circles, stability_circles
+    path = filedialog.askopenfilename(title="Load Two-Port S-Parameters",
+                                      filetypes=[("Touchstone two-port", "*.s2p"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        data = read_touchstone(path)
+        if data.s.ndim != 3 or not data.frequency.size:
+            raise ValueError("Not a two-port file with data points")
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Load Two-Port", str(e))
+        return
+    # Every circle at every frequency, once; the display only picks rows
+    twoport_data = data
+    S = data.s
+    stability = stability_circles(S)
+    twoport_circles = [
+        ('source stability', data.frequency, stability.source_center[:, None], stability.source_radius[:, None]),
+        ('load stability', data.frequency, stability.load_center[:, None], stability.load_radius[:, None]),
+        ('gain', data.frequency, *available_gain_circles(S, max_gain_db(S)[:, None] - GAIN_STEPS_DB)),
+    ]
+    if data.noise is not None:
+        noise = data.noise
+        twoport_circles.append(('noise', noise.frequency, *noise_circles(
+            noise.nf_min_db, noise.gamma_opt, noise.rn, noise.nf_min_db[:, None] + NOISE_STEPS_DB, data.z0)))
+    update_circles()
+
+def update_circles():
+    global show_stability, show_gain, show_noise, circles_all
+    show_stability, show_gain, show_noise = stability_var.get(), gain_var.get(), noise_var.get()
+    circles_all = circles_all_var.get()
+    draw_smith_chart.show_target(None if matching_target is None else impedance_to_gamma(matching_target, Z0))
+    if twoport_data is None:
+        return
+    from smith_plot import CIRCLE_POINTS, circle_segments
+    from twoport import max_gain_db, mu_factor, rollett_k
+    shown = {'source stability': show_stability, 'load stability': show_stability, 'gain': show_gain,
+             'noise': show_noise}
+    gamma, colors, linestyles = [np.empty((0, CIRCLE_POINTS), dtype=complex)], [], []
+    for kind, frequencies, centers, radii in twoport_circles:
+        if not shown[kind]:
+            continue
+        rows = slice(None) if circles_all else [int(np.argmin(np.abs(frequencies - frequency)))]
+        segments = circle_segments(centers[rows], radii[rows])
+        if twoport_data.z0 != Z0:  # Circles map to circles under the change of reference impedance
+            segments = impedance_to_gamma(gamma_to_impedance(segments, twoport_data.z0), Z0)
+        gamma.append(segments)
+        colors += [CIRCLE_STYLES[kind][0]] * len(segments)
+        linestyles += [CIRCLE_STYLES[kind][1]] * len(segments)
+    draw_smith_chart.show_circles(np.concatenate(gamma), colors, linestyles)
+    k = int(np.argmin(np.abs(twoport_data.frequency - frequency)))
+    S = twoport_data.s[k:k + 1]
+    twoport_info.set(f'{twoport_data.frequency[k] / 1e6:.0f} MHz: K {rollett_k(S)[0]:.2f}, μ {mu_factor(S)[0]:.2f}, '
+                     f'max gain {max_gain_db(S)[0]:.1f} dB, {len(colors)} circles'
+                     + ('' if matching_target is None else f', target {format_target()}'))
+
+def format_target():
+    gamma = impedance_to_gamma(matching_target, Z0)
+    return (f'{matching_target.real:.1f}{matching_target.imag:+.1f}j Ω '
+            f'(Γ {abs(gamma):.2f} ∠ {np.degrees(np.angle(gamma)):.0f}°)')
+
+def pick_target(name):
+    global target_pick
+    target_pick = name
+    twoport_info.set(f'Click the chart to pick {name}')
+
+def set_matching_target(gamma):
+    global matching_target, target_pick, l_match_index
+    matching_target = complex(gamma_to_impedance(gamma, Z0))
+    l_match_index = 0
+    twoport_info.set(f'{target_pick} = {format_target()}: Auto L-Match now matches to it')
+    target_pick = None
+    draw_smith_chart.show_target(gamma)
+
+def clear_target():
+    global matching_target, target_pick
+    matching_target = target_pick = None
+    twoport_info.set('Auto L-Match matches to Z₀')
+    draw_smith_chart.show_target(None)
+
+tk.Label(twoport_frame, text="Two-Port:").pack(side=tk.LEFT)
+tk.Button(twoport_frame, text="Load S2P", command=load_twoport).pack(side=tk.LEFT, padx=2)
+stability_var = tk.BooleanVar(value=show_stability)
+tk.Checkbutton(twoport_frame, text="Stability", variable=stability_var, command=update_circles).pack(side=tk.LEFT)
+gain_var = tk.BooleanVar(value=show_gain)
+tk.Checkbutton(twoport_frame, text="Gain", variable=gain_var, command=update_circles).pack(side=tk.LEFT)
+noise_var = tk.BooleanVar(value=show_noise)
+tk.Checkbutton(twoport_frame, text="Noise", variable=noise_var, command=update_circles).pack(side=tk.LEFT)
+circles_all_var = tk.BooleanVar(value=circles_all)
+tk.Checkbutton(twoport_frame, text="All Freqs", variable=circles_all_var, command=update_circles).pack(side=tk.LEFT)
+tk.Button(twoport_frame, text="Pick Γ_S", command=lambda: pick_target('Γ_S')).pack(side=tk.LEFT, padx=2)
+tk.Button(twoport_frame, text="Pick Γ_L", command=lambda: pick_target('Γ_L')).pack(side=tk.LEFT, padx=2)
+tk.Button(twoport_frame, text="Clear Target", command=clear_target).pack(side=tk.LEFT, padx=2)
+twoport_info = tk.StringVar(value='')
+tk.Label(root, textvariable=twoport_info, anchor='w').pack(side=tk.TOP, fill=tk.X, padx=10)
+
+# Population controls: one matching network for many units (a production spread, or measured units)
+population_frame = tk.Frame(root)
+population_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def population_band():
+    # Band and loads of the population: its own band if the loads depend on frequency, else the analysis band
+    if population_frequencies is not None:
+        return population_frequencies, population_loads
+    return analysis_band()[0], population_loads
+
+def set_population(frequencies, loads):
+    global population_loads, population_frequencies, population_version
+    population_frequencies, population_loads = frequencies, loads
+    population_version += 1
+    draw_smith_chart.plot_impedance_trajectory()
+
+def spread_units():
+    if load_impedance is None:
+        population_info.set('Set a load first')
+        return
+    try:
+        units = int(units_entry.get())
+        spread = float(spread_entry.get()) / 100
+        seed = int(seed_entry.get()) if seed_entry.get().strip() else None
+        if units < 1 or spread < 0:
+            raise ValueError("Invalid population settings")
+    except ValueError:
+        population_info.set('Invalid population settings')
+        return
+    from robust_match import spread_population
+    band, load = analysis_band()
+    # A measured load spreads into units over its own band, a fixed load into frequency-independent units
+    set_population(band if measured_load is not None else None, spread_population(load, units, spread, seed=seed))
+
+def load_units():
+    from tkinter import filedialog, messagebox
+    from robust_match import read_population
+    paths = filedialog.askopenfilenames(title="Load Population (one load list, or one S1P per unit)",
+                                        filetypes=[("Load lists and Touchstone", "*.csv *.parquet *.s1p"),
+                                                   ("All files", "*.*")])
+    if not paths:
+        return
+    try:
+        frequencies, loads = read_population(list(paths), points=analysis_band_points)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Load Population", str(e))
+        return
+    set_population(frequencies, loads)
+
+def optimize_population_network():
+    global population_job
+    if population_job is not None:
+        return
+    if population_loads is None or not len(network):
+        population_info.set('Load a population and add matching components first')
+        return
+    if any(element.component in LINE_TYPES for element in network):
+        population_info.set('The optimizer only tunes lumped L/C elements')
+        return
+    from robust_match import optimize_population
+    band, loads = population_band()
+    topology = [element.component for element in network]
+    outcome = {}
+
+    def work():
+        try:
+            outcome['result'] = optimize_population(loads, topology, band, seed=1, z0=Z0)
+        except (ValueError, MemoryError, np.linalg.LinAlgError) as e:
+            outcome['error'] = str(e)
+    # The optimization takes seconds, so it runs in a thread while the controls stay live, polled like the live feed
+    thread = threading.Thread(target=work, daemon=True)
+    population_job = (thread, outcome, topology, Z0, band, len(loads), time.perf_counter())
+    optimize_population_button.config(state="disabled", text="Optimizing...")
+    population_info.set(f'Optimizing the worst case over {len(loads)} units...')
+    thread.start()
+    root.after(100, finish_population_job)
+
+def finish_population_job():
+    global population_job
+    thread, outcome, topology, z0, band, units, start = population_job
+    if thread.is_alive():
+        root.after(100, finish_population_job)
+        return
+    population_job = None
+    optimize_population_button.config(state="normal", text="Optimize Worst Unit")
+    if 'error' in outcome:
+        population_info.set(f'Robust optimization failed: {outcome["error"]}')
+        return
+    if [element.component for element in network] != topology or Z0 != z0:
+        population_info.set('The network or Z0 changed while optimizing, the result was dropped')
+        return
+    match, result = outcome['result']
+    for k, (component, value) in enumerate(match.components):
+        network.set_element(k, value=round(value, 3))
+    refresh_element_choice()
+    draw_smith_chart.plot_impedance_trajectory()
+    analysis_info.set(f'Robust optimization: worst RL {return_loss_db(result.worst_gamma):.1f} dB over '
+                      f'{units} units, {band[0] / 1e6:.0f}–{band[-1] / 1e6:.0f} MHz '
+                      f'({time.perf_counter() - start:.2f} s)')
+
+def clear_population():
+    population_info.set('')
+    set_population(None, None)
+
+tk.Label(population_frame, text="Population:").pack(side=tk.LEFT)
+tk.Label(population_frame, text="Units:").pack(side=tk.LEFT)
+units_entry = tk.Entry(population_frame, width=6)
+units_entry.insert(0, "1000")
+units_entry.pack(side=tk.LEFT, padx=2)
+tk.Label(population_frame, text="Spread ±%:").pack(side=tk.LEFT)
+spread_entry = tk.Entry(population_frame, width=4)
+spread_entry.insert(0, "20")
+spread_entry.pack(side=tk.LEFT, padx=2)
+tk.Button(population_frame, text="Spread Load", command=spread_units).pack(side=tk.LEFT, padx=2)
+tk.Button(population_frame, text="Load Units", command=load_units).pack(side=tk.LEFT, padx=2)
+optimize_population_button = tk.Button(population_frame, text="Optimize Worst Unit", command=optimize_population_network)
+optimize_population_button.pack(side=tk.LEFT, padx=2)
+tk.Button(population_frame, text="Clear", command=clear_population).pack(side=tk.LEFT, padx=2)
+population_info = tk.StringVar(value='')
+tk.Label(root, textvariable=population_info, anchor='w').pack(side=tk.TOP, fill=tk.X, padx=10)
+
+# Chart grid controls
+chart_frame = tk.Frame(root)
+chart_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+def update_grid(event=None):
+    global Z0, grid_density, show_admittance
+    Z0 = int(z0_choice.get())
+    grid_density = density_choice.get()
+    show_admittance = admittance_var.get()
+    draw_smith_chart.redraw_grid()
+    update_circles()  # Circles and the target are kept in S-parameter and impedance terms, redrawn for the new Z0
+    if live_feed is not None:
+        show_live_buffer()  # Also while the feed is stopped, its last samples stay on the chart
+
+tk.Label(chart_frame, text="Z₀ (Ω):").pack(side=tk.LEFT)
+z0_choice = ttk.Combobox(chart_frame, values=["50", "75", "100"], width=5, state="readonly")
+z0_choice.set(str(Z0))
+z0_choice.bind("<<ComboboxSelected>>", update_grid)
+z0_choice.pack(side=tk.LEFT, padx=2)
+tk.Label(chart_frame, text="Grid:").pack(side=tk.LEFT)
+density_choice = ttk.Combobox(chart_frame, values=["Standard", "Dense", "Very Dense"], width=10, state="readonly")
+density_choice.set(grid_density)
+density_choice.bind("<<ComboboxSelected>>", update_grid)
+density_choice.pack(side=tk.LEFT, padx=2)
+admittance_var = tk.BooleanVar(value=show_admittance)
+tk.Checkbutton(chart_frame, text="Admittance Overlay", variable=admittance_var,
+               command=update_grid).pack(side=tk.LEFT, padx=5)
+
+# Session files: settings, network and arrays (measured load, Monte Carlo result) in one file,
+# with the arrays memory-mapped on open so large measurements only load when plotted
+def set_entry(entry, text):
+    entry.delete(0, tk.END)
+    entry.insert(0, text)
+
+def save_session_file():
+    from tkinter import filedialog, messagebox
+    from session import network_state, save_session, tolerance_state
+    path = filedialog.asksaveasfilename(title="Save Session", defaultextension=".smith",
+                                        filetypes=[("Smith chart session", "*.smith"), ("All files", "*.*")])
+    if not path:
+        return
+    state = {
+        'z0': Z0, 'grid_density': grid_density, 'show_admittance': show_admittance,
+        'gamma_value': gamma_value, 'show_circle': show_circle, 'frequency': frequency,
+        'component_type': component_type.get(), 'component_value': component_value,
+        'line_impedance': line_impedance_entry.get(), 'eeff': eeff_entry.get(),
+        'sweep': [sweep_start, sweep_stop, sweep_points, show_sweep],
+        'tolerance_settings': [tolerance_choice.get(), load_tolerance_entry.get(), samples_entry.get(),
+                               seed_entry.get(), show_cloud],
+        'network': network_state(network),
+    }
+    arrays = {}
+    if measured_load is not None:
+        arrays.update(measured_frequencies=measured_frequencies, measured_load=measured_load)
+    if tolerance_result is not None:
+        state['tolerance'], tolerance_arrays = tolerance_state(tolerance_result)
+        state['tolerance_key'] = [tolerance_key[0], list(tolerance_key[1])]
+        arrays.update(tolerance_arrays)
+    try:
+        save_session(path, state, arrays)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Save Session", str(e))
+
+def open_session_file():
+    global Z0, grid_density, show_admittance, show_circle, frequency, component_value, network, load_impedance
+    global measured_frequencies, measured_load, sweep_start, sweep_stop, sweep_points, show_sweep, show_cloud
+    global tolerance_result, tolerance_key, selected_element
+    from tkinter import filedialog, messagebox
+    from session import from_json, load_session, network_from_state, tolerance_from_state
+    path = filedialog.askopenfilename(title="Open Session",
+                                      filetypes=[("Smith chart session", "*.smith"), ("All files", "*.*")])
+    if not path:
+        return
+    # Every value is read before any global changes, so a truncated or older file leaves the session as it was
+    try:
+        state, arrays = load_session(path)
+        restored_network = network_from_state(state['network'])
+        restored_tolerance = tolerance_from_state(state['tolerance'], arrays) if 'tolerance' in state else None
+        restored_key = None
+        if 'tolerance_key' in state:
+            restored_key = (state['tolerance_key'][0], tuple(from_json(point) for point in state['tolerance_key'][1]))
+        view = state['z0'], state['grid_density'], state['show_admittance'], state['show_circle']
+        controls = state['frequency'], state['component_value'], state['gamma_value']
+        component, line_impedance, eeff = state['component_type'], state['line_impedance'], state['eeff']
+        restored_sweep = tuple(state['sweep'])
+        tolerance, load_tolerance, samples, seed, restored_cloud = state['tolerance_settings']
+        if len(restored_sweep) != 4:
+            raise ValueError("Bad sweep settings in the session file")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        messagebox.showerror("Open Session", str(e))
+        return
+    Z0, grid_density, show_admittance, show_circle = view
+    frequency, component_value, gamma = controls
+    sweep_start, sweep_stop, sweep_points, show_sweep = restored_sweep
+    network, load_impedance, selected_element = restored_network, restored_network.load, 0
+    measured_frequencies, measured_load = arrays.get('measured_frequencies'), arrays.get('measured_load')
+    tolerance_result, tolerance_key, show_cloud = restored_tolerance, restored_key, restored_cloud
+    # Move the controls to the restored state
+    z0_choice.set(str(Z0))
+    density_choice.set(grid_density)
+    admittance_var.set(show_admittance)
+    show_var.set(show_circle)
+    component_type.set(component)
+    component_value_slider.set(component_value)
+    frequency_slider.set(frequency / 1e6)
+    set_entry(line_impedance_entry, line_impedance)
+    set_entry(eeff_entry, eeff)
+    set_entry(sweep_start_entry, f'{sweep_start / 1e6:.0f}')
+    set_entry(sweep_stop_entry, f'{sweep_stop / 1e6:.0f}')
+    set_entry(sweep_points_entry, str(sweep_points))
+    sweep_var.set(show_sweep)
+    tolerance_choice.set(tolerance)
+    set_entry(load_tolerance_entry, load_tolerance)
+    set_entry(samples_entry, samples)
+    set_entry(seed_entry, seed)
+    cloud_var.set(show_cloud)
+    if load_impedance is not None:
+        set_entry(load_r_entry, f'{load_impedance.real:.1f}')
+        set_entry(load_x_entry, f'{load_impedance.imag:.1f}')
+    refresh_element_choice()
+    set_gamma_state(gamma=gamma)
+    draw_smith_chart.redraw_grid()  # Z0 may have changed, and the whole trajectory is new
+
+tk.Button(chart_frame, text="Save Session", command=save_session_file).pack(side=tk.LEFT, padx=2)
+tk.Button(chart_frame, text="Open Session", command=open_session_file).pack(side=tk.LEFT, padx=2)
+
+# Instrumentation (SMITHCHART_PROFILE): the overlay is refreshed twice a second and the recording
+# can be saved as a summary or a Chrome trace at any time
+profile_ms = 500
+
+def refresh_profile():
+    draw_smith_chart.show_profile(instrumentation.recorder.overlay_text())
+    root.after(profile_ms, refresh_profile)
+
+def save_profile_file():
+    from tkinter import filedialog, messagebox
+    path = filedialog.asksaveasfilename(title="Save Profile", defaultextension=".json",
+                                        filetypes=[("Latency summary", "*.json"), ("Chrome trace", "*.trace.json")])
+    if not path:
+        return
+    try:
+        instrumentation.recorder.dump(path)
+    except OSError as e:
+        messagebox.showerror("Save Profile", str(e))
+
+if instrumentation.recorder is not None:
+    tk.Button(chart_frame, text="Save Profile", command=save_profile_file).pack(side=tk.LEFT, padx=2)
+
+# Live Γ feed: an asyncio reader thread fills a ring buffer, polled and drawn once per frame here
+live_frame = tk.Frame(root)
+live_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+live_feed = None  # LiveFeed while a source is open
+live_written = 0  # Ring buffer position of the last drawn frame
+live_frame_time = 0.0  # perf_counter() of the last poll
+live_pending = None  # after() id of the next poll
+live_z0 = 50  # Reference impedance of the Γ samples a source sends
+
+def show_live_buffer():
+    # Every sample in the ring buffer, re-referenced from the source's Z0 to the chart's
+    gamma = live_feed.buffer.latest()[1]
+    if live_z0 != Z0:
+        gamma = impedance_to_gamma(gamma_to_impedance(gamma, live_z0), Z0)
+    draw_smith_chart.show_live(gamma)
+
+def live_tick():
+    global live_written, live_frame_time, live_pending
+    live_pending = None
+    if live_feed is None:
+        return
+    now = time.perf_counter()
+    buffer = live_feed.buffer
+    if buffer.written != live_written:  # Only draw when new samples arrived
+        live_feed.count_frame(frame_ms / 1000, now - live_frame_time)
+        live_written = buffer.written
+        buffer.read()  # Everything up to here is on screen
+        show_live_buffer()
+    live_frame_time = now
+    stats = live_feed.stats()
+    live_info.set(f'{stats.received} samples, {stats.dropped} dropped, {stats.stalls} stalls, '
+                  f'{stats.frames} frames, {stats.skipped_frames} skipped'
+                  + (f', {stats.parse_errors} bad lines' if stats.parse_errors else '')
+                  + ('' if live_feed.running else f' (stopped{": " + stats.error if stats.error else ""})'))
+    if live_feed.running:
+        live_pending = root.after(frame_ms, live_tick)
+    else:
+        live_button.config(text="Start Live")  # The source ended or failed
+
+def toggle_live():
+    global live_feed, live_written, live_frame_time, live_pending
+    if live_feed is not None and live_feed.running:
+        live_feed.stop()
+        live_button.config(text="Start Live")
+        return
+    from live_feed import LiveFeed
+    live_feed = LiveFeed(live_source_entry.get().strip(), live_protocol.get(),
+                         overflow='block' if live_block_var.get() else 'drop')
+    live_written = 0
+    live_frame_time = time.perf_counter()
+    live_feed.start()
+    live_button.config(text="Stop Live")
+    if live_pending is not None:
+        root.after_cancel(live_pending)  # The poll of a previous feed
+    live_pending = root.after(frame_ms, live_tick)
+
+tk.Label(live_frame, text="Live Source:").pack(side=tk.LEFT)
+live_source_entry = tk.Entry(live_frame, width=22)
+live_source_entry.insert(0, 'tcp://127.0.0.1:5025')
+live_source_entry.pack(side=tk.LEFT, padx=2)
+live_protocol = ttk.Combobox(live_frame, values=["text", "binary"], width=6, state="readonly")
+live_protocol.set("text")
+live_protocol.pack(side=tk.LEFT, padx=2)
+live_block_var = tk.BooleanVar(value=False)
+tk.Checkbutton(live_frame, text="Backpressure", variable=live_block_var).pack(side=tk.LEFT)
+live_button = tk.Button(live_frame, text="Start Live", command=toggle_live)
+live_button.pack(side=tk.LEFT, padx=5)
+live_info = tk.StringVar(value='')
+tk.Label(live_frame, textvariable=live_info).pack(side=tk.LEFT, padx=5)
+
 # Draw the Smith Chart
 draw_smith_chart()
-
-# Start the Tkinter event loop
-root.mainloop()
+if instrumentation.recorder is not None:
+    root.after(profile_ms, refresh_profile)
 
 if __name__ == "__main__":
-    pass
+    # Start the Tkinter event loop
+    root.mainloop()
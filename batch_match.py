@@ -0,0 +1,338 @@
+"""Command-line batch matcher over CSV/Parquet load lists.
+
+Runs the Set Load -> Add Component workflow unattended: every load (one per
+DUT serial) is either evaluated through a fixed matching network or matched
+with the closed-form L/Pi/T synthesizer, and the element values, Γ, VSWR and
+return loss are streamed to CSV or JSONL as each chunk finishes. Loads are
+read and processed in chunks, so memory stays bounded however long the list
+is. Tk and matplotlib are never imported, except by the optional PNG stage,
+which draws each DUT's Smith chart with the Agg backend.
+
+Input columns (case-insensitive): r and x in ohms, plus optional serial and
+frequency (Hz, overrides --frequency). The components column of CSV output
+uses the --network syntax, so any row's network can be evaluated again. Example:
+
+    python batch_match.py loads.csv -o results.jsonl --mode l --frequency 1e9 --workers 4
+"""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from matching_synth import component_table, l_section, pi_network, t_network
+from smith_engine import (COMPONENT_TYPES, LINE_TYPES, Z0, add_series_component, add_shunt_component,
+                          apply_component, evaluate_network, impedance_to_gamma, return_loss_db, vswr)
+
+FIELDS = ['serial', 'frequency', 'load_r', 'load_x', 'solution', 'components',
+          'gamma_re', 'gamma_im', 'gamma_mag', 'vswr', 'return_loss_db']
+
+
+def parse_network(spec, z0=Z0):
+    """Parse 'Series Inductor=5.6,Shunt Capacitor=2.2' into [(component type, value in nH/pF), ...].
+
+    Lines and stubs take a length in mm with optional line impedance and εeff, 'Series Line=12.5:35:2.2',
+    and parse to (component type, length, line impedance, εeff).
+    """
+    components = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        component, value = item.split('=')
+        component = ' '.join(word.capitalize() for word in component.split())
+        if component not in COMPONENT_TYPES:
+            raise ValueError(f"Unknown component type: {component}")
+        if component in LINE_TYPES:
+            length, line_impedance, eeff = (value.split(':') + ['', ''])[:3]
+            components.append((component, float(length), float(line_impedance or z0), float(eeff or 1.0)))
+        else:
+            components.append((component, float(value)))
+    return components
+
+
+def format_network(components):
+    """Inverse of parse_network: 'Series Inductor=5.6,Series Line=12.5:35:2.2' for a component list."""
+    return ','.join(f'{component}=' + ':'.join(f'{number:.10g}' for number in values)
+                    for component, *values in components)
+
+
+def read_csv_loads(path, chunk_size, frequency):
+    """Yield (serials, loads, frequencies) chunks from a CSV file."""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader)]
+        if 'r' not in header or 'x' not in header:
+            raise ValueError("Load list needs 'r' and 'x' columns")
+        r_col, x_col = header.index('r'), header.index('x')
+        serial_col = header.index('serial') if 'serial' in header else None
+        freq_col = header.index('frequency') if 'frequency' in header else None
+        width = max(col for col in (r_col, x_col, serial_col, freq_col) if col is not None) + 1
+        row_number = 0
+        while True:
+            raw_rows = 0
+            rows, values = [], []
+            for row in itertools.islice(reader, chunk_size):
+                raw_rows += 1
+                if not row:  # Skip blank lines
+                    continue
+                # reader.line_num is the line this row ended on, the header being line 1
+                if len(row) < width:
+                    raise ValueError(f"Row {reader.line_num}: {len(row)} fields, the r/x/serial/frequency columns "
+                                     f"need {width}")
+                try:
+                    values.append([float(row[col]) for col in (r_col, x_col, freq_col) if col is not None])
+                except ValueError as e:
+                    raise ValueError(f"Row {reader.line_num}: {e}") from None
+                rows.append(row)
+            if not raw_rows:
+                return
+            if not rows:
+                continue
+            values = np.array(values)
+            serials = [row[serial_col] if serial_col is not None else str(row_number + i) for i, row in enumerate(rows)]
+            loads = values[:, 0] + 1j * values[:, 1]
+            frequencies = values[:, 2] if freq_col is not None else np.full(len(rows), frequency)
+            row_number += len(rows)
+            yield serials, loads, frequencies
+
+
+def read_parquet_loads(path, chunk_size, frequency):
+    """Yield (serials, loads, frequencies) chunks from a Parquet file (needs pyarrow)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Reading Parquet load lists needs pyarrow (pip install pyarrow)")
+    parquet = pq.ParquetFile(path)
+    columns = {name.lower(): name for name in parquet.schema_arrow.names}
+    if 'r' not in columns or 'x' not in columns:
+        raise ValueError("Load list needs 'r' and 'x' columns")
+    row_number = 0
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=list(columns.values())):
+        data = {name.lower(): column for name, column in zip(batch.schema.names, batch.columns)}
+        loads = data['r'].to_numpy().astype(float) + 1j * data['x'].to_numpy().astype(float)
+        if 'serial' in data:
+            serials = [str(serial) for serial in data['serial'].to_pylist()]
+        else:
+            serials = [str(row_number + i) for i in range(len(loads))]
+        if 'frequency' in data:
+            frequencies = data['frequency'].to_numpy().astype(float)
+        else:
+            frequencies = np.full(len(loads), frequency)
+        row_number += len(loads)
+        yield serials, loads, frequencies
+
+
+def read_loads(path, chunk_size, frequency):
+    """Yield load chunks from a .csv or .parquet file."""
+    if path.lower().endswith(('.parquet', '.pq')):
+        return read_parquet_loads(path, chunk_size, frequency)
+    return read_csv_loads(path, chunk_size, frequency)
+
+
+def apply_reactances(loads, topology, reactance):
+    """Impedance after each element of a synthesized solution, as a list of arrays starting with the load."""
+    points = [loads]
+    for position, X in zip(topology, reactance):
+        if position == 'series':
+            points.append(add_series_component(points[-1], X))
+        else:
+            points.append(add_shunt_component(points[-1], X))  # Infinite reactance adds nothing
+    return points
+
+
+def process_chunk(chunk, mode, network, q, solutions, z0, png_dir):
+    """Match one chunk of loads and return its output records (and write PNGs when asked)."""
+    serials, loads, frequencies = chunk
+    records = []
+    trajectories = []
+
+    if mode == 'evaluate':
+        matched = evaluate_network(loads, network, frequencies)
+        gamma = impedance_to_gamma(matched, z0)
+        for i, serial in enumerate(serials):
+            records.append(make_record(serial, frequencies[i], loads[i], 'network', network, gamma[i]))
+            if png_dir:  # Scalar walk through the network, only needed for the charts
+                points = [loads[i]]
+                for component, value, *line in network:
+                    points.append(apply_component(points[-1], component, value, frequencies[i], *line))
+                trajectories.append(points)
+    else:
+        if mode == 'l':
+            candidates = l_section(loads, z0)
+        elif mode == 'pi':
+            candidates = pi_network(loads, q, z0)
+        else:
+            candidates = t_network(loads, q, z0)
+        # Values and matched Γ for every candidate and every load in one vectorized pass each
+        tables = []
+        for candidate in candidates:
+            is_inductor, values = component_table(candidate, frequencies)
+            points = apply_reactances(loads, candidate.topology, candidate.reactance)
+            tables.append((candidate, is_inductor, values, points, impedance_to_gamma(points[-1], z0)))
+        for i, serial in enumerate(serials):
+            found = False
+            for candidate, is_inductor, values, points, gamma in tables:
+                if not candidate.valid[i]:
+                    continue
+                components = []
+                for k, position in enumerate(candidate.topology):
+                    X = candidate.reactance[k, i]
+                    if (position == 'series' and X == 0) or np.isinf(X):
+                        continue  # Element vanishes
+                    kind = "Inductor" if is_inductor[k, i] else "Capacitor"
+                    components.append((f'{position.capitalize()} {kind}', float(values[k, i])))
+                records.append(make_record(serial, frequencies[i], loads[i], candidate.name, components, gamma[i]))
+                if png_dir:
+                    trajectories.append([point[i] for point in points])
+                found = True
+                if solutions == 'first':
+                    break
+            if not found:
+                records.append(make_record(serial, frequencies[i], loads[i], None, [],
+                                           impedance_to_gamma(loads[i], z0)))
+                if png_dir:
+                    trajectories.append([loads[i]])
+
+    if png_dir:
+        from smith_plot import render_chart  # Only the optional PNG stage touches matplotlib
+        for record, points in zip(records, trajectories):
+            name = re.sub(r'[^A-Za-z0-9_.-]', '_', record['serial'])
+            if record['solution'] is not None and solutions == 'all':
+                name += '_' + re.sub(r'[^A-Za-z0-9]+', '_', record['solution']).strip('_')
+            render_chart(os.path.join(png_dir, name + '.png'), points, z0=z0,
+                         title=f"DUT {record['serial']} at {record['frequency'] / 1e6:.1f} MHz (Z₀ = {z0} Ω)")
+    return records
+
+
+def finite(value):
+    """value as a float, or None (null in JSON, empty in CSV) for infinities and NaN."""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def make_record(serial, frequency, load, solution, components, gamma):
+    """One output record for a DUT and matching solution."""
+    return {
+        'serial': serial,
+        'frequency': float(frequency),
+        'load_r': finite(load.real),
+        'load_x': finite(load.imag),
+        'solution': solution,
+        'components': components,
+        'gamma_re': finite(gamma.real),
+        'gamma_im': finite(gamma.imag),
+        'gamma_mag': finite(abs(gamma)),
+        'vswr': finite(vswr(gamma)),  # Infinite at |Γ| = 1 (a short, open or pure reactance)
+        'return_loss_db': finite(return_loss_db(gamma)),  # Infinite at a perfect match
+    }
+
+
+class RecordWriter:
+    """Stream records to CSV or JSONL, flushing after every chunk."""
+
+    def __init__(self, path, format=None):
+        # Files are written under a temporary name and only replace path once the whole input was read
+        self.path = path
+        self.temporary = None if path == '-' else f'{path}.{os.getpid()}.tmp'
+        self.file = sys.stdout if path == '-' else open(self.temporary, 'w', newline='')
+        self.format = format or ('jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv')
+        if self.format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, records):
+        for record in records:
+            if self.format == 'csv':
+                row = dict(record)
+                row['components'] = format_network(record['components'])  # Reads back with --network
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(record, allow_nan=False) + '\n')
+        self.file.flush()
+
+    def close(self, complete=True):
+        """Close the output, replacing path with it if complete, else dropping it (path is left alone)."""
+        if self.file is not sys.stdout:
+            self.file.close()
+            if complete:
+                os.replace(self.temporary, self.path)
+            else:
+                os.remove(self.temporary)
+
+
+def run(input_path, output_path, mode='l', network=(), q=None, frequency=1e9, z0=Z0, solutions='first',
+        workers=1, chunk_size=10000, png_dir=None, format=None):
+    """Match every load in input_path and stream results to output_path, returns the number of records."""
+    if mode in ('pi', 't') and q is None:
+        raise ValueError("Pi and T synthesis need a loaded Q (--q)")
+    if mode == 'evaluate' and not network:
+        raise ValueError("Evaluate mode needs a network (--network)")
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+    # The input is opened and its header and first chunk checked before any output is created
+    chunks = read_loads(input_path, chunk_size, frequency)
+    first = next(chunks, None)
+    chunks = itertools.chain([] if first is None else [first], chunks)
+    writer = RecordWriter(output_path, format)
+    options = (mode, list(network), q, solutions, z0, png_dir)
+    count = 0
+    complete = False
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                records = process_chunk(chunk, *options)
+                writer.write(records)
+                count += len(records)
+        else:
+            # Keep only a few chunks in flight so the whole list is never held in memory
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = collections.deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(process_chunk, chunk, *options))
+                    if len(pending) >= 2 * workers:
+                        records = pending.popleft().result()
+                        writer.write(records)
+                        count += len(records)
+                while pending:
+                    records = pending.popleft().result()
+                    writer.write(records)
+                    count += len(records)
+        complete = True
+    finally:
+        writer.close(complete)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch impedance matching over a CSV/Parquet load list.")
+    parser.add_argument('input', help="Load list (.csv or .parquet) with r, x and optional serial, frequency columns")
+    parser.add_argument('-o', '--output', default='-', help="Output .csv or .jsonl file (default: CSV to stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Output format (default: from the file extension)")
+    parser.add_argument('--mode', choices=['l', 'pi', 't', 'evaluate'], default='l',
+                        help="Synthesize L/Pi/T matches or evaluate a fixed --network (default: l)")
+    parser.add_argument('--network', default='',
+                        help="Fixed network from the load outward, e.g. 'Series Inductor=5.6,Shunt Capacitor=2.2' (nH/pF), "
+                             "lines as 'Series Line=12.5:50:1' (mm:Ω:εeff)")
+    parser.add_argument('--q', type=float, help="Loaded Q for Pi and T synthesis")
+    parser.add_argument('--frequency', type=float, default=1e9, help="Frequency in Hz when the list has none (default: 1e9)")
+    parser.add_argument('--z0', type=float, default=Z0, help=f"Characteristic impedance (default: {Z0})")
+    parser.add_argument('--solutions', choices=['first', 'all'], default='first',
+                        help="Write the first valid solution per DUT or all of them (default: first)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Loads per chunk (default: 10000)")
+    parser.add_argument('--png-dir', help="Also render a Smith chart PNG per DUT into this directory (Agg backend)")
+    args = parser.parse_args(argv)
+    try:
+        count = run(args.input, args.output, args.mode, parse_network(args.network, args.z0), args.q, args.frequency,
+                    args.z0, args.solutions, args.workers, args.chunk_size, args.png_dir, args.format)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"batch_match: {e}\n")
+    print(f"Wrote {count} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
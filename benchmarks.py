@@ -0,0 +1,355 @@
+"""Benchmark suite for the conversion kernels and the chart, drawn with the Agg backend.
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json  # Exit status 1 if anything got slower or did not run
+    python benchmarks.py --suite kernels chart    # Only what runs without a display (CI)
+
+The kernels suite times impedance_to_gamma, gamma_to_impedance,
+add_series_component and add_shunt_component at several array sizes. The chart
+suite draws through smith_plot on an Agg canvas, so it needs no display: chart
+construction, trajectories of 10, 100 and 1000 element networks (whole network
+and an edit of the last element), a decimated sweep trace, a hover readout
+blitted over the cached background, and render_chart to PNG.
+
+The gui suite loads SmithChart.py itself with the Agg backend and times
+draw_smith_chart construction (to the first paint), plot_impedance_trajectory
+on the same networks, a storm of hover events through the canvas callbacks and
+a storm of |Γ| slider events with its coalesced flush. The control window is
+still a Tk window, so this suite needs a display (e.g. xvfb-run); without one
+it is reported as skipped.
+
+Each result is the median (and minimum) seconds per call over several repeats,
+written as JSON with the suite it belongs to. Given a baseline file (an
+earlier output), every result is compared with it and those more than
+--threshold slower are reported as regressions. Baseline results of the
+requested suites that did not run (a skipped suite, a removed benchmark) are
+reported as missing and fail the comparison too.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from collections import namedtuple
+
+os.environ.setdefault('MPLBACKEND', 'Agg')  # Before SmithChart.py imports pyplot
+
+import numpy as np
+
+from network import Element, Network
+from smith_engine import Z0, add_series_component, add_shunt_component, gamma_to_impedance, impedance_to_gamma
+
+RESULTS_VERSION = 1
+KERNEL_SIZES = (100, 10_000, 1_000_000)
+TRAJECTORY_SIZES = (10, 100, 1000)
+HOVER_EVENTS = 500
+SLIDER_EVENTS = 500
+SWEEP_POINTS = 1_000_000
+SUITES = ('kernels', 'chart', 'gui')
+MIN_TIME = 0.05  # Calls per repeat are raised until a repeat takes at least this long (seconds)
+THRESHOLD = 0.15  # Slowdown reported as a regression (fraction of the baseline)
+
+Comparison = namedtuple('Comparison', ['name', 'baseline', 'current', 'ratio', 'regressed'])
+
+
+def measure(fn, repeats=5, min_time=MIN_TIME):
+    """Seconds per call of fn, as a result dict with the median and minimum over repeats."""
+    number = 1
+    while True:  # Calibrate so the timer resolution does not matter for fast kernels
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': repeats, 'number': number}
+
+
+def kernel_suite(sizes=KERNEL_SIZES, repeats=5):
+    """{name: result} for the conversion kernels on random impedances of each size."""
+    rng = np.random.default_rng(1)
+    results = {}
+    for n in sizes:
+        Z = rng.uniform(1, 200, n) + 1j * rng.uniform(-200, 200, n)
+        gamma = impedance_to_gamma(Z)
+        reactance = rng.uniform(-100, 100, n)
+        for name, fn in [('impedance_to_gamma', lambda: impedance_to_gamma(Z, Z0)),
+                         ('gamma_to_impedance', lambda: gamma_to_impedance(gamma, Z0)),
+                         ('add_series_component', lambda: add_series_component(Z, reactance)),
+                         ('add_shunt_component', lambda: add_shunt_component(Z, reactance))]:
+            results[f'{name}[n={n}]'] = measure(fn, repeats)
+    return results
+
+
+def ladder_network(n, load=10 + 5j):
+    """Alternating series L / shunt C network of n elements, a long trajectory that stays on the chart."""
+    return Network(load, [Element('Series Inductor' if k % 2 == 0 else 'Shunt Capacitor',
+                                  0.5 + 0.01 * (k % 7), 1e9) for k in range(n)])
+
+
+def hover_spiral(events):
+    """Γ positions of a pointer spiralling out from the chart center."""
+    t = np.linspace(0, 6 * np.pi, events)
+    return np.column_stack([0.9 * t / t[-1] * np.cos(t), 0.9 * t / t[-1] * np.sin(t)])
+
+
+def chart_suite(sizes=TRAJECTORY_SIZES, repeats=5, hover_events=HOVER_EVENTS, sweep_points=SWEEP_POINTS):
+    """{name: result} for chart drawing through smith_plot on an Agg canvas; needs no display."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from smith_geometry import GRID_DENSITIES, chart_geometry, grid_values
+    from smith_plot import DecimatedLine, draw_chart_grid, format_impedance, plot_trajectory, render_chart
+    geometry, _ = chart_geometry(*grid_values(GRID_DENSITIES['Standard']), z0=Z0)
+    results = {}
+
+    def new_chart():
+        fig = Figure(figsize=(12, 10))
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes([0.15, 0.05, 0.80, 0.90])
+        draw_chart_grid(ax, Z0, geometry)
+        return fig, ax
+    results['chart_construct'] = measure(lambda: new_chart()[0].canvas.draw(), repeats, min_time=0)
+
+    fig, ax = new_chart()
+    grid = len(ax.lines), len(ax.collections), len(ax.texts)
+
+    def replot(network):
+        # The trajectory artists are replaced, the grid stays
+        for artist in list(ax.lines[grid[0]:]) + list(ax.collections[grid[1]:]) + list(ax.texts[grid[2]:]):
+            artist.remove()
+        plot_trajectory(ax, network.points(), Z0, network.paths(Z0))
+        fig.canvas.draw()
+
+    for n in sizes:
+        results[f'chart_trajectory[n={n}]'] = measure(lambda: replot(ladder_network(n)), repeats, min_time=0)
+        network = ladder_network(n)
+        values = iter(np.tile([0.5, 0.6], 1 << 20))
+
+        def edit_last():
+            network.set_element(n - 1, value=next(values))
+            replot(network)
+        results[f'chart_trajectory_edit[n={n}]'] = measure(edit_last, repeats, min_time=0)
+
+    # A long sweep, decimated to the pixels of the view at every draw
+    replot(ladder_network(10))
+    gamma = impedance_to_gamma(ladder_network(10).sweep(np.linspace(100e6, 10e9, sweep_points)), Z0)
+    sweep_line = ax.add_line(DecimatedLine(gamma.real, gamma.imag, color='darkorange', linewidth=1.5))
+    results[f'chart_sweep_draw[n={sweep_points}]'] = measure(fig.canvas.draw, repeats, min_time=0)
+    sweep_line.remove()
+
+    # Hover readout blitted over the cached chart, as the GUI's blit_overlay does
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    readout = ax.text(0.05, 0.95, '', transform=ax.transAxes, fontsize=10, animated=True,
+                      bbox=dict(facecolor='white', alpha=0.8, edgecolor='black'))
+    positions = hover_spiral(hover_events)
+
+    def hover_storm():
+        for x, y in positions:
+            fig.canvas.restore_region(background)
+            readout.set_text(format_impedance(gamma_to_impedance(complex(x, y), Z0)))
+            ax.draw_artist(readout)
+            fig.canvas.blit(fig.bbox)
+    result = measure(hover_storm, repeats, min_time=0)
+    results['chart_hover_blit_event'] = dict(result, median=result['median'] / hover_events,
+                                             min=result['min'] / hover_events, events=hover_events)
+
+    network = ladder_network(100)
+    results['render_chart_png[n=100]'] = measure(
+        lambda: render_chart(io.BytesIO(), network.points(), z0=Z0, format='png', paths=network.paths(Z0)),
+        repeats, min_time=0)
+    return results
+
+
+def gui_suite(sizes=TRAJECTORY_SIZES, repeats=5, hover_events=HOVER_EVENTS, slider_events=SLIDER_EVENTS):
+    """{name: result} for the chart, run on SmithChart.py itself; needs a Tk display."""
+    import matplotlib.pyplot as plt
+    from matplotlib.backend_bases import MouseEvent
+    here = os.path.dirname(os.path.abspath(__file__))
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # plt.show() under Agg
+        # The module globals themselves, the benchmarks replace the network and read the update state
+        path = os.path.join(here, 'SmithChart.py')
+        g = {'__name__': 'smithchart_benchmark', '__file__': path}
+        with open(path, encoding='utf-8') as f:
+            exec(compile(f.read(), path, 'exec'), g)
+        g['root'].withdraw()
+        try:
+            results = {}
+
+            def construct():
+                plt.close('all')
+                g['draw_smith_chart']()
+                plt.gcf().canvas.draw()  # To the first paint, as at startup
+            results['draw_smith_chart'] = measure(construct, repeats, min_time=0)
+            fig = plt.gcf()
+            ax = fig.axes[0]
+
+            for n in sizes:
+                def whole():
+                    g['network'] = ladder_network(n)  # Nothing cached, every point and path is computed
+                    g['draw_smith_chart'].plot_impedance_trajectory()
+                results[f'plot_impedance_trajectory[n={n}]'] = measure(whole, repeats, min_time=0)
+                values = iter(np.tile([0.5, 0.6], 1 << 20))
+
+                def edit_last():
+                    g['network'].set_element(n - 1, value=next(values))
+                    g['draw_smith_chart'].plot_impedance_trajectory()
+                results[f'plot_impedance_trajectory_edit[n={n}]'] = measure(edit_last, repeats, min_time=0)
+
+            # Hover over a 100 element trajectory: every event snaps to the nearest point and blits the readout
+            g['network'] = ladder_network(100)
+            g['draw_smith_chart'].plot_impedance_trajectory()
+            fig.canvas.draw()  # Captures the background the readout is blitted over
+            pixels = ax.transData.transform(hover_spiral(hover_events))
+            events = [MouseEvent('motion_notify_event', fig.canvas, x, y) for x, y in pixels]
+
+            def hover_storm():
+                for event in events:
+                    fig.canvas.callbacks.process('motion_notify_event', event)
+            result = measure(hover_storm, repeats, min_time=0)
+            results['hover_storm_event'] = dict(result, median=result['median'] / hover_events,
+                                                min=result['min'] / hover_events, events=hover_events)
+
+            # |Γ| slider dragged: each event only updates the state, then one coalesced flush redraws
+            slider_values = [f'{0.1 + 0.8 * k / slider_events:.2f}' for k in range(slider_events)]
+
+            def slider_storm():
+                for value in slider_values:
+                    g['on_gamma_slider_change'](value)
+                if g['pending_update'] is not None:
+                    g['root'].after_cancel(g['pending_update'])
+                g['flush_update']()
+            result = measure(slider_storm, repeats, min_time=0)
+            results['slider_storm'] = dict(result, events=slider_events)
+            return results
+        finally:
+            g['root'].destroy()
+            plt.close('all')
+
+
+def display_error():
+    """Why Tk cannot open a window here, or None if it can."""
+    import tkinter as tk
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        return str(e)
+    return None
+
+
+def run(suites=SUITES, quick=False):
+    """Results dict (JSON-compatible) of the named suites; each result records its suite."""
+    import matplotlib
+    results, skipped = {}, {}
+    repeats = 3 if quick else 5
+    sizes = TRAJECTORY_SIZES[:2] if quick else TRAJECTORY_SIZES
+
+    def add(suite, suite_results):
+        results.update({name: dict(result, suite=suite) for name, result in suite_results.items()})
+    if 'kernels' in suites:
+        add('kernels', kernel_suite(KERNEL_SIZES[:2] if quick else KERNEL_SIZES, repeats))
+    if 'chart' in suites:
+        add('chart', chart_suite(sizes, repeats, sweep_points=SWEEP_POINTS // 10 if quick else SWEEP_POINTS))
+    if 'gui' in suites:
+        error = display_error()
+        if error is None:
+            add('gui', gui_suite(sizes, repeats))
+        else:
+            skipped['gui'] = f'No Tk display: {error}'
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+                 'backend': matplotlib.get_backend(), 'platform': platform.platform(),
+                 'machine': platform.machine(), 'quick': quick},
+        'suites': list(suites),
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """Comparison for every result in both runs, by median seconds; ratio > 1 is slower."""
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = result['median'] / base['median'] if base['median'] > 0 else float('inf')
+        rows.append(Comparison(name, base['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def missing(current, baseline):
+    """{name: reason} for baseline results of the suites current asked for that it does not have."""
+    suites = current.get('suites', SUITES)
+    reasons = {}
+    for name, base in baseline.get('results', {}).items():
+        suite = base.get('suite')  # Unknown for baselines written before results recorded their suite
+        if name not in current['results'] and (suite is None or suite in suites):
+            reasons[name] = current['skipped'].get(suite, 'not run') if suite else 'not run'
+    return reasons
+
+
+def format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the conversion kernels and the chart (Agg); "
+                                                 "the gui suite needs a Tk display.")
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=list(SUITES),
+                        help="Suites to run (default: all)")
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes and fewer repeats")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Compare with the results in this JSON file")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD * 100,
+                        help=f"Slowdown in percent reported as a regression (default: {THRESHOLD * 100:g})")
+    args = parser.parse_args(argv)
+
+    current = run(args.suite, args.quick)
+    for name, result in current['results'].items():
+        print(f"{name:<44} {format_seconds(result['median']):>10}  (min {format_seconds(result['min'])})")
+    for suite, reason in current['skipped'].items():
+        print(f"Skipped {suite}: {reason}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold / 100)
+    print(f"\nAgainst {args.baseline} ({baseline.get('meta', {}).get('time', '?')}):")
+    for row in rows:
+        flag = '  REGRESSION' if row.regressed else ''
+        print(f"{row.name:<44} {format_seconds(row.baseline):>10} -> {format_seconds(row.current):>10}"
+              f" {(row.ratio - 1) * 100:+7.1f}%{flag}")
+    absent = missing(current, baseline)
+    for name, reason in absent.items():
+        print(f"{name:<44} {format_seconds(baseline['results'][name]['median']):>10} -> {'missing':>10}  ({reason})")
+    regressions = [row for row in rows if row.regressed]
+    print(f"{len(regressions)} of {len(rows)} results more than {args.threshold:g}% slower"
+          + (f", {len(absent)} baseline results missing" if absent else ''))
+    return 1 if regressions or absent else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Discrete-catalog matching network search.
+
+Explores ladder networks of up to N elements whose inductor and capacitor
+values come from E-series catalogs, and returns the top-K networks ranked by
+worst-case return loss over a band. Candidates are evaluated in vectorized
+batches (candidates x frequencies), and the search space is split by topology
+and by the value of the first element into tasks that run on a process pool.
+Within a task the levels are explored depth first, one batch at a time, so
+a task holds at most one batch per element and only small top-K lists come
+back from the workers: memory stays bounded by the batch size times the
+number of elements, however many candidates there are.
+
+Before the last element, a branch is pruned when no value of that element
+can bring it into the task's current top-K. The bound is exact: a series
+reactance leaves the resistance, and a shunt one the conductance, so |Γ|
+at each frequency can be no lower than with the rest tuned out,
+|r - 1| / (r + 1) for the normalized resistance or conductance r.
+
+Topologies with two adjacent elements of the same type are skipped, since
+two series inductors act as one inductor of the summed value, and so on.
+With discrete catalogs this is only a heuristic: the summed value is usually
+not in the catalog, so a skipped pair can occasionally beat every single
+catalog value. An optional beam keeps only the best partial networks at each
+level (explored level by level, holding at most beam per batch).
+"""
+import heapq
+import itertools
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from smith_engine import (LUMPED_TYPES, Z0, add_series_component, add_shunt_component, component_reactance,
+                          impedance_to_gamma)
+
+E12 = [1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2]
+E24 = [1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+       3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1]
+E96 = [round(10 ** (i / 96), 2) for i in range(96)]  # E96 follows the formula exactly
+E_SERIES = {'E12': E12, 'E24': E24, 'E96': E96}
+
+BATCH_VALUES = 2_000_000  # Complex values per vectorized batch (candidates x frequencies), about 32 MB
+
+# worst_return_loss in dB, worst_gamma is max |Γ| over the band, components ordered from the load
+CatalogMatch = namedtuple('CatalogMatch', ['worst_return_loss', 'worst_gamma', 'components'])
+
+
+def e_series_values(series, low, high):
+    """All values of an E-series catalog (E12/E24/E96) between low and high, inclusive."""
+    mantissas = np.asarray(E_SERIES[series])
+    decades = 10.0 ** np.arange(np.floor(np.log10(low)), np.ceil(np.log10(high)) + 1)
+    values = np.round((decades[:, None] * mantissas[None, :]).ravel(), 10)
+    return values[(values >= low * (1 - 1e-9)) & (values <= high * (1 + 1e-9))]
+
+
+def ladder_topologies(max_elements):
+    """Every sequence of 1..max_elements component types with no two adjacent elements of the same type."""
+    topologies = []
+    for n in range(1, max_elements + 1):
+        for topology in itertools.product(LUMPED_TYPES, repeat=n):
+            if all(a != b for a, b in zip(topology, topology[1:])):
+                topologies.append(topology)
+    return topologies
+
+
+def apply_element(Z, component, values, frequency):
+    """Add one element with every catalog value to every partial network: (m, nf) -> (m * v, nf)."""
+    reactance = component_reactance(component, values[:, None], frequency[None, :])  # (v, nf)
+    if "Series" in component:
+        Z_new = add_series_component(Z[:, None, :], reactance[None, :, :])
+    else:
+        Z_new = add_shunt_component(Z[:, None, :], reactance[None, :, :])
+    return Z_new.reshape(-1, Z.shape[1])
+
+
+def worst_gamma(Z, z0):
+    """Worst-case |Γ| over the band (last axis) for each network, NaN results count as total reflection."""
+    gamma = np.abs(impedance_to_gamma(Z, z0))
+    return np.nan_to_num(gamma, nan=1.0).max(axis=-1)
+
+
+def completion_bound(Z, component, z0):
+    """Lowest worst-case |Γ| over the band (last axis) one more element of this type could reach, per network."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = Z.real / z0 if "Series" in component else (1 / Z).real * z0
+        bound = np.abs(r - 1) / (r + 1)
+    return np.nan_to_num(bound, nan=0.0).max(axis=-1)  # NaN (an open network) bounds nothing
+
+
+def search_task(load, frequency, topology, catalogs, first_indices, top_k, beam, z0):
+    """Search one subtree: a topology with the first element restricted to first_indices.
+
+    Returns a list of (worst |Γ|, value index tuple) for the best top_k networks.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    Z = np.broadcast_to(np.asarray(load, dtype=complex), frequency.shape)[None, :]
+    indices = np.zeros((1, 0), dtype=np.int64)
+    last = len(topology) - 1
+    best = []
+
+    def batches(Z, indices, level):
+        # The prefixes extended by every value of element `level`, at most BATCH_VALUES complex numbers at a time
+        component = topology[level]
+        values = catalogs[component] if level else catalogs[component][first_indices]
+        value_indices = np.arange(len(catalogs[component])) if level else np.asarray(first_indices)
+        step = max(1, BATCH_VALUES // (len(values) * len(frequency)))
+        for start in range(0, len(Z), step):
+            Z_batch = apply_element(Z[start:start + step], component, values, frequency)
+            batch_indices = np.column_stack([np.repeat(indices[start:start + step], len(values), axis=0),
+                                             np.tile(value_indices, min(step, len(Z) - start))])
+            yield Z_batch, batch_indices, worst_gamma(Z_batch, z0)
+
+    def finish(Z, indices):
+        # The last element, on the prefixes in order of their completion bound: the most promising ones fill
+        # best first, and once the bound passes the current top_k the remaining prefixes are dominated
+        nonlocal best
+        bound = completion_bound(Z, topology[last], z0)
+        order = np.argsort(bound, kind='stable')
+        Z, indices, bound = Z[order], indices[order], bound[order]
+        start, step = 0, top_k
+        while start < len(Z):
+            stop = len(Z)
+            if len(best) == top_k:
+                stop = int(np.searchsorted(bound, best[-1][0] * (1 + 1e-9), side='right'))
+            end = min(start + step, stop)
+            if end <= start:
+                return
+            for Z_batch, batch_indices, score in batches(Z[start:end], indices[start:end], last):
+                keep = np.argsort(score)[:top_k]
+                best = heapq.nsmallest(top_k, best + [(float(score[i]), tuple(batch_indices[i])) for i in keep])
+            start, step = end, 2 * step
+
+    def descend(Z, indices, level):
+        if level == last:
+            finish(Z, indices)
+            return
+        for Z_batch, batch_indices, score in batches(Z, indices, level):
+            # Depth first, so only one batch per level is alive at a time
+            descend(Z_batch, batch_indices, level + 1)
+
+    if beam is not None:
+        # Level by level, keeping only the beam best partial networks of each (best of each batch first)
+        for level in range(last):
+            kept = []
+            for Z_batch, batch_indices, score in batches(Z, indices, level):
+                keep = np.argsort(score)[:beam]
+                kept.append((Z_batch[keep], batch_indices[keep], score[keep]))
+            Z, indices, score = (np.concatenate(part) for part in zip(*kept))
+            keep = np.argsort(score)[:beam]
+            Z, indices = Z[keep], indices[keep]
+        descend(Z, indices, last)
+    else:
+        descend(Z, indices, 0)
+    return best
+
+
+def search(load, frequency, max_elements=3, inductor_series='E24', capacitor_series='E24',
+           inductor_range=(1.0, 100.0), capacitor_range=(0.1, 100.0), top_k=10, beam=None, workers=None, z0=Z0):
+    """Best discrete-catalog matching networks for a load over a band.
+
+    load is a complex impedance or an array over frequency (Hz). Inductor values are in nH and
+    capacitor values in pF, like the GUI. workers=None uses every CPU, workers=1 runs in-process.
+    Returns a list of CatalogMatch ordered best first.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    inductors = e_series_values(inductor_series, *inductor_range)
+    capacitors = e_series_values(capacitor_series, *capacitor_range)
+    catalogs = {component: inductors if "Inductor" in component else capacitors for component in LUMPED_TYPES}
+    workers = workers or os.cpu_count() or 1
+
+    # One task per topology and slice of first-element values, several per worker to balance the load
+    tasks = []
+    for topology in ladder_topologies(max_elements):
+        first_values = np.arange(len(catalogs[topology[0]]))
+        for first_indices in np.array_split(first_values, min(4 * workers, len(first_values))):
+            tasks.append((load, frequency, topology, catalogs, first_indices, top_k, beam, z0))
+
+    if workers == 1:
+        results = [search_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(search_task, *zip(*tasks)))
+
+    candidates = []
+    for task, result in zip(tasks, results):
+        candidates += [(gamma, task[2], indices) for gamma, indices in result]
+    ranked = heapq.nsmallest(top_k, candidates)
+    matches = []
+    for gamma, topology, indices in ranked:
+        components = [(component, float(catalogs[component][i])) for component, i in zip(topology, indices)]
+        with np.errstate(divide='ignore'):
+            matches.append(CatalogMatch(float(-20 * np.log10(gamma)), gamma, components))
+    return matches
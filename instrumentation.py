@@ -0,0 +1,244 @@
+"""Opt-in instrumentation of the GUI hot paths: Tk callbacks, canvas draws and the network math.
+
+Set SMITHCHART_PROFILE before starting SmithChart.py to turn it on:
+
+    SMITHCHART_PROFILE=1 python SmithChart.py                # overlay only
+    SMITHCHART_PROFILE=lag.json python SmithChart.py         # + summary written at exit
+    SMITHCHART_PROFILE=lag.trace.json python SmithChart.py   # + Chrome trace (chrome://tracing, Perfetto)
+
+enable() replaces tkinter's CallWrapper, which every command=, bind(),
+trace and after() callback goes through, with one that times the call, so
+each callback is recorded under its function name without touching the
+handlers. Canvas draw and blit are wrapped per canvas (instrument_canvas) and
+the Network methods per class. A wrapped call made inside another one of the
+same category (paths() calling points(), a blit from a draw handler) is left
+to the outer call, so category totals count no time twice. Latencies go into
+log2 histograms (one bucket per power of two nanoseconds) and every call into
+a bounded trace buffer.
+
+Tk does not expose its event queue, so its depth is approximated by the
+number of pending after() callbacks, sampled at every callback, and by how
+late after() callbacks run compared with when they were due.
+
+While SMITHCHART_PROFILE is unset nothing is patched and recorder stays
+None; the only cost is the `recorder is not None` checks at setup.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import tkinter
+from collections import deque
+
+PROFILE_ENV = 'SMITHCHART_PROFILE'
+TRACE_EVENTS = 200_000  # Calls kept for the Chrome trace, oldest dropped first
+BUCKETS = 64  # Bucket k holds durations in [2**(k-1), 2**k) ns, bucket 0 holds 0 ns
+
+recorder = None  # The active Recorder, None while instrumentation is off
+
+
+class LatencyHistogram:
+    """Count, total, maximum and log2 histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.counts = [0] * BUCKETS
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        self.counts[min(ns.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Duration (seconds) below which q percent of the calls fall, interpolated within the bucket."""
+        if not self.count:
+            return float('nan')
+        target = q / 100 * self.count
+        below = 0
+        for k, n in enumerate(self.counts):
+            if n and below + n >= target:
+                break
+            below += n
+        low, high = (2 ** (k - 1) if k else 0), 2 ** k
+        # Interpolation can overshoot the slowest call within its bucket
+        return min(low + (target - below) / n * (high - low), self.max) / 1e9
+
+    def summary(self):
+        return {'count': self.count, 'total': self.total / 1e9, 'mean': self.total / self.count / 1e9,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99),
+                'max': self.max / 1e9, 'buckets_ns': {f'<{2 ** k}': n for k, n in enumerate(self.counts) if n}}
+
+
+class Recorder:
+    """Latency histograms per (category, name), queue depth samples and a trace of recent calls."""
+
+    def __init__(self, trace_events=TRACE_EVENTS):
+        self.histograms = {}  # (category, name) -> LatencyHistogram
+        self.trace = deque(maxlen=trace_events)  # (category, name, start ns, duration ns, thread id)
+        self.depths = {}  # Pending after() callbacks -> times seen
+        self.depth_trace = deque(maxlen=trace_events)  # (ns, depth)
+        self.lateness = LatencyHistogram()  # How late after() callbacks ran
+        self.origin = time.perf_counter_ns()
+        self.main_thread = threading.get_ident()
+        self.active = threading.local()  # Categories with a wrapped call in progress, per thread
+
+    def record(self, category, name, start, end):
+        histogram = self.histograms.get((category, name))
+        if histogram is None:
+            histogram = self.histograms[category, name] = LatencyHistogram()
+        histogram.add(end - start)
+        self.trace.append((category, name, start, end - start, threading.get_ident()))
+
+    def sample_depth(self, depth):
+        self.depths[depth] = self.depths.get(depth, 0) + 1
+        self.depth_trace.append((time.perf_counter_ns(), depth))
+
+    def wrap(self, fn, category, name=None):
+        """fn timed under category and name (default: its name)."""
+        name = name or callback_name(fn)
+
+        def timed(*args, **kwargs):
+            if getattr(self.active, category, False):
+                return fn(*args, **kwargs)  # The outer call of this category already counts this time
+            setattr(self.active, category, True)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                setattr(self.active, category, False)
+                self.record(category, name, start, time.perf_counter_ns())
+        timed.__name__ = getattr(fn, '__name__', name)
+        timed.__wrapped__ = fn
+        return timed
+
+    def summary(self):
+        """JSON-compatible report: per-category histograms, draw totals and queue depth."""
+        categories = {}
+        for (category, name), histogram in sorted(self.histograms.items()):
+            categories.setdefault(category, {})[name] = histogram.summary()
+        samples = sum(self.depths.values())
+        return {
+            'seconds': (time.perf_counter_ns() - self.origin) / 1e9,
+            'categories': categories,
+            'queue_depth': {'samples': samples, 'max': max(self.depths, default=0),
+                            'mean': sum(d * n for d, n in self.depths.items()) / samples if samples else 0.0,
+                            'histogram': {str(d): n for d, n in sorted(self.depths.items())}},
+            'after_lateness': self.lateness.summary() if self.lateness.count else None,
+        }
+
+    def chrome_trace(self):
+        """The recorded calls and queue depth in the Chrome trace event format."""
+        pid = os.getpid()
+        events = [{'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self.origin) / 1e3,
+                   'dur': duration / 1e3, 'pid': pid, 'tid': thread}
+                  for category, name, start, duration, thread in self.trace]
+        events += [{'name': 'after queue', 'ph': 'C', 'ts': (ns - self.origin) / 1e3, 'pid': pid,
+                    'args': {'depth': depth}} for ns, depth in self.depth_trace]
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': self.main_thread,
+                       'args': {'name': 'Tk main loop'}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path, format=None):
+        """Write the summary ('json') or the Chrome trace ('chrome', default for *.trace.json) to path."""
+        if format is None:
+            format = 'chrome' if path.endswith('.trace.json') else 'json'
+        data = self.chrome_trace() if format == 'chrome' else self.summary()
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=None if format == 'chrome' else 1)
+
+    def overlay_text(self, rows=8):
+        """Short report for the on-screen overlay: the costliest names, draws and queue depth."""
+        lines = [f"{'name':<18}{'n':>6}{'p50':>7}{'p99':>6}{'max':>7} ms"]
+        top = sorted(self.histograms.items(), key=lambda item: -item[1].total)[:rows]
+        for (category, name), h in top:
+            lines.append(f'{name[:18]:<18}{h.count:>6}{h.percentile(50) * 1e3:>7.1f}{h.percentile(99) * 1e3:>6.1f}'
+                         f'{h.max / 1e6:>7.1f}')
+        draws = self.histograms.get(('draw', 'canvas.draw'))
+        blits = self.histograms.get(('draw', 'canvas.blit'))
+        lines.append(f'draws {draws.count if draws else 0} ({draws.total / 1e9 if draws else 0:.2f} s), '
+                     f'blits {blits.count if blits else 0}')
+        if self.depth_trace:
+            lines.append(f'after queue {self.depth_trace[-1][1]} (max {max(self.depths)})'
+                         + (f', late p99 {self.lateness.percentile(99) * 1e3:.1f} ms' if self.lateness.count else ''))
+        return '\n'.join(lines)
+
+
+def callback_name(fn):
+    """Readable name of a callback; lambdas get their line number."""
+    fn = getattr(fn, '__func__', fn)
+    name = getattr(fn, '__name__', type(fn).__name__)
+    if name == '<lambda>' and hasattr(fn, '__code__'):
+        name = f'<lambda>:{fn.__code__.co_firstlineno}'
+    return name
+
+
+class TimedCallWrapper(tkinter.CallWrapper):
+    """tkinter.CallWrapper that records each callback's duration and the after() queue depth."""
+
+    def __init__(self, func, subst, widget):
+        super().__init__(func, subst, widget)
+        self.name = callback_name(func)
+
+    def __call__(self, *args):
+        active = recorder
+        if active is None:
+            return super().__call__(*args)
+        active.sample_depth(len(self.widget.tk.splitlist(self.widget.tk.call('after', 'info'))))
+        start = time.perf_counter_ns()
+        try:
+            return super().__call__(*args)
+        finally:
+            active.record('callback', self.name, start, time.perf_counter_ns())
+
+
+def timed_after(original):
+    """Misc.after that records how late each callback runs."""
+    def after(widget, ms, func=None, *args):
+        if func is None:
+            return original(widget, ms)
+        due = time.perf_counter_ns() + (0 if ms == 'idle' else int(ms) * 1_000_000)
+
+        def callit(*call_args):
+            if recorder is not None:
+                recorder.lateness.add(max(time.perf_counter_ns() - due, 0))
+            return func(*call_args)
+        callit.__name__ = callback_name(func)  # after() names its Tcl command and our wrapper after this
+        return original(widget, ms, callit, *args)
+    return after
+
+
+def enable(path=None, format=None):
+    """Start recording; call before any Tk callback is registered. path is dumped at exit."""
+    global recorder
+    if recorder is not None:
+        return recorder
+    recorder = Recorder()
+    tkinter.CallWrapper = TimedCallWrapper
+    tkinter.Misc.after = timed_after(tkinter.Misc.after)
+    from network import Network
+    for method in ('points', 'paths', 'sweep', 'output_impedance'):
+        setattr(Network, method, recorder.wrap(getattr(Network, method), 'math', f'Network.{method}'))
+    if path:
+        atexit.register(lambda: recorder.dump(path, format))
+    return recorder
+
+
+def enable_from_environment():
+    """enable() if SMITHCHART_PROFILE is set: 1 for the overlay only, or a file to dump to at exit."""
+    setting = os.environ.get(PROFILE_ENV, '')
+    if setting and setting != '0':
+        return enable(None if setting == '1' else setting)
+    return None
+
+
+def instrument_canvas(canvas):
+    """Time a canvas' draw and blit (no-op while instrumentation is off)."""
+    if recorder is None:
+        return
+    canvas.draw = recorder.wrap(canvas.draw, 'draw', 'canvas.draw')
+    canvas.blit = recorder.wrap(canvas.blit, 'draw', 'canvas.blit')
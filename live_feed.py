@@ -0,0 +1,347 @@
+"""Live Γ (S11) feed from a measurement source, read with asyncio.
+
+A LiveFeed runs an asyncio event loop in a daemon thread, so the Tk
+mainloop never blocks on the source. Samples are parsed a whole chunk at a
+time and written into a fixed-size RingBuffer; the GUI polls the buffer once
+per frame and draws the latest samples.
+
+Sources:
+    tcp://host:port    connect to a TCP server (e.g. `python live_feed.py simulate`)
+    -                  standard input (a pipe)
+    path               a named pipe, or a regular file followed like `tail -f`
+
+Protocols:
+    text    one sample per line, "re im" or "frequency_hz re im" (commas also
+            separate fields, # starts a comment)
+    binary  little-endian float64 records, (re, im) or (frequency_hz, re, im)
+            with --fields 3
+
+With overflow='drop' a slow consumer loses the oldest unread samples (the
+chart always shows the latest ones); with overflow='block' the reader stops
+reading until the consumer catches up, which pushes back on the source (a TCP
+sender stalls). Both are counted in FeedStats, as are frames the GUI had to
+skip because drawing overran the frame interval.
+
+Example, simulator and a headless monitor in two shells:
+
+    python live_feed.py simulate --port 5025 --rate 20000
+    python live_feed.py monitor tcp://127.0.0.1:5025
+"""
+import argparse
+import asyncio
+import os
+import stat
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+RING_SAMPLES = 4096  # Samples kept (and drawn) by the GUI
+READ_BYTES = 65536  # Bytes per read from the source
+TAIL_POLL = 0.05  # Seconds between polls at the end of a followed file
+BLOCK_POLL = 0.005  # Seconds between checks while the reader waits for buffer space
+
+# received = samples parsed, dropped = samples overwritten before the consumer read them,
+# parse_errors = bad lines, stalls = times the reader waited for space (overflow='block'),
+# frames = frames drawn, skipped_frames = frame slots lost to slow draws, error = reason the feed stopped
+FeedStats = namedtuple('FeedStats', ['received', 'dropped', 'parse_errors', 'stalls', 'frames', 'skipped_frames',
+                                     'error'])
+
+
+class RingBuffer:
+    """Fixed-size, thread-safe buffer of the latest (frequency, Γ) samples with read tracking."""
+
+    def __init__(self, capacity=RING_SAMPLES):
+        self.capacity = capacity
+        self.gamma = np.full(capacity, np.nan, dtype=complex)
+        self.frequency = np.full(capacity, np.nan)
+        self.written = 0  # Samples ever written
+        self.read_position = 0  # Samples ever consumed by read()
+        self.dropped = 0  # Samples overwritten before they were read
+        self.lock = threading.Lock()
+
+    def unread(self):
+        with self.lock:
+            return self.written - self.read_position
+
+    def write(self, gamma, frequency=None):
+        """Append samples, overwriting the oldest ones when full."""
+        gamma = np.asarray(gamma, dtype=complex).ravel()
+        frequency = np.full(len(gamma), np.nan) if frequency is None else np.asarray(frequency, dtype=float).ravel()
+        with self.lock:
+            self.written += len(gamma)
+            # Only the last capacity samples of a large write survive
+            gamma, frequency = gamma[-self.capacity:], frequency[-self.capacity:]
+            index = np.arange(self.written - len(gamma), self.written) % self.capacity
+            self.gamma[index] = gamma
+            self.frequency[index] = frequency
+            lost = self.written - self.read_position - self.capacity
+            if lost > 0:
+                self.dropped += lost
+                self.read_position = self.written - self.capacity
+
+    def read(self):
+        """(frequency, gamma) of the samples not read yet, oldest first."""
+        with self.lock:
+            index = np.arange(self.read_position, self.written) % self.capacity
+            self.read_position = self.written
+            return self.frequency[index], self.gamma[index]
+
+    def latest(self):
+        """(frequency, gamma) of every sample in the buffer, oldest first, without marking them read."""
+        with self.lock:
+            index = np.arange(max(self.written - self.capacity, 0), self.written) % self.capacity
+            return self.frequency[index], self.gamma[index]
+
+
+def parse_text(chunk):
+    """Parse complete text lines into (frequency, gamma, errors); frequency is NaN where a line has none."""
+    lines = chunk.replace(b',', b' ').splitlines()
+    # Fast path: every line has the same two or three fields, parsed in one call. The count is checked
+    # per line, a short line next to a long one would otherwise shift every field after it
+    if b'#' not in chunk and lines:
+        counts = {len(line.split()) for line in lines}
+        fields = counts.pop()
+        if not counts and fields in (2, 3):
+            try:
+                values = np.array(b' '.join(lines).split(), dtype=float).reshape(-1, fields)
+            except ValueError:
+                pass  # A bad token, counted by the line by line parse
+            else:
+                if fields == 2:
+                    return np.full(len(values), np.nan), values[:, 0] + 1j * values[:, 1], 0
+                return values[:, 0], values[:, 1] + 1j * values[:, 2], 0
+    frequency, gamma, errors = [], [], 0
+    for line in lines:
+        fields = line.split(b'#', 1)[0].split()
+        if not fields:
+            continue
+        try:
+            values = [float(field) for field in fields]
+        except ValueError:
+            errors += 1
+            continue
+        if len(values) == 2:
+            frequency.append(np.nan)
+            gamma.append(complex(values[0], values[1]))
+        elif len(values) == 3:
+            frequency.append(values[0])
+            gamma.append(complex(values[1], values[2]))
+        else:
+            errors += 1
+    return np.array(frequency, dtype=float), np.array(gamma, dtype=complex), errors
+
+
+def parse_binary(chunk, fields=2):
+    """Parse whole float64 records into (frequency, gamma); frequency is NaN for (re, im) records."""
+    values = np.frombuffer(chunk, dtype='<f8').reshape(-1, fields)
+    if fields == 2:
+        return np.full(len(values), np.nan), values[:, 0] + 1j * values[:, 1]
+    return values[:, 0], values[:, 1] + 1j * values[:, 2]
+
+
+class LiveFeed:
+    """Reads a source on a background asyncio loop into a RingBuffer; start() and stop() from the GUI thread."""
+
+    def __init__(self, source, protocol='text', fields=2, capacity=RING_SAMPLES, overflow='drop'):
+        if protocol not in ('text', 'binary'):
+            raise ValueError(f"Unknown protocol: {protocol}")
+        if overflow not in ('drop', 'block'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.source = source
+        self.protocol = protocol
+        self.fields = fields
+        self.overflow = overflow
+        self.buffer = RingBuffer(capacity)
+        self.received = 0
+        self.parse_errors = 0
+        self.stalls = 0
+        self.frames = 0
+        self.skipped_frames = 0
+        self.error = None
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self.read_source())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.running:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join(timeout=1.0)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self):
+        return FeedStats(self.received, self.buffer.dropped, self.parse_errors, self.stalls, self.frames,
+                         self.skipped_frames, self.error)
+
+    def count_frame(self, interval, elapsed):
+        """Record a drawn frame; elapsed (s) since the previous one beyond interval counts as skipped frames."""
+        self.frames += 1
+        self.skipped_frames += max(int(elapsed / interval) - 1, 0)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+        finally:
+            self._loop.close()
+
+    async def read_source(self):
+        """Read the source until it ends or the feed is stopped."""
+        if self.source.startswith('tcp://'):
+            host, port = self.source[len('tcp://'):].rsplit(':', 1)
+            reader, writer = await asyncio.open_connection(host, int(port))
+            try:
+                await self.consume(reader.read)
+            finally:
+                writer.close()
+        elif self.source == '-' or stat.S_ISFIFO(os.stat(self.source).st_mode):
+            # A FIFO is opened non-blocking: a blocking open waits for a writer in this thread, past stop().
+            # The loop then waits for data (or the writer's end) without blocking either
+            pipe = sys.stdin.buffer if self.source == '-' else open(
+                os.open(self.source, os.O_RDONLY | os.O_NONBLOCK), 'rb', buffering=0)
+            reader = asyncio.StreamReader()
+            transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), pipe)
+            try:
+                await self.consume(reader.read)
+            finally:
+                transport.close()
+        else:
+            with open(self.source, 'rb') as f:
+                async def tail(size):
+                    # A regular file never blocks, so poll for appended data at its end
+                    while True:
+                        data = f.read(size)
+                        if data:
+                            return data
+                        await asyncio.sleep(TAIL_POLL)
+                await self.consume(tail)
+
+    async def consume(self, read):
+        """Parse chunks from read(size) into the ring buffer; partial lines or records carry over."""
+        record = 8 * self.fields
+        pending = b''
+        while True:
+            data = await read(READ_BYTES)
+            if not data:
+                return  # Source closed
+            pending += data
+            if self.protocol == 'text':
+                end = pending.rfind(b'\n') + 1
+                chunk, pending = pending[:end], pending[end:]
+                frequency, gamma, errors = parse_text(chunk)
+                self.parse_errors += errors
+            else:
+                end = len(pending) // record * record
+                chunk, pending = pending[:end], pending[end:]
+                frequency, gamma = parse_binary(chunk, self.fields)
+            if not len(gamma):
+                continue
+            if self.overflow == 'block':
+                # Stop reading (the source backs up) until the consumer has made room
+                if self.buffer.unread() + len(gamma) > self.buffer.capacity:
+                    self.stalls += 1
+                    while self.buffer.unread() + len(gamma) > self.buffer.capacity and self.buffer.unread():
+                        await asyncio.sleep(BLOCK_POLL)
+            self.buffer.write(gamma, frequency)
+            self.received += len(gamma)
+
+
+def tuning_samples(t, frequency=1e9):
+    """Γ of a simulated device being tuned: a load spiralling in towards a match, with measurement noise."""
+    rng = np.random.default_rng()
+    radius = 0.45 + 0.35 * np.cos(0.3 * t)
+    gamma = radius * np.exp(2j * np.pi * 0.7 * t) + 0.005 * (rng.standard_normal(len(t)) + 1j * rng.standard_normal(len(t)))
+    return np.full(len(t), frequency), gamma
+
+
+async def simulate(host, port, rate, protocol='text', fields=2, batch=0.01):
+    """Serve tuning samples to every TCP client at rate samples per second."""
+    async def client(reader, writer):
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while True:
+                due = int((time.perf_counter() - start) * rate)
+                t = np.arange(sent, due) / rate
+                frequency, gamma = tuning_samples(t)
+                sent = due
+                if protocol == 'text':
+                    columns = [gamma.real, gamma.imag] if fields == 2 else [frequency, gamma.real, gamma.imag]
+                    lines = np.column_stack(columns)
+                    writer.write(''.join(' '.join(f'{v:.6g}' for v in row) + '\n' for row in lines).encode())
+                else:
+                    columns = [gamma.real, gamma.imag] if fields == 2 else [frequency, gamma.real, gamma.imag]
+                    writer.write(np.column_stack(columns).astype('<f8').tobytes())
+                await writer.drain()  # A client that reads slowly stalls the simulator (TCP backpressure)
+                await asyncio.sleep(batch)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(client, host, port)
+    print(f"Simulating on tcp://{host}:{port} at {rate:g} samples/s", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live Γ feed: local simulator and headless monitor.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    sim = commands.add_parser('simulate', help="Serve simulated tuning samples over TCP")
+    sim.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    sim.add_argument('--port', type=int, default=5025, help="TCP port (default: 5025)")
+    sim.add_argument('--rate', type=float, default=10000, help="Samples per second (default: 10000)")
+    monitor = commands.add_parser('monitor', help="Read a source and print feed statistics once a second")
+    monitor.add_argument('source', help="tcp://host:port, - for stdin, a named pipe or a file to follow")
+    monitor.add_argument('--overflow', choices=['drop', 'block'], default='drop',
+                         help="Drop the oldest unread samples or stop reading when the buffer is full (default: drop)")
+    monitor.add_argument('--seconds', type=float, help="Stop after this many seconds (default: until the source ends)")
+    for command in (sim, monitor):
+        command.add_argument('--protocol', choices=['text', 'binary'], default='text', help="Wire format (default: text)")
+        command.add_argument('--fields', type=int, choices=[2, 3], default=2,
+                             help="Fields per sample: re im, or frequency re im (default: 2)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'simulate':
+        try:
+            asyncio.run(simulate(args.host, args.port, args.rate, args.protocol, args.fields))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    feed = LiveFeed(args.source, args.protocol, args.fields, overflow=args.overflow)
+    feed.start()
+    start = time.perf_counter()
+    try:
+        while feed.running and (args.seconds is None or time.perf_counter() - start < args.seconds):
+            time.sleep(1.0)
+            frequency, gamma = feed.buffer.read()
+            feed.count_frame(1.0, 1.0)
+            latest = f', latest |Γ| {abs(gamma[-1]):.3f}' if len(gamma) else ''
+            print(f"{feed.stats()}{latest}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    feed.stop()
+    if feed.error:
+        parser.exit(1, f"live_feed: {feed.error}\n")
+
+
+if __name__ == '__main__':
+    main()
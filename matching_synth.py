@@ -0,0 +1,142 @@
+"""Closed-form L, Pi and T matching network synthesis.
+
+Solutions use the same conventions as the GUI and smith_engine: elements are
+ordered from the load outward, and each element is described by its reactance
+X, series elements add jX and shunt elements add the admittance -j / X (an
+infinite shunt reactance means no element). Loads may be scalars or arrays of
+any shape, so whole matching tables are solved in one vectorized pass.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from smith_engine import Z0, reactance_to_component
+
+# topology: tuple of 'series'/'shunt' from the load outward
+# reactance: array of shape (len(topology),) + load shape, NaN where the solution does not exist
+# valid: boolean array of the load shape
+MatchSolution = namedtuple('MatchSolution', ['name', 'topology', 'reactance', 'valid'])
+
+
+def shunt_reactance(susceptance):
+    """Reactance of a shunt element with the given susceptance (Y = jB = -j / X)."""
+    return np.divide(-1, susceptance, out=np.full(np.shape(susceptance), np.inf), where=susceptance != 0)
+
+
+def shunt_series(load, target_r, sign):
+    """Shunt element across the load, then a series element, transforming load to target_r.
+
+    Returns (shunt susceptance, series reactance, valid). Needs G_load <= 1 / target_r.
+    """
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        Y = 1 / load
+        G, B_load = Y.real, Y.imag
+        radicand = G / target_r - G**2
+        valid = (G > 0) & (radicand >= 0)
+        t = sign * np.sqrt(radicand)  # Total susceptance after the shunt element
+        return t - B_load, t * target_r / G, valid
+
+
+def series_shunt(load, target_r, sign):
+    """Series element at the load, then a shunt element, transforming load to target_r.
+
+    Returns (series reactance, shunt susceptance, valid). Needs R_load <= target_r.
+    """
+    R, X_load = load.real, load.imag
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        radicand = R * target_r - R**2
+        valid = (R > 0) & (radicand >= 0)
+        s = sign * np.sqrt(radicand)  # Total reactance after the series element
+        return s - X_load, s / (R * target_r), valid
+
+
+def make_solution(name, topology, reactances, valid):
+    """Stack element reactances into a MatchSolution, blanking invalid entries with NaN."""
+    reactance = np.stack(np.broadcast_arrays(*reactances)).astype(float)
+    reactance[:, ~valid] = np.nan
+    return MatchSolution(name, topology, reactance, valid)
+
+
+def l_section(load, z0=Z0, target=None):
+    """Every closed-form L-section matching the load to z0 (four candidates, check .valid).
+
+    With a complex target impedance the network presents the target instead: the series-last
+    sections reach its resistance and add its reactance, the shunt-last ones do the same in admittance.
+    """
+    load = np.asarray(load, dtype=complex)
+    target = np.asarray(z0 if target is None else target, dtype=complex)
+    with np.errstate(divide='ignore'):
+        target_admittance = 1 / target
+        target_parallel_r = 1 / target_admittance.real
+    solutions = []
+    for sign, label in ((1, '+'), (-1, '-')):
+        B, X, valid = shunt_series(load, target.real, sign)
+        solutions.append(make_solution(f'L shunt-series ({label})', ('shunt', 'series'),
+                                       [shunt_reactance(B), X + target.imag], valid))
+    for sign, label in ((1, '+'), (-1, '-')):
+        X, B, valid = series_shunt(load, target_parallel_r, sign)
+        solutions.append(make_solution(f'L series-shunt ({label})', ('series', 'shunt'),
+                                       [X, shunt_reactance(B + target_admittance.imag)], valid))
+    return solutions
+
+
+def pi_network(load, q, z0=Z0):
+    """Pi networks (shunt, series, shunt) with loaded Q q, built from two L-sections via a virtual resistance."""
+    load = np.asarray(load, dtype=complex)
+    with np.errstate(divide='ignore', invalid='ignore'):  # A 0 Ω load has no parallel resistance (NaN)
+        r_parallel = 1 / (1 / load).real  # Parallel equivalent resistance of the load
+    r_virtual = np.maximum(r_parallel, z0) / (1 + q**2)  # Lower than both ends
+    solutions = []
+    for sign_1, sign_2 in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+        B_1, X_1, valid_1 = shunt_series(load, r_virtual, sign_1)
+        X_2, B_2, valid_2 = series_shunt(r_virtual + 0j, z0, sign_2)
+        solutions.append(make_solution(f'Pi Q={q:g} ({"+" if sign_1 > 0 else "-"}{"+" if sign_2 > 0 else "-"})',
+                                       ('shunt', 'series', 'shunt'),
+                                       [shunt_reactance(B_1), X_1 + X_2, shunt_reactance(B_2)],
+                                       valid_1 & valid_2))
+    return solutions
+
+
+def t_network(load, q, z0=Z0):
+    """T networks (series, shunt, series) with loaded Q q, built from two L-sections via a virtual resistance."""
+    load = np.asarray(load, dtype=complex)
+    r_virtual = np.minimum(load.real, z0) * (1 + q**2)  # Higher than both ends
+    solutions = []
+    for sign_1, sign_2 in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+        X_1, B_1, valid_1 = series_shunt(load, r_virtual, sign_1)
+        B_2, X_2, valid_2 = shunt_series(r_virtual + 0j, z0, sign_2)
+        solutions.append(make_solution(f'T Q={q:g} ({"+" if sign_1 > 0 else "-"}{"+" if sign_2 > 0 else "-"})',
+                                       ('series', 'shunt', 'series'),
+                                       [X_1, shunt_reactance(B_1 + B_2), X_2],
+                                       valid_1 & valid_2))
+    return solutions
+
+
+def synthesize(load, z0=Z0, q=None):
+    """All L-section solutions, plus Pi and T solutions when a loaded Q is requested."""
+    solutions = l_section(load, z0)
+    if q is not None:
+        solutions += pi_network(load, q, z0) + t_network(load, q, z0)
+    return solutions
+
+
+def solution_components(solution, frequency, index=()):
+    """Component list [(component type, value in nH/pF), ...] for one load of a solution, ordered from the load.
+
+    Elements that vanish (zero series or infinite shunt reactance) are left out.
+    Returns None if the solution does not exist for that load.
+    """
+    if not solution.valid[index]:
+        return None
+    components = []
+    for position, X in zip(solution.topology, solution.reactance[(slice(None),) + np.index_exp[index]]):
+        if (position == 'series' and X == 0) or np.isinf(X):
+            continue
+        is_inductor, value = reactance_to_component(X, frequency)
+        components.append((f'{position.capitalize()} {"Inductor" if is_inductor else "Capacitor"}', float(value)))
+    return components
+
+
+def component_table(solution, frequency):
+    """Vectorized component values of a solution for every load: (is_inductor, value in nH/pF) per element."""
+    return reactance_to_component(solution.reactance, frequency)
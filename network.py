@@ -0,0 +1,213 @@
+"""Editable matching network with incremental re-evaluation.
+
+A network is a load plus an ordered list of elements from the load outward.
+The impedance after every element is cached, both at the element's own
+frequency (the trajectory points drawn on the chart) and across a frequency
+sweep, so editing, inserting or deleting element k only recomputes the
+results from k onward. Dragging one value of a long ladder or a 10k point
+sweep therefore costs the elements after it, not the whole network.
+
+The path each element traces on the chart (an arc of a constant resistance
+or conductance circle, or a circle about Z0 for a line section) is cached
+the same way. It is sampled adaptively: segments are split until their
+midpoint is within ARC_TOLERANCE of the chord, so short elements cost a few
+points and long lines or stubs stay smooth.
+"""
+import numpy as np
+
+from smith_engine import (LINE_TYPES, Z0, add_series_component, add_series_line, add_shunt_component,
+                          apply_component, component_reactance, electrical_length, impedance_to_gamma)
+
+ARC_TOLERANCE = 0.002  # Largest distance in Γ between a drawn segment and the true path
+ARC_START_POINTS = 9  # Initial samples along each element path
+ARC_MAX_POINTS = 2049  # Cap on samples per element path
+
+
+class Element:
+    """One element: type, value in nH/pF (mm for lines) and the frequency (Hz) it was tuned at.
+
+    Lines and stubs also have a characteristic impedance and effective permittivity.
+    """
+    __slots__ = ('component', 'value', 'frequency', 'line_impedance', 'eeff')
+
+    def __init__(self, component, value, frequency, line_impedance=Z0, eeff=1.0):
+        self.component = component
+        self.value = value
+        self.frequency = frequency
+        self.line_impedance = line_impedance
+        self.eeff = eeff
+
+    def __repr__(self):
+        if self.component in LINE_TYPES:
+            return (f'Element({self.component!r}, {self.value!r}, {self.frequency!r}, '
+                    f'{self.line_impedance!r}, {self.eeff!r})')
+        return f'Element({self.component!r}, {self.value!r}, {self.frequency!r})'
+
+    def apply(self, Z, frequency=None):
+        """Impedance Z seen through this element, at its own frequency or at the given frequencies."""
+        return apply_component(Z, self.component, self.value, self.frequency if frequency is None else frequency,
+                               self.line_impedance, self.eeff)
+
+    def partial(self, Z, t):
+        """Impedance Z seen through a fraction t (0..1, an array) of this element at its own frequency.
+
+        t scales the series reactance, the shunt susceptance or the line or stub length, so t = 0 is Z itself,
+        except for a short stub: at zero length it shorts the line, so its path starts at the short circuit.
+        Past a quarter wave an open stub's path runs through the short circuit and a short stub's back through Z.
+        """
+        t = np.asarray(t, dtype=float)
+        if self.component == "Series Line":
+            return add_series_line(Z, self.line_impedance, t * electrical_length(self.value, self.frequency, self.eeff))
+        if "Stub" in self.component:
+            reactance = component_reactance(self.component, t * self.value, self.frequency, self.line_impedance,
+                                            self.eeff)
+            Z_new = add_shunt_component(Z, reactance)
+            if "Short" in self.component:  # Zero reactance means no element to add_shunt_component
+                Z_new = np.where((t == 0) & (self.value != 0), 0j, Z_new)[()]
+            return Z_new
+        reactance = component_reactance(self.component, self.value, self.frequency, self.line_impedance, self.eeff)
+        if "Series" in self.component:
+            return add_series_component(Z, t * reactance)
+        with np.errstate(divide='ignore'):
+            return add_shunt_component(Z, reactance / t)  # Infinite reactance at t = 0 adds nothing
+
+    def path(self, Z, z0=Z0):
+        """Γ along this element from impedance Z, sampled adaptively to within ARC_TOLERANCE."""
+        t = np.linspace(0, 1, ARC_START_POINTS)
+        gamma = np.asarray(impedance_to_gamma(self.partial(Z, t), z0))
+        while len(t) < ARC_MAX_POINTS:
+            middle = (t[:-1] + t[1:]) / 2
+            middle_gamma = np.asarray(impedance_to_gamma(self.partial(Z, middle), z0))
+            error = np.abs(middle_gamma - (gamma[:-1] + gamma[1:]) / 2)
+            # Non-finite points (the path through an open circuit) are kept but never refined
+            split = np.isfinite(error) & (error > ARC_TOLERANCE)
+            split &= np.cumsum(split) <= ARC_MAX_POINTS - len(t)
+            if not split.any():
+                break
+            order = np.argsort(np.concatenate([t, middle[split]]), kind='stable')
+            t = np.concatenate([t, middle[split]])[order]
+            gamma = np.concatenate([gamma, middle_gamma[split]])[order]
+        return gamma
+
+
+class Network:
+    """A load and its matching elements, with the impedance after each element cached."""
+
+    def __init__(self, load=None, elements=()):
+        self.load = load
+        self.elements = list(elements)
+        self.points_valid = 0  # Cached trajectory points before this index are up to date
+        self.sweep_valid = 0  # Same for the cached sweep impedances
+        self.paths_valid = 0  # Cached element paths before this index are up to date
+        self.recomputed = 0  # Elements evaluated by the last points() or sweep() call
+        self._points = []
+        self._paths = []
+        self._paths_z0 = None
+        self._sweep = []
+        self._sweep_load = None
+        self._sweep_frequencies = None
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __getitem__(self, k):
+        return self.elements[k]
+
+    def components(self):
+        """Element tuples ordered from the load, as smith_engine.cascade_abcd takes them."""
+        return [(element.component, element.value, element.line_impedance, element.eeff)
+                if element.component in LINE_TYPES else (element.component, element.value)
+                for element in self.elements]
+
+    def invalidate(self, k):
+        """Mark the results after element k (and everything past it) as stale."""
+        # Point 0 is the load, point k + 1 is the impedance after element k
+        self.points_valid = min(self.points_valid, k + 1)
+        self.sweep_valid = min(self.sweep_valid, k + 1)
+        self.paths_valid = min(self.paths_valid, k)  # Path k starts at point k, so it depends on elements 0..k
+
+    def append(self, element):
+        self.insert(len(self.elements), element)
+
+    def insert(self, k, element):
+        self.elements.insert(k, element)
+        self.invalidate(k)
+
+    def remove(self, k):
+        """Delete element k and return it."""
+        element = self.elements.pop(k)
+        self.invalidate(k)
+        return element
+
+    def set_element(self, k, component=None, value=None, frequency=None, line_impedance=None, eeff=None):
+        """Change the type, value, frequency or line parameters of element k."""
+        element = self.elements[k]
+        if component is not None:
+            element.component = component
+        if value is not None:
+            element.value = value
+        if frequency is not None:
+            element.frequency = frequency
+        if line_impedance is not None:
+            element.line_impedance = line_impedance
+        if eeff is not None:
+            element.eeff = eeff
+        self.invalidate(k)
+
+    def points(self):
+        """Impedance after 0..n elements (the load first), each element at its own frequency."""
+        if self.load is None:
+            return []
+        del self._points[self.points_valid:]
+        if not self._points:
+            self._points.append(complex(self.load))
+        start = len(self._points) - 1
+        for element in self.elements[start:]:
+            self._points.append(complex(element.apply(self._points[-1])))
+        self.recomputed = len(self.elements) - start
+        self.points_valid = len(self._points)
+        return list(self._points)
+
+    def paths(self, z0=Z0):
+        """Γ path traced by each element from the point before it, as a list of arrays."""
+        points = self.points()
+        if z0 != self._paths_z0:
+            self._paths_z0 = z0
+            self.paths_valid = 0
+        del self._paths[self.paths_valid:]
+        if points:
+            for k in range(len(self._paths), len(self.elements)):
+                self._paths.append(self.elements[k].path(points[k], z0))
+        self.paths_valid = len(self._paths)
+        return list(self._paths)
+
+    def output_impedance(self):
+        """Impedance seen through the whole network, None without a load."""
+        points = self.points()
+        return points[-1] if points else None
+
+    def sweep(self, frequencies, load=None):
+        """Input impedance across frequencies (Hz) with every element at those frequencies.
+
+        load defaults to the network load and may be an array over frequencies (a measured load).
+        """
+        load = self.load if load is None else load
+        frequencies = np.asarray(frequencies, dtype=float)
+        # A different load or frequency grid invalidates every cached result
+        if (self._sweep_frequencies is None or not np.array_equal(frequencies, self._sweep_frequencies)
+                or not np.array_equal(load, self._sweep_load)):
+            self._sweep_load = np.copy(load)
+            self._sweep_frequencies = frequencies.copy()
+            self.sweep_valid = 0
+        del self._sweep[self.sweep_valid:]
+        if not self._sweep:
+            self._sweep.append(np.broadcast_to(np.asarray(load, dtype=complex), frequencies.shape))
+        start = len(self._sweep) - 1
+        for element in self.elements[start:]:
+            self._sweep.append(np.asarray(element.apply(self._sweep[-1], frequencies)))
+        self.recomputed = len(self.elements) - start
+        self.sweep_valid = len(self._sweep)
+        return self._sweep[-1]
@@ -0,0 +1,234 @@
+"""Gradient-based wideband matching optimizer.
+
+Tunes the values of a fixed ladder topology (series/shunt L/C elements,
+ordered from the load like everywhere else) to minimize the worst-case or
+the average |Γ| over a band. Γ(f) and its derivatives with respect to every
+log-value come from one forward and one backward pass over the ABCD cascade,
+vectorized over frequencies and over a batch of random starting points, so
+an iteration costs about one sweep. The steps are Levenberg-Marquardt on the
+residuals Γ(f); the worst case is approached through l_p norms of |Γ| with
+a growing p, the residuals weighted by |Γ|^(p-2) so the Gauss-Newton step
+follows the l_p gradient.
+
+Run `python optimizer.py` for a benchmark against brute-force grid search.
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from catalog_search import search_task
+from smith_engine import Z0, component_reactance, evaluate_network, impedance_to_gamma, return_loss_db
+
+INDUCTOR_RANGE = (0.1, 100.0)  # nH, the GUI value slider range
+CAPACITOR_RANGE = (0.1, 100.0)  # pF
+
+# worst_gamma / average_gamma are max and mean |Γ| over the band, components ordered from the load
+OptimizedMatch = namedtuple('OptimizedMatch', ['worst_gamma', 'average_gamma', 'components', 'iterations'])
+
+
+def cascade_gradient(load, topology, values, frequency, z0=Z0):
+    """Γ(f) of every candidate and its derivatives with respect to the log of every element value.
+
+    values is (candidates, elements) in nH/pF. Returns gamma (candidates, nf) and
+    d_gamma (candidates, nf, elements). The forward pass carries [V, I] from the load,
+    the backward pass carries the row vectors that turn [V, I] at element k into the
+    numerator and denominator of Γ at the input.
+    """
+    values = np.asarray(values, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    shape = (values.shape[0], frequency.size)
+    reactance = [component_reactance(component, values[:, k, None], frequency[None, :])
+                 for k, component in enumerate(topology)]
+    series = ["Series" in component for component in topology]
+    with np.errstate(divide='ignore'):
+        admittance = [None if is_series else -1j / x for x, is_series in zip(reactance, series)]
+
+    # Forward: [V, I] after 0..n elements (Z = V / I)
+    V = [np.broadcast_to(np.asarray(load, dtype=complex), shape)]
+    I = [np.ones(shape, dtype=complex)]
+    for x, y, is_series in zip(reactance, admittance, series):
+        if is_series:
+            V.append(V[-1] + 1j * x * I[-1])
+            I.append(I[-1])
+        else:
+            V.append(V[-1])
+            I.append(I[-1] + y * V[-1])
+
+    # Backward: rows turning [V, I] after element k into Γ's numerator (V - z0 I) and denominator (V + z0 I)
+    n = len(topology)
+    num = [None] * (n + 1)
+    den = [None] * (n + 1)
+    num[n] = (np.ones(shape, dtype=complex), np.full(shape, -z0, dtype=complex))
+    den[n] = (np.ones(shape, dtype=complex), np.full(shape, z0, dtype=complex))
+    for k in range(n, 0, -1):
+        x, y = reactance[k - 1], admittance[k - 1]
+        for rows in (num, den):
+            r0, r1 = rows[k]
+            rows[k - 1] = (r0, 1j * x * r0 + r1) if series[k - 1] else (r0 + y * r1, r1)
+
+    a = V[n] - z0 * I[n]
+    b = V[n] + z0 * I[n]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = a / b
+        d_gamma = np.empty(shape + (n,), dtype=complex)
+        for k, component in enumerate(topology):
+            # d/dln(value): inductor reactance grows with the value, capacitor reactance shrinks
+            sign = 1 if "Inductor" in component else -1
+            if series[k]:
+                d = 1j * sign * reactance[k] * I[k]  # dM = [[0, j dX], [0, 0]]
+                da, db = num[k + 1][0] * d, den[k + 1][0] * d
+            else:
+                d = -sign * admittance[k] * V[k]  # dM = [[0, 0], [dY, 0]], Y = -j / X
+                da, db = num[k + 1][1] * d, den[k + 1][1] * d
+            d_gamma[..., k] = (da * b - a * db) / b**2
+    return gamma, d_gamma
+
+
+def value_bounds(topology, inductor_range=INDUCTOR_RANGE, capacitor_range=CAPACITOR_RANGE):
+    """Lower and upper log-value bounds (elements,) for a topology."""
+    ranges = np.array([inductor_range if "Inductor" in component else capacitor_range for component in topology])
+    return np.log(ranges[:, 0]), np.log(ranges[:, 1])
+
+
+def lp_norm(magnitude, power):
+    """Power mean (mean |Γ|^p)^(1/p) over the band (last axis), scaled by the maximum so large p cannot underflow."""
+    peak = magnitude.max(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(peak * ((magnitude / peak[..., None])**power).mean(axis=-1) ** (1 / power))
+
+
+def optimize(load, topology, frequency, objective='worst', starts=32, iterations=200, inductor_range=INDUCTOR_RANGE,
+             capacitor_range=CAPACITOR_RANGE, seed=None, z0=Z0, tolerance=1e-6):
+    """Best values for a topology over a band, minimizing 'worst' (max) or 'average' (RMS) |Γ|.
+
+    load is a complex impedance or an array over frequency (Hz). Values are in nH/pF and stay
+    within the given ranges. Every start is optimized at once. Returns an OptimizedMatch.
+    """
+    topology = list(topology)
+    frequency = np.atleast_1d(np.asarray(frequency, dtype=float))
+    low, high = value_bounds(topology, inductor_range, capacitor_range)
+    rng = np.random.default_rng(seed)
+    p = rng.uniform(low, high, (starts, len(topology)))  # Log-uniform starting values
+    eye = np.eye(len(topology))
+    # The worst case is approached through l_p norms of growing p, each stage starting from the last
+    powers = (2, 4, 8, 16, 32, 64, 128) if objective == 'worst' else (2,)
+    stage_iterations = max(1, iterations // len(powers))
+
+    gamma, d_gamma = cascade_gradient(load, topology, np.exp(p), frequency, z0)
+    magnitude = np.nan_to_num(np.abs(gamma), nan=1.0)
+    best_score = magnitude.max(axis=1) if objective == 'worst' else lp_norm(magnitude, 2)
+    best_p = p.copy()
+    iteration = 0
+    for power in powers:
+        damping = np.full(starts, 1e-2)
+        cost = lp_norm(magnitude, power)
+        for _ in range(stage_iterations):
+            iteration += 1
+            # Gauss-Newton on the residuals Γ(f) weighted by |Γ|^(p-2), which has the l_p gradient
+            weights = (magnitude / magnitude.max(axis=1, keepdims=True)) ** (power - 2)
+            J = np.nan_to_num(d_gamma) * np.sqrt(weights)[..., None]
+            r = np.nan_to_num(gamma) * np.sqrt(weights)
+            H = np.einsum('sfi,sfj->sij', np.conj(J), J).real
+            g = np.einsum('sfi,sf->si', np.conj(J), r).real
+            # Levenberg-Marquardt damping, one small linear system per start
+            H_damped = H + damping[:, None, None] * (H * eye + 1e-12 * eye)
+            step = -np.linalg.solve(H_damped, g[..., None])[..., 0]
+            p_trial = np.clip(p + step, low, high)
+
+            trial_gamma, trial_d_gamma = cascade_gradient(load, topology, np.exp(p_trial), frequency, z0)
+            trial_magnitude = np.nan_to_num(np.abs(trial_gamma), nan=1.0)
+            trial_cost = lp_norm(trial_magnitude, power)
+            better = trial_cost < cost
+            converged = ~better | (cost - trial_cost < tolerance * cost)
+            p[better] = p_trial[better]
+            gamma[better] = trial_gamma[better]
+            d_gamma[better] = trial_d_gamma[better]
+            magnitude[better] = trial_magnitude[better]
+            cost = np.where(better, trial_cost, cost)
+            damping = np.where(better, damping / 3, damping * 4)
+
+            # Keep the best network seen by the real objective, the l_p cost only steers
+            score = magnitude.max(axis=1) if objective == 'worst' else lp_norm(magnitude, 2)
+            improved = score < best_score
+            best_score[improved] = score[improved]
+            best_p[improved] = p[improved]
+            if (converged & (damping > 1e3)).all():
+                break  # Every start is stuck at a minimum of this stage
+
+    best = int(np.argmin(best_score))
+    components = [(component, float(value)) for component, value in zip(topology, np.exp(best_p[best]))]
+    gamma, _ = cascade_gradient(load, topology, np.exp(best_p[best:best + 1]), frequency, z0)
+    magnitude = np.abs(gamma[0])
+    return OptimizedMatch(float(magnitude.max()), float(magnitude.mean()), components, iteration)
+
+
+def ladder(elements, first="Series Inductor"):
+    """Lowpass ladder topology of alternating series inductors and shunt capacitors, from the load."""
+    pair = [first, "Shunt Capacitor" if first == "Series Inductor" else "Series Inductor"]
+    return [pair[k % 2] for k in range(elements)]
+
+
+def grid_search(load, topology, frequency, points, inductor_range=INDUCTOR_RANGE, capacitor_range=CAPACITOR_RANGE,
+                z0=Z0):
+    """Brute-force worst-case search over log-spaced values, points per element.
+
+    Uses the vectorized catalog search with the grids as catalogs. Returns an OptimizedMatch.
+    """
+    catalogs = {component: np.geomspace(*(inductor_range if "Inductor" in component else capacitor_range), points)
+                for component in set(topology)}
+    frequency = np.atleast_1d(np.asarray(frequency, dtype=float))
+    (worst, indices), = search_task(load, frequency, tuple(topology), catalogs, np.arange(points), 1, None, z0)
+    components = [(component, float(catalogs[component][i])) for component, i in zip(topology, indices)]
+    magnitude = np.abs(impedance_to_gamma(evaluate_network(load, components, frequency), z0))
+    return OptimizedMatch(worst, float(magnitude.mean()), components, points ** len(topology))
+
+
+def benchmark(sizes=(3, 5, 7), load=10, band=(700e6, 1300e6), band_points=51, grid_points=None, starts=32, seed=1,
+              z0=Z0):
+    """Time-to-solution of the optimizer and of grid search on lowpass ladders of each size.
+
+    grid_points maps size -> values per element; the defaults keep each grid to a few million networks.
+    Returns a list of result dicts and prints a table.
+    """
+    grid_points = grid_points or {3: 64, 5: 16, 7: 8}
+    frequency = np.linspace(*band, band_points)
+    rows = []
+    print(f"Load {load} Ω, {band[0] / 1e6:.0f}-{band[1] / 1e6:.0f} MHz at {band_points} points, worst-case |Γ|")
+    print(f"{'elements':>8} {'method':>10} {'networks':>10} {'time (s)':>9} {'worst RL (dB)':>14}")
+    for size in sizes:
+        topology = ladder(size)
+        start = time.perf_counter()
+        result = optimize(load, topology, frequency, 'worst', starts=starts, seed=seed, z0=z0)
+        optimizer_time = time.perf_counter() - start
+        row = {'elements': size, 'optimizer_time': optimizer_time, 'optimizer_iterations': result.iterations,
+               'optimizer_rl': float(return_loss_db(result.worst_gamma))}
+        print(f"{size:>8} {'gradient':>10} {f'{starts} starts':>10} {optimizer_time:>9.3f} {row['optimizer_rl']:>14.2f}")
+        points = grid_points.get(size)
+        if points:
+            start = time.perf_counter()
+            grid = grid_search(load, topology, frequency, points, z0=z0)
+            grid_time = time.perf_counter() - start
+            row.update(grid_points=points, grid_time=grid_time, grid_rl=float(return_loss_db(grid.worst_gamma)))
+            print(f"{size:>8} {'grid':>10} {points ** size:>10} {grid_time:>9.3f} {row['grid_rl']:>14.2f}")
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gradient matching optimizer against grid search.")
+    parser.add_argument('--elements', type=int, nargs='+', default=[3, 5, 7], help="ladder sizes to run")
+    parser.add_argument('--load', type=complex, default=10, help="load impedance in ohms, e.g. 10 or 20-15j")
+    parser.add_argument('--band', type=float, nargs=2, default=[700, 1300], metavar=('START', 'STOP'),
+                        help="band in MHz")
+    parser.add_argument('--band-points', type=int, default=51, help="frequency points in the band")
+    parser.add_argument('--starts', type=int, default=32, help="random starting points of the optimizer")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the starting points")
+    args = parser.parse_args(argv)
+    benchmark(args.elements, args.load, (args.band[0] * 1e6, args.band[1] * 1e6), args.band_points,
+              starts=args.starts, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
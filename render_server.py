@@ -0,0 +1,302 @@
+"""Local HTTP service that renders Smith chart images of matching networks.
+
+Dashboards post a load and network as JSON and get a PNG or SVG back, drawn
+by smith_plot.render_chart with the Agg backend, so Tk is never needed:
+
+    POST /render        JSON body (below), returns the image
+    GET  /render?q=...  the same JSON, URL-encoded, for <img src=...>
+    GET  /stats         cache and render counters as JSON
+    GET  /health        "ok"
+
+Request JSON (only load is required):
+
+    {"load": [75, 25], "z0": 50, "frequency": 1e9,
+     "network": [{"component": "Shunt Capacitor", "value": 2.2},
+                 {"component": "Series Line", "value": 12.5, "line_impedance": 35, "eeff": 2.2}],
+     "sweep": {"start": 5e8, "stop": 1.5e9, "points": 1001},
+     "format": "png", "dpi": 100, "title": "DUT 17"}
+
+network may also be a batch_match spec string ('Series Inductor=5.6,Shunt
+Capacitor=2.2'); elements without a frequency use the top-level one.
+
+Requests are normalized (defaults filled in, numbers as floats) and hashed,
+so equivalent requests share one entry in an LRU cache of rendered images
+bounded in bytes. Renders run on a process pool, and concurrent requests for
+the same image wait for one render. The hash doubles as the ETag.
+
+    python render_server.py --port 8765 --workers 2
+    curl -s -X POST localhost:8765/render -d '{"load": [75, 25]}' -o chart.png
+"""
+import argparse
+import hashlib
+import importlib
+import io
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from smith_engine import COMPONENT_TYPES, Z0, impedance_to_gamma
+
+MAX_BODY = 1 << 20  # Largest accepted request body (bytes)
+MAX_ELEMENTS = 200  # Largest accepted network
+MAX_SWEEP_POINTS = 100001  # Largest accepted sweep
+CACHE_BYTES = 64 << 20  # Rendered images kept in the LRU cache
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def finite(value, name):
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    return value
+
+
+def canonical_request(body):
+    """Validated request with every default filled in, so equal views compare (and hash) equal."""
+    if not isinstance(body, dict):
+        raise ValueError("Request must be a JSON object")
+    load = body.get('load')
+    if isinstance(load, dict):
+        load = [load.get('r', 0), load.get('x', 0)]
+    elif isinstance(load, (int, float)):
+        load = [load, 0]
+    if not isinstance(load, list) or len(load) != 2:
+        raise ValueError("load must be [r, x], {\"r\": .., \"x\": ..} or a number")
+    z0 = finite(body.get('z0', Z0), 'z0')
+    frequency = finite(body.get('frequency', 1e9), 'frequency')
+    if z0 <= 0 or frequency <= 0:
+        raise ValueError("z0 and frequency must be positive")
+
+    network = body.get('network', [])
+    if isinstance(network, str):
+        from batch_match import parse_network
+        network = [{'component': c[0], 'value': c[1], 'line_impedance': c[2] if len(c) > 2 else z0,
+                    'eeff': c[3] if len(c) > 3 else 1.0} for c in parse_network(network, z0)]
+    if not isinstance(network, list) or len(network) > MAX_ELEMENTS:
+        raise ValueError(f"network must be a list of at most {MAX_ELEMENTS} elements")
+    elements = []
+    for element in network:
+        if not isinstance(element, dict) or element.get('component') not in COMPONENT_TYPES:
+            raise ValueError(f"Unknown element: {element!r}")
+        elements.append({
+            'component': element['component'],
+            'value': finite(element['value'], 'value'),
+            'frequency': finite(element.get('frequency', frequency), 'frequency'),
+            'line_impedance': finite(element.get('line_impedance', z0), 'line_impedance'),
+            'eeff': finite(element.get('eeff', 1.0), 'eeff'),
+        })
+
+    sweep = body.get('sweep')
+    if sweep is not None:
+        sweep = {'start': finite(sweep['start'], 'start'), 'stop': finite(sweep['stop'], 'stop'),
+                 'points': int(finite(sweep.get('points', 1001), 'points'))}
+        if not 2 <= sweep['points'] <= MAX_SWEEP_POINTS or not 0 < sweep['start'] < sweep['stop']:
+            raise ValueError(f"sweep needs 0 < start < stop and 2 to {MAX_SWEEP_POINTS} points")
+    image_format = body.get('format', 'png')
+    if image_format not in CONTENT_TYPES:
+        raise ValueError(f"format must be one of {', '.join(CONTENT_TYPES)}")
+    dpi = int(finite(body.get('dpi', 100), 'dpi'))
+    if not 20 <= dpi <= 300:
+        raise ValueError("dpi must be between 20 and 300")
+    title = body.get('title')
+    r = finite(load[0], 'r')
+    if r < 0:
+        raise ValueError("Load resistance must be non-negative")
+    return {'load': [r, finite(load[1], 'x')], 'z0': z0, 'network': elements,
+            'sweep': sweep, 'format': image_format, 'dpi': dpi, 'title': None if title is None else str(title)}
+
+
+def request_key(request):
+    """SHA-256 of a canonical request's JSON encoding."""
+    return hashlib.sha256(json.dumps(request, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def render_request(request):
+    """Image bytes for a canonical request (runs in a worker process)."""
+    import numpy as np
+    from network import Element, Network
+    from smith_plot import render_chart
+    z0 = request['z0']
+    network = Network(complex(*request['load']),
+                      [Element(e['component'], e['value'], e['frequency'], e['line_impedance'], e['eeff'])
+                       for e in request['network']])
+    sweep_gamma = None
+    if request['sweep'] is not None:
+        sweep = request['sweep']
+        sweep_gamma = impedance_to_gamma(network.sweep(np.linspace(sweep['start'], sweep['stop'], sweep['points'])), z0)
+    output = io.BytesIO()
+    render_chart(output, network.points(), sweep_gamma, request['title'], z0, request['format'], request['dpi'],
+                 paths=network.paths(z0))
+    return output.getvalue()
+
+
+def warm_up():
+    """Load matplotlib once per worker process, not on its first request."""
+    importlib.import_module('smith_plot')
+
+
+class ImageCache:
+    """LRU cache of rendered images bounded in bytes, with one shared render per key in flight."""
+
+    def __init__(self, pool, max_bytes=CACHE_BYTES):
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()  # key -> bytes, least recently used first
+        self.pending = {}  # key -> Future of a render in progress
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0  # Requests that waited on a render another request started
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, request):
+        """(image bytes, 'hit' | 'miss' | 'shared') for a canonical request and its key."""
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+                self.hits += 1
+                return image, 'hit'
+            future = self.pending.get(key)
+            if future is not None:
+                self.shared += 1
+                status = 'shared'
+            else:
+                render = self.pool.submit(render_request, request)
+                self.misses += 1
+                status = 'miss'
+                future = self.pending[key] = Future()
+        if status == 'miss':
+            # Outside the lock: the callback takes it, and runs right here if the render already finished
+            render.add_done_callback(lambda done: self.finish(key, future, done))
+        return future.result(), status
+
+    def finish(self, key, future, done):
+        with self.lock:
+            del self.pending[key]
+            if done.exception() is None:
+                image = done.result()
+                if len(image) <= self.max_bytes:
+                    self.images[key] = image
+                    self.size += len(image)
+                    while self.size > self.max_bytes:
+                        _, old = self.images.popitem(last=False)
+                        self.size -= len(old)
+                        self.evictions += 1
+        if done.exception() is None:
+            future.set_result(done.result())
+        else:
+            future.set_exception(done.exception())
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.images), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses,
+                    'shared': self.shared, 'evictions': self.evictions, 'in_flight': len(self.pending)}
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, dashboards poll repeatedly
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self.send_body(200, b'ok', 'text/plain')
+        elif url.path == '/stats':
+            self.send_body(200, json.dumps(self.server.cache.stats()).encode(), 'application/json')
+        elif url.path == '/render':
+            query = parse_qs(url.query).get('q')
+            self.render(query[0].encode() if query else b'')
+        else:
+            self.send_error_json(404, f"Unknown path: {url.path}")
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/render':
+            self.send_error_json(404, f"Unknown path: {self.path}")
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.send_error_json(400, "Bad Content-Length")
+            return
+        if length > MAX_BODY:
+            self.send_error_json(413, f"Request body over {MAX_BODY} bytes")
+            return
+        self.render(self.rfile.read(length))
+
+    def render(self, body):
+        try:
+            request = canonical_request(json.loads(body or b'null'))
+        except (ValueError, KeyError, TypeError) as e:  # json.JSONDecodeError is a ValueError
+            self.send_error_json(400, str(e))
+            return
+        key = request_key(request)
+        if self.headers.get('If-None-Match') == f'"{key}"':
+            self.send_body(304, b'', None, {'ETag': f'"{key}"'})
+            return
+        try:
+            image, status = self.server.cache.get(key, request)
+        except Exception as e:  # A failed render is reported, the server keeps running
+            self.send_error_json(500, f"Render failed: {e}")
+            return
+        self.send_body(200, image, CONTENT_TYPES[request['format']],
+                       {'ETag': f'"{key}"', 'X-Cache': status, 'Cache-Control': 'max-age=3600'})
+
+    def send_error_json(self, code, message):
+        self.send_body(code, json.dumps({'error': message}).encode(), 'application/json')
+
+    def send_body(self, code, body, content_type, headers=None):
+        self.send_response(code)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=8765, workers=2, cache_bytes=CACHE_BYTES, verbose=False):
+    """HTTP server with its render pool and cache; port 0 picks a free port (server.server_address)."""
+    server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.daemon_threads = True
+    server.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+    server.cache = ImageCache(server.pool, cache_bytes)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service rendering Smith chart images from JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port (default: 8765, 0 for any free port)")
+    parser.add_argument('--workers', type=int, default=2, help="Render worker processes (default: 2)")
+    parser.add_argument('--cache-mb', type=float, default=CACHE_BYTES / 2**20,
+                        help=f"Image cache size in MB (default: {CACHE_BYTES >> 20})")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.workers, int(args.cache_mb * 2**20), args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving Smith charts on http://{host}:{port}/render", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
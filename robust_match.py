@@ -0,0 +1,152 @@
+"""Robust matching: one network for a whole population of loads.
+
+A population is an array of loads, (P,) for loads that do not depend on
+frequency or (P, F) over the band (one row per unit, e.g. one Touchstone file
+each). evaluate_population runs a network against every unit with a single
+broadcasted ABCD evaluation and reports the worst case and the percentiles of
+each unit's worst |Γ| over the band. optimize_population tunes the element
+values of a topology for the worst case over the population and the band with
+the gradient optimizer, which sees units x frequencies as one axis. The
+worst case only depends on a few points at the edge of the population and the
+band, so the optimizer runs on an active set of (unit, frequency) points, and
+the points that turn out worse on the full population are added and the
+optimization repeated.
+
+    python robust_match.py loads.csv --network "Shunt Capacitor,Series Inductor" --band 700 1300
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from optimizer import optimize
+from smith_engine import LUMPED_TYPES, Z0, evaluate_network, impedance_to_gamma, return_loss_db
+from tolerance import deviation
+
+PERCENTILES = (50, 90, 99)
+POPULATION_POINTS = 101  # Frequency points of a population read from Touchstone files
+ACTIVE_UNITS = 64  # Units the optimizer starts from
+ACTIVE_FREQUENCIES = 11  # Frequencies of each of them it starts from
+ACTIVE_ROUNDS = 8  # Rounds of adding the worst points outside the active set
+
+# gamma: Γ (P, F) through the network, unit_worst: max |Γ| over the band of each unit (P,),
+# worst_gamma: max over everything, worst_index: (unit, frequency index) of it,
+# percentiles: q -> percentile of unit_worst
+PopulationResult = namedtuple('PopulationResult',
+                              ['gamma', 'unit_worst', 'worst_gamma', 'worst_index', 'percentiles'])
+
+
+def population_array(loads, frequency):
+    """Loads as (P, F) over the frequencies; a (P,) population is the same at every frequency."""
+    loads = np.asarray(loads, dtype=complex)
+    if loads.ndim == 1:
+        loads = loads[:, None]
+    return np.broadcast_to(loads, (loads.shape[0], len(frequency)))
+
+
+def spread_population(load, units, spread, distribution='uniform', seed=None):
+    """Units scattered around a load: R and X move independently by up to spread x |Z_load| (its mean over
+    frequency), as in tolerance.monte_carlo. A load over frequency gives (units, F), one offset per unit.
+    """
+    load = np.asarray(load, dtype=complex)
+    rng = np.random.default_rng(seed)
+    offset = np.abs(load).mean() * spread * (deviation(rng, (units, 2), distribution) @ [1, 1j])
+    loads = load[None] + offset.reshape((units,) + (1,) * load.ndim)
+    return np.where(loads.real < 0, 1j * loads.imag, loads)  # No negative resistance
+
+
+def read_population(paths, frequency=None, points=POPULATION_POINTS):
+    """(frequencies, loads) of a population: one CSV or Parquet load list (r, x columns) gives (None, (P,)),
+    Touchstone files (one unit each) give (F,) and (P, F), resampled onto frequency, by default onto points
+    frequencies over the range every file covers."""
+    if len(paths) == 1 and not paths[0].lower().endswith(('.s1p', '.s2p')):
+        from batch_match import read_loads
+        return None, np.concatenate([loads for _, loads, _ in read_loads(paths[0], 65536, 1e9)])
+    from tdr import resample
+    from touchstone import read_touchstone, touchstone_load
+    units = [touchstone_load(read_touchstone(path)) for path in paths]
+    if frequency is None:
+        low, high = max(f[0] for f, _ in units), min(f[-1] for f, _ in units)
+        if low > high:
+            raise ValueError("The Touchstone files have no frequency range in common")
+        frequency = np.linspace(low, high, points if high > low else 1)
+    return frequency, np.array([resample(frequencies, loads, frequency) for frequencies, loads in units])
+
+
+def evaluate_population(loads, components, frequency, z0=Z0, percentiles=PERCENTILES):
+    """One network (components as for evaluate_network) against every unit, as a PopulationResult."""
+    frequency = np.atleast_1d(np.asarray(frequency, dtype=float))
+    loads = population_array(loads, frequency)
+    gamma = impedance_to_gamma(evaluate_network(loads, components, frequency), z0)
+    magnitude = np.nan_to_num(np.abs(gamma), nan=1.0)
+    unit_worst = magnitude.max(axis=1)
+    worst_index = np.unravel_index(int(np.argmax(magnitude)), magnitude.shape)
+    return PopulationResult(gamma, unit_worst, float(magnitude[worst_index]), worst_index,
+                            {q: float(np.percentile(unit_worst, q)) for q in percentiles})
+
+
+def optimize_population(loads, topology, frequency, starts=32, seed=None, z0=Z0, active_units=ACTIVE_UNITS,
+                        active_frequencies=ACTIVE_FREQUENCIES, rounds=ACTIVE_ROUNDS, **kwargs):
+    """Values for a topology minimizing the worst |Γ| over every unit and frequency.
+
+    Returns (OptimizedMatch, PopulationResult over the whole population); kwargs go to optimizer.optimize.
+    """
+    topology = list(topology)
+    frequency = np.atleast_1d(np.asarray(frequency, dtype=float))
+    loads = population_array(loads, frequency)
+    units, n = loads.shape
+    # The active set holds (unit, frequency) points as flat indices into loads. It starts with the units
+    # farthest from the population's center plus an even sample of the rest, each at a few frequencies
+    gamma_load = impedance_to_gamma(loads, z0)
+    extremity = np.abs(gamma_load - gamma_load.mean(axis=0)).max(axis=1)
+    chosen = np.union1d(np.argsort(-extremity)[:active_units // 2],
+                        np.linspace(0, units - 1, min(units, active_units // 2)).astype(int))
+    columns = np.unique(np.linspace(0, n - 1, min(n, active_frequencies)).astype(int))
+    active = (chosen[:, None] * n + columns).ravel()
+    flat_loads, flat_frequency = loads.ravel(), np.tile(frequency, units)
+    for _ in range(rounds):
+        match = optimize(flat_loads[active], topology, flat_frequency[active], 'worst', starts, seed=seed, z0=z0,
+                         **kwargs)
+        result = evaluate_population(loads, match.components, frequency, z0)
+        # Done when no point outside the active set is worse than the active set's worst case
+        magnitude = np.nan_to_num(np.abs(result.gamma), nan=1.0).ravel()
+        magnitude[active] = 0
+        worse = np.flatnonzero(magnitude > match.worst_gamma * (1 + 1e-3))
+        if not worse.size:
+            break
+        active = np.union1d(active, worse[np.argsort(-magnitude[worse])][:active_units * active_frequencies // 4])
+    return match, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match one network to a whole population of loads.")
+    parser.add_argument('loads', nargs='+', help="CSV/Parquet load list (r, x columns) or one Touchstone file per unit")
+    parser.add_argument('--network', required=True,
+                        help="Topology from the load, e.g. 'Shunt Capacitor,Series Inductor' (lumped L/C only)")
+    parser.add_argument('--band', type=float, nargs=2, default=[1000, 1000], metavar=('START', 'STOP'),
+                        help="Band in MHz (default: 1000 1000)")
+    parser.add_argument('--points', type=int, default=21, help="Frequency points in the band (default: 21)")
+    parser.add_argument('--starts', type=int, default=32, help="Random starting points of the optimizer")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the starting points")
+    parser.add_argument('--z0', type=float, default=Z0, help=f"Reference impedance (default: {Z0})")
+    args = parser.parse_args(argv)
+
+    # Names are matched like batch_match.parse_network does, 'shunt capacitor' is 'Shunt Capacitor'
+    topology = [' '.join(word.capitalize() for word in name.split()) for name in args.network.split(',') if name.strip()]
+    unknown = [name for name in topology if name not in LUMPED_TYPES]
+    if unknown or not topology:
+        parser.error(f"--network takes {', '.join(LUMPED_TYPES)}, got {', '.join(unknown) or 'nothing'}")
+    frequency = np.linspace(args.band[0] * 1e6, args.band[1] * 1e6, args.points if args.band[1] > args.band[0] else 1)
+    _, loads = read_population(args.loads, frequency)
+    start = time.perf_counter()
+    match, result = optimize_population(loads, topology, frequency, args.starts, args.seed, args.z0)
+    print(f"{len(loads)} units x {len(frequency)} frequencies, optimized in {time.perf_counter() - start:.2f} s")
+    for component, value in match.components:
+        print(f"  {component} = {value:.3f} {'nH' if 'Inductor' in component else 'pF'}")
+    print(f"Worst |Γ| {result.worst_gamma:.4f} (RL {return_loss_db(result.worst_gamma):.2f} dB), "
+          + ", ".join(f"p{q:g} {value:.4f}" for q, value in result.percentiles.items()))
+
+
+if __name__ == '__main__':
+    main()
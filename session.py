@@ -0,0 +1,149 @@
+"""Session files: the whole chart state in one binary container.
+
+A session file is an uncompressed zip (the same layout as np.savez) with a
+session.json member for the settings, load and network, and one .npy member
+per array (measured Touchstone data, sweep results, Monte Carlo histograms
+and density grids). Because the members are stored, not deflated, each
+array is a contiguous block of the file: load_session memory-maps them in
+place, so opening a multi-GB session only reads the headers and the data is
+paged in when it is first used (plotted).
+
+The state dict round-trips through JSON, so complex numbers are written as
+[re, im] pairs; to_json and from_json do the conversion.
+"""
+import json
+import os
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+
+from network import Element, Network
+from tolerance import StreamingHistogram, ToleranceResult
+
+SESSION_VERSION = 1
+STATE_MEMBER = 'session.json'
+
+# state: dict of settings (JSON types), arrays: dict of name -> array (memory-mapped when loaded from disk)
+Session = namedtuple('Session', ['state', 'arrays'])
+
+
+def to_json(value):
+    """Complex numbers as [re, im] pairs, recursively, so a state dict can be written as JSON."""
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def from_json(pair):
+    """Complex number from an [re, im] pair, None stays None."""
+    return None if pair is None else complex(*pair)
+
+
+def save_session(path, state, arrays=None):
+    """Write state (a JSON-compatible dict) and named arrays to a session file, replacing it atomically."""
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        with zipfile.ZipFile(temporary, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+            archive.writestr(STATE_MEMBER, json.dumps(dict(to_json(state), version=SESSION_VERSION), indent=1))
+            for name, array in (arrays or {}).items():
+                with archive.open(f'{name}.npy', 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_session(path, mmap=True):
+    """Read a session file into a Session; arrays are read-only memory maps unless mmap is False."""
+    try:
+        return read_session(path, mmap)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a session file: {e}") from None
+
+
+def read_session(path, mmap):
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        state = json.loads(archive.read(STATE_MEMBER))
+        if state.get('version', 0) > SESSION_VERSION:
+            raise ValueError(f"Session file version {state['version']} is newer than this program")
+        for info in archive.infolist():
+            if not info.filename.endswith('.npy'):
+                continue
+            name = info.filename[:-len('.npy')]
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            # The member data starts after its local file header, whose name and extra fields vary in length
+            f.seek(info.header_offset)
+            header = f.read(30)
+            if header[:4] != b'PK\x03\x04':
+                raise ValueError(f"Corrupt session file: bad header for {info.filename}")
+            f.seek(info.header_offset + 30 + int.from_bytes(header[26:28], 'little')
+                   + int.from_bytes(header[28:30], 'little'))
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"Session array {name} holds Python objects")
+            if not np.prod(shape):
+                arrays[name] = np.zeros(shape, dtype=dtype)  # Nothing to map
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return Session(state, arrays)
+
+
+def network_state(network):
+    """JSON-compatible description of a network's load and elements."""
+    return {
+        'load': to_json(None if network.load is None else complex(network.load)),
+        'elements': [{'component': element.component, 'value': element.value, 'frequency': element.frequency,
+                      'line_impedance': element.line_impedance, 'eeff': element.eeff} for element in network],
+    }
+
+
+def network_from_state(state):
+    """Network rebuilt from network_state output."""
+    return Network(from_json(state['load']),
+                   [Element(e['component'], e['value'], e['frequency'], e['line_impedance'], e['eeff'])
+                    for e in state['elements']])
+
+
+def tolerance_state(result, prefix='tolerance_'):
+    """(state, arrays) describing a ToleranceResult; histogram counts and density go in arrays."""
+    state = {'samples': result.samples, 'spec_db': result.spec_db, 'passed': result.passed,
+             'percentiles': sorted(result.band_percentiles)}
+    arrays = {f'{prefix}frequency': result.frequency, f'{prefix}density': result.density}
+    for name in ('return_loss', 'vswr'):
+        histogram = getattr(result, name)
+        state[name] = {'low': histogram.low, 'high': histogram.high, 'bins': histogram.bins, 'log': histogram.log}
+        arrays[f'{prefix}{name}_counts'] = histogram.counts
+    for q, values in result.band_percentiles.items():
+        arrays[f'{prefix}band_p{q:g}'] = values
+    return state, arrays
+
+
+def tolerance_from_state(state, arrays, prefix='tolerance_'):
+    """ToleranceResult rebuilt from tolerance_state output (arrays may be memory maps)."""
+    histograms = {}
+    for name in ('return_loss', 'vswr'):
+        h = state[name]
+        # The stored limits are already log10 for log histograms
+        low, high = (10 ** h['low'], 10 ** h['high']) if h['log'] else (h['low'], h['high'])
+        histograms[name] = StreamingHistogram(low, high, h['bins'], h['log'])
+        histograms[name].counts = np.array(arrays[f'{prefix}{name}_counts'])
+    band_percentiles = {q: arrays[f'{prefix}band_p{q:g}'] for q in state['percentiles']}
+    return ToleranceResult(state['samples'], arrays[f'{prefix}frequency'], histograms['return_loss'],
+                           histograms['vswr'], band_percentiles, state['spec_db'], state['passed'],
+                           arrays[f'{prefix}density'])
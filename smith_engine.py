@@ -0,0 +1,184 @@
+"""Headless NumPy engine for the Smith Chart tool.
+
+Nothing in here imports matplotlib or tkinter, so these functions can be used
+from batch jobs without starting a GUI. Every function accepts Python scalars
+or NumPy arrays of any shape (inputs broadcast against each other) and returns
+a scalar for scalar input or an array of the broadcast shape otherwise.
+
+Elements are lumped series/shunt inductors and capacitors (values in nH/pF)
+or transmission-line elements: a series line section and shunt open/short
+stubs, whose value is the physical length in mm with a characteristic
+impedance and an effective permittivity (εeff). Lines are written as
+(component, length, line impedance, εeff) where lumped elements are
+(component, value) pairs.
+"""
+import numpy as np
+
+Z0 = 50  # Default characteristic impedance (50 Ω)
+SPEED_OF_LIGHT = 299792458.0  # m/s
+LUMPED_TYPES = ["Series Inductor", "Series Capacitor", "Shunt Inductor", "Shunt Capacitor"]
+LINE_TYPES = ["Series Line", "Shunt Open Stub", "Shunt Short Stub"]
+COMPONENT_TYPES = LUMPED_TYPES + LINE_TYPES
+
+
+def impedance_to_gamma(Z, z0=Z0):
+    """Convert impedance to reflection coefficient."""
+    z_normalized = np.asarray(Z, dtype=complex) / z0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = (z_normalized - 1) / (z_normalized + 1)
+    return gamma[()]  # [()] unwraps 0-d arrays to scalars, leaves n-d arrays alone
+
+
+def gamma_to_impedance(gamma, z0=Z0):
+    """Convert reflection coefficient to impedance."""
+    gamma = np.asarray(gamma, dtype=complex)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Z = (1 + gamma) / (1 - gamma) * z0  # Γ = 1 (an open) gives NaN
+    return Z[()]
+
+
+def add_series_component(Z, reactance):
+    """Add a series component (inductor or capacitor) with given reactance."""
+    return (np.asarray(Z, dtype=complex) + 1j * np.asarray(reactance, dtype=float))[()]
+
+
+def add_shunt_component(Z, reactance):
+    """Add a shunt component (inductor or capacitor) with given reactance."""
+    Z, reactance = np.broadcast_arrays(np.asarray(Z, dtype=complex), np.asarray(reactance, dtype=float))
+    with np.errstate(invalid='ignore'):  # NaN inputs simply give NaN results
+        # Current admittance, Y = inf where Z is a short
+        Y = np.divide(1, Z, out=np.full(Z.shape, np.inf, dtype=complex), where=Z != 0)
+        # Admittance of shunt component (Y = -j / X), zero reactance adds nothing
+        Y_component = np.divide(-1j, reactance, out=np.zeros(Z.shape, dtype=complex), where=reactance != 0)
+        Y_new = Y + Y_component
+        # Where the admittances cancel exactly, keep the original impedance
+        mask = (Y_new != 0) & np.isfinite(Y_new)
+        Z_new = np.where(Y_new == 0, Z, 0).astype(complex)
+        np.divide(1, Y_new, out=Z_new, where=mask)
+    return Z_new[()]
+
+
+def add_series_line(Z, line_impedance, theta):
+    """Impedance Z seen through a lossless line section of electrical length theta (radians)."""
+    Z = np.asarray(Z, dtype=complex)
+    t = np.tan(theta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Z_new = line_impedance * (Z + 1j * line_impedance * t) / (line_impedance + 1j * Z * t)
+        # An open load (Z = inf) looks like an open stub
+        Z_new = np.where(np.isinf(Z), -1j * line_impedance / t, Z_new)
+    return Z_new[()]
+
+
+def electrical_length(length, frequency, eeff=1.0):
+    """Electrical length in radians of a line length in mm at frequency in Hz."""
+    return (2 * np.pi * np.asarray(frequency, dtype=float) * np.asarray(length, dtype=float) * 1e-3
+            * np.sqrt(eeff) / SPEED_OF_LIGHT)[()]
+
+
+def physical_length(degrees, frequency, eeff=1.0):
+    """Line length in mm with the given electrical length in degrees at frequency in Hz."""
+    return (np.asarray(degrees, dtype=float) / 360 * SPEED_OF_LIGHT / (np.asarray(frequency, dtype=float)
+                                                                       * np.sqrt(eeff)) * 1e3)[()]
+
+
+def component_unit(component):
+    """Unit of a component value: nH, pF or mm (line length)."""
+    if component in LINE_TYPES:
+        return 'mm'
+    return 'nH' if "Inductor" in component else 'pF'
+
+
+def component_reactance(component, value, frequency, line_impedance=Z0, eeff=1.0):
+    """Reactance of an inductor (value in nH), capacitor (value in pF) or stub (length in mm) at frequency in Hz."""
+    value = np.asarray(value, dtype=float)
+    omega = 2 * np.pi * np.asarray(frequency, dtype=float)
+    if "Stub" in component:
+        theta = electrical_length(value, frequency, eeff)
+        with np.errstate(divide='ignore'):
+            if "Open" in component:
+                return (-line_impedance / np.tan(theta))[()]  # Zero length is -inf: no stub at all
+            return (line_impedance * np.tan(theta))[()]
+    if "Inductor" in component:
+        return (omega * value * 1e-9)[()]  # Convert nH to H
+    # Capacitor, zero capacitance gives zero reactance like the GUI always has
+    C = value * 1e-12  # Convert pF to F
+    omega_C = omega * C
+    return np.divide(-1, omega_C, out=np.zeros(np.broadcast(omega_C).shape), where=omega_C != 0)[()]
+
+
+def apply_component(Z, component, value, frequency, line_impedance=Z0, eeff=1.0):
+    """Impedance Z seen through one element of any type at frequency in Hz."""
+    if component == "Series Line":
+        return add_series_line(Z, line_impedance, electrical_length(value, frequency, eeff))
+    reactance = component_reactance(component, value, frequency, line_impedance, eeff)
+    if "Series" in component:
+        return add_series_component(Z, reactance)
+    return add_shunt_component(Z, reactance)
+
+
+def component_abcd(component, value, frequency, line_impedance=Z0, eeff=1.0):
+    """ABCD parameters (A, B, C, D) of one element, one entry per frequency."""
+    if component == "Series Line":
+        theta = np.asarray(electrical_length(value, frequency, eeff))
+        cos, sin = np.cos(theta).astype(complex), np.sin(theta)
+        return cos, 1j * line_impedance * sin, 1j * sin / line_impedance, cos
+    reactance = np.asarray(component_reactance(component, value, frequency, line_impedance, eeff))
+    one = np.ones(reactance.shape, dtype=complex)
+    zero = np.zeros(reactance.shape, dtype=complex)
+    if "Series" in component:
+        return one, 1j * reactance, zero, one
+    # Shunt: Y = -j / X, zero reactance adds nothing (same convention as add_shunt_component)
+    with np.errstate(invalid='ignore'):
+        Y = np.divide(-1j, reactance, out=zero.copy(), where=reactance != 0)
+    return one, zero, Y, one
+
+
+def cascade_abcd(components, frequency):
+    """Cascade (component, value) pairs and line tuples, ordered from the load outward, into one ABCD set."""
+    frequency = np.asarray(frequency, dtype=float)
+    A = np.ones(frequency.shape, dtype=complex)
+    B = np.zeros(frequency.shape, dtype=complex)
+    C = np.zeros(frequency.shape, dtype=complex)
+    D = np.ones(frequency.shape, dtype=complex)
+    for component, value, *line in components:
+        a, b, c, d = component_abcd(component, value, frequency, *line)
+        # The new element sits on the source side, so it multiplies from the left
+        A, B, C, D = a * A + b * C, a * B + b * D, c * A + d * C, c * B + d * D
+    return A, B, C, D
+
+
+def evaluate_network(load, components, frequency):
+    """Input impedance of the load seen through the matching network at every frequency."""
+    A, B, C, D = cascade_abcd(components, frequency)
+    load = np.asarray(load, dtype=complex)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((A * load + B) / (C * load + D))[()]
+
+
+def return_loss_db(gamma):
+    """Return loss in dB (positive number) for a reflection coefficient."""
+    with np.errstate(divide='ignore'):
+        return (-20 * np.log10(np.abs(gamma)))[()]
+
+
+def sweep_network(load, components, frequency, z0=Z0):
+    """Evaluate the network across a frequency sweep, returning Γ(f) and return loss(f)."""
+    gamma = impedance_to_gamma(evaluate_network(load, components, frequency), z0)
+    return gamma, return_loss_db(gamma)
+
+
+def reactance_to_component(reactance, frequency):
+    """Inverse of component_reactance: (is_inductor, value in nH or pF) for a series or shunt reactance."""
+    reactance = np.asarray(reactance, dtype=float)
+    omega = 2 * np.pi * np.asarray(frequency, dtype=float)
+    is_inductor = reactance > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(is_inductor, reactance / omega * 1e9, -1 / (omega * reactance) * 1e12)
+    return is_inductor[()], value[()]
+
+
+def vswr(gamma):
+    """Voltage standing wave ratio for a reflection coefficient."""
+    magnitude = np.abs(gamma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(magnitude < 1, (1 + magnitude) / (1 - magnitude), np.inf)[()]
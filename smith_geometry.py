@@ -0,0 +1,181 @@
+"""Static Smith chart grid geometry, computed once and cached on disk.
+
+The resistance circles, reactance arcs and label layout only depend on the
+grid values, the curve sampling density and Z0, so they are computed once
+with NumPy and stored as an .npz file keyed by those inputs. Later starts
+load the arrays instead of rebuilding every curve. Set SMITHCHART_CACHE to
+move the cache directory, or to an empty string to disable it.
+
+Curves are stored as (curves, points, 2) vertex arrays, which is exactly the
+segment layout a matplotlib LineCollection takes, so any grid density draws
+as a handful of artists. The admittance chart is the same geometry mirrored
+through the chart center (Γ -> -Γ).
+"""
+import hashlib
+import os
+
+import numpy as np
+
+RESISTANCES = (0, 0.5, 1, 2, 5)  # Normalized constant resistance circles
+REACTANCES = (0, 0.5, 1, 2)  # Normalized constant reactance arcs (drawn as ±jx)
+CURVE_POINTS = 200  # Vertices per circle or arc
+GEOMETRY_VERSION = 2  # Bump when the geometry layout changes so stale cache files are ignored
+GRID_DENSITIES = {'Standard': 0, 'Dense': 40, 'Very Dense': 200}  # Contours per family (0 = default grid)
+MAJOR_VALUES = (0, 0.2, 0.5, 1, 2, 5, 10, 20)  # Values that get a label on generated grids
+CACHE_DIR = os.environ.get('SMITHCHART_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'smithchart'))
+
+# Hand-placed labels for the default grid: normalized value -> (x, y, ha, va, rotation)
+RESISTANCE_LABELS = {
+    0: (-1.05, 0.0, 'right', 'center', 0),
+    0.5: (-0.20, 0.05, 'right', 'center', 0),
+    1: (0.15, 0.05, 'right', 'center', 0),
+    2: (0.50, 0.05, 'right', 'center', 0),
+    5: (0.90, 0.10, 'right', 'center', 0),
+}
+REACTANCE_LABELS = {
+    0: [(-0.75, 0.025, 'left', 'bottom', 0)],
+    0.5: [(-0.52, 0.65, 'center', 'center', -45), (-0.52, -0.65, 'center', 'center', 45)],
+    1: [(-0.01, 0.75, 'center', 'center', -70), (-0.01, -0.75, 'center', 'center', 70)],
+    2: [(0.45, 0.402, 'center', 'center', -85), (0.45, -0.402, 'center', 'center', 85)],
+}
+
+
+def resistance_circle(r, points=CURVE_POINTS):
+    """Vertices (points, 2) of the constant resistance circle for normalized r > 0."""
+    theta = np.linspace(0, 2 * np.pi, points)
+    return np.column_stack([r / (1 + r) + np.cos(theta) / (1 + r), np.sin(theta) / (1 + r)])
+
+
+def reactance_arc(x, points=CURVE_POINTS):
+    """Vertices (points, 2) of the upper constant reactance arc for normalized x > 0.
+
+    The arc runs from the open-circuit point Γ = 1 to where it meets the outer circle,
+    so every vertex lies on the chart.
+    """
+    center_y = 1 / x
+    radius = 1 / x
+    # Where the arc meets the unit circle, Γ = (x² - 1 + 2jx) / (x² + 1)
+    edge_x, edge_y = (x**2 - 1) / (x**2 + 1), 2 * x / (x**2 + 1)
+    phi_end = np.arctan2(edge_y - center_y, edge_x - 1) % (2 * np.pi)
+    phi = np.linspace(1.5 * np.pi, phi_end, points)  # 1.5π is the Γ = 1 end, directly below the center
+    return np.column_stack([1 + radius * np.cos(phi), center_y + radius * np.sin(phi)])
+
+
+def grid_values(count):
+    """Normalized values for a generated grid with about count contours per family (0 gives the default grid)."""
+    if not count:
+        return RESISTANCES, REACTANCES
+    values = np.geomspace(0.05, 50, count - 1)
+    # Round to two significant digits so contours land on readable values
+    step = 10.0 ** (np.floor(np.log10(values)) - 1)
+    values = np.unique(np.round(np.round(values / step) * step, 6))
+    values = tuple(np.union1d(values, MAJOR_VALUES).tolist())  # Labelled values always get a contour
+    return values, values
+
+
+def format_ohms(value):
+    """Format a resistance or reactance in ohms for a grid label."""
+    return f'{value:.4g} Ω'
+
+
+def resistance_label(r):
+    """Generated label placement for a resistance circle: just right of where it crosses the real axis."""
+    return ((r - 1) / (r + 1) + 0.01, 0.01, 'left', 'bottom', 90)
+
+
+def reactance_labels(x):
+    """Generated label placements for a ±jx arc: just outside the chart where the arc meets the edge."""
+    angle = np.arctan2(2 * x, x**2 - 1)
+    upper = (1.04 * np.cos(angle), 1.04 * np.sin(angle), 'center', 'center', np.degrees(angle) - 90)
+    lower = (upper[0], -upper[1], 'center', 'center', -upper[4])
+    return [upper, lower]
+
+
+def chart_labels(resistances, reactances, z0):
+    """Label layout for the grid: text, position, alignment and rotation of every label.
+
+    Values of the default grid keep their hand-placed labels, other major values get generated ones.
+    """
+    text, xy, ha, va, rotation, kind, value = [], [], [], [], [], [], []
+    for r in resistances:
+        if r in RESISTANCE_LABELS or (r in MAJOR_VALUES and r > 0):
+            x, y, h, v, angle = RESISTANCE_LABELS.get(r) or resistance_label(r)
+            text.append(format_ohms(r * z0))
+            xy.append((x, y))
+            ha.append(h)
+            va.append(v)
+            rotation.append(angle)
+            kind.append('r')
+            value.append(r)
+    for reactance in reactances:
+        if reactance in REACTANCE_LABELS:
+            placements = REACTANCE_LABELS[reactance]
+        elif reactance in MAJOR_VALUES:
+            placements = reactance_labels(reactance)
+        else:
+            continue
+        for (x, y, h, v, angle), sign in zip(placements, ('', '-')):
+            text.append(f'{sign}j{format_ohms(reactance * z0)}')
+            xy.append((x, y))
+            ha.append(h)
+            va.append(v)
+            rotation.append(angle)
+            kind.append('x')
+            value.append(reactance)
+    return {
+        'label_text': np.array(text, dtype=str),
+        'label_xy': np.array(xy, dtype=float).reshape(-1, 2),
+        'label_ha': np.array(ha, dtype=str),
+        'label_va': np.array(va, dtype=str),
+        'label_rotation': np.array(rotation, dtype=float),
+        'label_kind': np.array(kind, dtype=str),
+        'label_value': np.array(value, dtype=float),
+    }
+
+
+def compute_geometry(resistances=RESISTANCES, reactances=REACTANCES, z0=50, points=CURVE_POINTS):
+    """Grid curves and labels as a dict of NumPy arrays."""
+    resistances = np.asarray(resistances, dtype=float)
+    reactances = np.asarray(reactances, dtype=float)
+    positive_r = resistances[resistances > 0]
+    positive_x = reactances[reactances > 0]
+    geometry = {
+        'resistances': resistances,
+        'reactances': reactances,
+        'resistance_curves': np.array([resistance_circle(r, points) for r in positive_r]).reshape(-1, points, 2),
+        # Upper (+jx) arcs; the lower (-jx) arcs are their mirror images
+        'reactance_curves': np.array([reactance_arc(x, points) for x in positive_x]).reshape(-1, points, 2),
+    }
+    geometry.update(chart_labels(resistances.tolist(), reactances.tolist(), z0))
+    return geometry
+
+
+def cache_path(resistances, reactances, z0, points):
+    """Cache file for a grid, named by a hash of everything the geometry depends on."""
+    key = repr((GEOMETRY_VERSION, tuple(map(float, resistances)), tuple(map(float, reactances)), float(z0), points))
+    return os.path.join(CACHE_DIR, f'geometry-{hashlib.sha1(key.encode()).hexdigest()[:16]}.npz')
+
+
+def chart_geometry(resistances=RESISTANCES, reactances=REACTANCES, z0=50, points=CURVE_POINTS):
+    """Grid geometry from the disk cache, computing and storing it on a miss.
+
+    Returns (geometry, cached) where cached tells whether it came from disk.
+    """
+    path = cache_path(resistances, reactances, z0, points) if CACHE_DIR else None
+    if path and os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}, True
+        except (OSError, ValueError):
+            pass  # Corrupt or partial file, rebuild it below
+    geometry = compute_geometry(resistances, reactances, z0, points)
+    if path:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as f:
+                np.savez(f, **geometry)
+            os.replace(temporary, path)  # Atomic, so a concurrent start never reads half a file
+        except OSError:
+            pass  # A read-only home directory just means no cache
+    return geometry, False
@@ -0,0 +1,240 @@
+"""Headless Smith chart drawing shared by the GUI, batch PNG output and rendering services.
+
+Only the object-oriented matplotlib API is used here (no pyplot), so importing
+this module never selects a GUI backend. render_chart draws with the Agg canvas.
+
+Long traces (sweeps and measured data with up to millions of points) are drawn
+as DecimatedLine artists: at every draw they keep only the points that change
+which pixel the trace passes through in the current view, so the full data
+stays available for readouts while matplotlib only strokes what can be seen.
+"""
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Circle
+
+from smith_engine import Z0, impedance_to_gamma
+from smith_geometry import chart_geometry
+
+# Grid colors by normalized value
+R_COLORS = {0: 'blue', 0.5: 'green', 1: 'red', 2: 'purple', 5: 'orange'}
+X_COLORS = {0: 'gray', 0.5: 'cyan', 1: 'magenta', 2: 'brown'}
+ADMITTANCE_COLOR = 'teal'  # Constant conductance and susceptance curves
+LOD_MIN_POINTS = 4096  # Traces up to this length are drawn as they are
+LOD_MAX_POINTS = 20000  # Cap on drawn points per trace after pixel decimation (min/max buckets beyond it)
+CIRCLE_POINTS = 97  # Vertices of each design circle (closed, the last repeats the first)
+
+
+def format_impedance(Z, name='Z'):
+    """Format an impedance as 'Z = R ± jX Ω' for chart labels."""
+    R = Z.real
+    X = Z.imag
+    if abs(X) < 0.1:
+        return f'{name} = {R:.1f} Ω'
+    sign = '+' if X >= 0 else '-'
+    return f'{name} = {R:.1f} {sign} j{abs(X):.1f} Ω'
+
+
+def label_position(gamma_x, gamma_y):
+    """Place a label next to a point, offset towards the chart center."""
+    offset = 0.1
+    ha = 'left' if gamma_x < 0 else 'right'
+    va = 'bottom' if gamma_y < 0 else 'top'
+    text_x = gamma_x + offset if gamma_x < 0 else gamma_x - offset
+    text_y = gamma_y + offset if gamma_y < 0 else gamma_y - offset
+    return text_x, text_y, ha, va
+
+
+def grid_colors(values, colors):
+    """Per-curve colors for a family of grid curves, light gray for values without a color of their own."""
+    return [colors.get(value, 'lightgray') for value in values]
+
+
+def draw_chart_grid(ax, z0=Z0, geometry=None, admittance=False):
+    """Draw the static chart (boundary, resistance circles, reactance arcs, labels) into ax.
+
+    geometry comes from smith_geometry.chart_geometry and is looked up for z0 when not given.
+    Each curve family is a single LineCollection, so dense grids stay a handful of artists.
+    Everything is drawn at zorder 1, below trajectories even when the grid is redrawn later.
+    With admittance=True the constant conductance and susceptance curves are overlaid too.
+    Returns every artist that makes up the grid.
+    """
+    if geometry is None:
+        geometry, _ = chart_geometry(z0=z0)
+    ax.set_aspect('equal')
+    ax.set_xlim(-1.2, 1.2)
+    ax.set_ylim(-1.2, 1.2)
+    ax.axis('off')
+
+    # Draw the outer boundary
+    outer_circle = Circle((0, 0), 1, fill=False, color='black', linewidth=1.5)
+    ax.add_patch(outer_circle)
+    artists = [outer_circle]
+
+    # Constant resistance circles (r = 0 is the outer boundary, marked with a dot)
+    resistances = geometry['resistances']
+    positive_r = resistances[resistances > 0]
+    if (resistances == 0).any():
+        artists += ax.plot(-1, 0, 'o', color=R_COLORS[0], markersize=5, zorder=1)
+    artists.append(ax.add_collection(LineCollection(
+        geometry['resistance_curves'], colors=grid_colors(positive_r, R_COLORS), linewidths=1, zorder=1)))
+
+    # Constant reactance arcs, upper and mirrored lower halves in one collection
+    reactances = geometry['reactances']
+    positive_x = reactances[reactances > 0]
+    if (reactances == 0).any():
+        artists += ax.plot([-1, 1], [0, 0], color=X_COLORS[0], linewidth=1, linestyle='--', zorder=1)
+    upper = geometry['reactance_curves']
+    lower = upper * [1, -1]
+    arcs = np.concatenate([upper, lower])
+    artists.append(ax.add_collection(LineCollection(
+        arcs, colors=grid_colors(positive_x, X_COLORS) * 2, linewidths=1, linestyles='--', zorder=1)))
+
+    # Admittance chart: the impedance curves mirrored through the center (Γ -> -Γ)
+    if admittance:
+        artists.append(ax.add_collection(LineCollection(
+            -geometry['resistance_curves'], colors=ADMITTANCE_COLOR, linewidths=0.8, alpha=0.6, zorder=1)))
+        artists.append(ax.add_collection(LineCollection(
+            -arcs, colors=ADMITTANCE_COLOR, linewidths=0.8, linestyles=':', alpha=0.6, zorder=1)))
+
+    # Labels
+    for text, (x, y), ha, va, rotation, kind, value in zip(
+            geometry['label_text'], geometry['label_xy'], geometry['label_ha'], geometry['label_va'],
+            geometry['label_rotation'], geometry['label_kind'], geometry['label_value']):
+        color = (R_COLORS if kind == 'r' else X_COLORS).get(value, 'gray')
+        artists.append(ax.text(x, y, str(text), color=color, fontsize=9, ha=str(ha), va=str(va),
+                               rotation=rotation, rotation_mode='anchor', zorder=1))
+    return artists
+
+
+def density_image(density, color='purple'):
+    """RGBA image of a 2-D count grid: the color with an opacity that grows with the log of the count."""
+    counts = np.asarray(density, dtype=float)
+    peak = counts.max()
+    image = np.zeros(counts.shape + (4,))
+    image[..., :3] = to_rgba(color)[:3]
+    if peak:
+        image[..., 3] = 0.85 * np.log1p(counts) / np.log1p(peak)
+    return image
+
+
+def decimate_trace(x, y, xlim, ylim, width, height, max_points=LOD_MAX_POINTS):
+    """Indices of the points of a trace worth drawing in a view of width x height pixels.
+
+    Points are binned to pixels: of every run of consecutive points in one pixel only the first and
+    last are kept, and runs outside the view are dropped except for the points next to it, so the
+    drawn polyline covers exactly the same pixels. If that still leaves more than max_points, each
+    bucket of consecutive points keeps its extremes in x and y (min/max decimation).
+    Returns (index, breaks) where breaks marks kept points preceded by dropped off-view points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    with np.errstate(invalid='ignore'):
+        px = np.floor((x - xlim[0]) * (width / (xlim[1] - xlim[0])))
+        py = np.floor((y - ylim[0]) * (height / (ylim[1] - ylim[0])))
+        inside = (px >= -1) & (px <= width) & (py >= -1) & (py <= height)  # One pixel margin
+    # Keep points inside and their neighbours, so segments crossing the view edge are still drawn
+    keep = inside.copy()
+    keep[1:] |= inside[:-1]
+    keep[:-1] |= inside[1:]
+    cell = np.where(inside, px * (height + 2) + py, -1)
+    changed = np.ones(len(x), dtype=bool)
+    changed[1:] = cell[1:] != cell[:-1]
+    last = np.ones(len(x), dtype=bool)
+    last[:-1] = changed[1:]
+    index = np.flatnonzero(keep & (changed | last))
+    if len(index) > max_points:
+        index = index[minmax_buckets(x[index], y[index], max_points)]
+    # A dropped run of off-view (or non-finite) points becomes a gap in the line
+    dropped = np.cumsum(~keep)
+    breaks = np.zeros(len(index), dtype=bool)
+    breaks[1:] = dropped[index[1:]] != dropped[index[:-1]]
+    return index, breaks
+
+
+def minmax_buckets(x, y, max_points):
+    """Indices keeping the first, last, min and max x and y point of each of about max_points / 4 buckets."""
+    size = -(-4 * len(x) // max_points)  # Ceiling division
+    buckets = -(-len(x) // size)
+    pad = buckets * size - len(x)
+    picks = [np.arange(buckets) * size, np.minimum(np.arange(1, buckets + 1) * size, len(x)) - 1]
+    for values in (x, y):
+        values = np.pad(np.nan_to_num(values), (0, pad), mode='edge').reshape(buckets, size)
+        offsets = np.arange(buckets) * size
+        picks += [np.minimum(offsets + values.argmin(axis=1), len(x) - 1),
+                  np.minimum(offsets + values.argmax(axis=1), len(x) - 1)]
+    return np.unique(np.concatenate(picks))
+
+
+class DecimatedLine(Line2D):
+    """Line2D that keeps its full data and draws a decimated copy for the current view and pixel size.
+
+    set_data stores the full-resolution trace (full_x, full_y); decimation reruns at draw time only
+    when the data, the view limits or the axes size changed, so panning and zooming re-decimate once per frame.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.full_x = self.full_y = np.empty(0)
+        self._lod_key = None
+        super().__init__(*args, **kwargs)
+
+    def set_data(self, *args):
+        x, y = args[0] if len(args) == 1 else args
+        self.full_x = np.asarray(x, dtype=float)
+        self.full_y = np.asarray(y, dtype=float)
+        self._lod_key = None
+        super().set_data(self.full_x, self.full_y)
+
+    def draw(self, renderer):
+        if len(self.full_x) > LOD_MIN_POINTS and self.axes is not None:
+            bbox = self.axes.bbox
+            key = (tuple(self.axes.get_xlim()), tuple(self.axes.get_ylim()), round(bbox.width), round(bbox.height))
+            if key != self._lod_key:
+                self._lod_key = key
+                index, breaks = decimate_trace(self.full_x, self.full_y, key[0], key[1], key[2], key[3])
+                x, y = self.full_x[index], self.full_y[index]
+                # NaN before every gap so the line does not jump across dropped off-view runs
+                gaps = np.flatnonzero(breaks)
+                super().set_data(np.insert(x, gaps, np.nan), np.insert(y, gaps, np.nan))
+        super().draw(renderer)
+
+
+def circle_segments(center, radius, points=CIRCLE_POINTS):
+    """Γ vertices of circles, complex array (k, points), for a LineCollection; circles with a NaN radius are left out."""
+    center, radius = np.ravel(center), np.ravel(radius)
+    keep = np.isfinite(center) & np.isfinite(radius)
+    return center[keep, None] + radius[keep, None] * np.exp(1j * np.linspace(0, 2 * np.pi, points))
+
+
+def plot_trajectory(ax, impedance_points, z0=Z0, paths=None):
+    """Draw impedance points as labelled markers (blue load, green matching steps).
+
+    They are joined by the element paths in Γ (network.Network.paths) when given, else by straight lines.
+    """
+    gamma = impedance_to_gamma(np.asarray(impedance_points, dtype=complex), z0)
+    line = np.concatenate([gamma[:1]] + list(paths)) if paths is not None else gamma
+    ax.plot(line.real, line.imag, 'g-', linewidth=1)
+    colors = ['blue'] + ['green'] * (len(gamma) - 1)
+    ax.scatter(gamma.real, gamma.imag, s=64, c=colors[:len(gamma)], zorder=3)
+    for i, (Z, point) in enumerate(zip(impedance_points, gamma)):
+        text_x, text_y, ha, va = label_position(point.real, point.imag)
+        ax.text(text_x, text_y, format_impedance(Z, f'Z{i}'), fontsize=10, ha=ha, va=va,
+                color='black', bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
+
+def render_chart(output, impedance_points=(), sweep_gamma=None, title=None, z0=Z0, format=None, dpi=100, paths=None):
+    """Render a Smith chart with a trajectory (and optional sweep trace) to a file path or file object."""
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0.15, 0.05, 0.80, 0.90])
+    draw_chart_grid(ax, z0)
+    if sweep_gamma is not None:
+        ax.add_line(DecimatedLine(np.real(sweep_gamma), np.imag(sweep_gamma), color='darkorange', linewidth=1.5))
+    if len(impedance_points):
+        plot_trajectory(ax, impedance_points, z0, paths)
+    fig.text(0.5, 0.97, title or f"Smith Chart (Z₀ = {z0:g} Ω) with Constant Resistance and Reactance",
+             fontsize=12, ha='center', va='top')
+    fig.savefig(output, format=format, dpi=dpi)
@@ -0,0 +1,125 @@
+"""Uniform grid spatial index for nearest-point lookups in the Γ plane.
+
+Points are bucketed into square cells by a counting sort (one argsort of
+their cell numbers), so a lookup only measures the points in a block of
+cells around the query point, doubling it until the nearest point found is
+provably the nearest, instead of scanning every point. Hover and click
+lookups pass a max_distance (a few pixels), which bounds the block size. The grid is
+sized for about POINTS_PER_CELL points per cell and built lazily on the first
+lookup after the data changed.
+
+Trajectories change from some point onward, so the index also supports
+truncate() and extend(): dropped points are filtered out of the cells and
+new points are kept in a short pending list that is scanned directly, until
+it is large enough that rebuilding the grid is cheaper.
+"""
+import numpy as np
+
+POINTS_PER_CELL = 2  # Average occupancy of non-empty grid extents
+MAX_CELLS = 2048  # Cells per side
+PENDING_LIMIT = 1024  # Points scanned linearly before the grid is rebuilt (at least 1/8 of the indexed points)
+
+
+class GridIndex:
+    """Nearest-point index over complex points (Γ values); non-finite points are never returned."""
+
+    def __init__(self, points=()):
+        self.set_points(points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def set_points(self, points):
+        """Replace every point; the grid is rebuilt at the next lookup."""
+        self.points = np.array(points, dtype=complex).ravel()
+        self._indexed = 0  # Points [0, _indexed) are in the grid, the rest are pending
+        self._order = np.empty(0, dtype=np.int64)
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._stale = len(self.points) > 0
+
+    def extend(self, points):
+        """Append points; they are searched directly until the next rebuild."""
+        self.points = np.concatenate([self.points, np.asarray(points, dtype=complex).ravel()])
+        if len(self.points) - self._indexed > max(PENDING_LIMIT, self._indexed // 8):
+            self._stale = True
+
+    def truncate(self, n):
+        """Drop every point from index n onward."""
+        self.points = self.points[:n]
+        if n < self._indexed // 2:  # Mostly dropped, the grid is not worth filtering anymore
+            self._stale = True
+        self._indexed = min(self._indexed, n)  # Points appended from n onward are pending, not in the grid
+
+    def build(self):
+        """Bucket every finite point into the grid."""
+        finite = np.flatnonzero(np.isfinite(self.points))
+        gamma = self.points[finite]
+        if len(gamma):
+            self._low = complex(gamma.real.min(), gamma.imag.min())
+            extent = max(gamma.real.max() - self._low.real, gamma.imag.max() - self._low.imag, 1e-12)
+        else:
+            self._low, extent = 0j, 1.0
+        self._cells = int(np.clip(np.sqrt(len(gamma) / POINTS_PER_CELL), 1, MAX_CELLS))
+        self._size = extent / self._cells * (1 + 1e-9)  # The top edge falls inside the last cell
+        cell = self._cell_numbers(gamma)
+        order = np.argsort(cell, kind='stable')
+        self._order = finite[order]
+        self._starts = np.concatenate([[0], np.cumsum(np.bincount(cell, minlength=self._cells ** 2))])
+        self._indexed = len(self.points)
+        self._stale = False
+
+    def _cell_numbers(self, gamma):
+        ix = np.clip(((gamma.real - self._low.real) / self._size).astype(np.int64), 0, self._cells - 1)
+        iy = np.clip(((gamma.imag - self._low.imag) / self._size).astype(np.int64), 0, self._cells - 1)
+        return iy * self._cells + ix
+
+    def nearest(self, point, max_distance=np.inf):
+        """(index, distance) of the point closest to point, or (None, inf) if none is within max_distance."""
+        if self._stale:
+            self.build()
+        best, best_distance = None, max_distance
+        # Pending points (appended since the last build) are scanned directly
+        pending = self.points[self._indexed:]
+        if len(pending):
+            distance = np.abs(pending - point)
+            distance[~np.isfinite(distance)] = np.inf
+            k = int(np.argmin(distance))
+            if distance[k] <= best_distance:
+                best, best_distance = self._indexed + k, float(distance[k])
+        if not len(self._order):
+            return best, best_distance
+
+        cells = self._cells
+        fx = (point.real - self._low.real) / self._size
+        fy = (point.imag - self._low.imag) / self._size
+        # Nothing can be closer than the grid itself
+        if np.hypot(max(-fx, fx - cells, 0), max(-fy, fy - cells, 0)) * self._size > best_distance:
+            return best, best_distance
+        cx, cy = int(np.clip(np.floor(fx), 0, cells - 1)), int(np.clip(np.floor(fy), 0, cells - 1))
+        limit = self._indexed  # Grid entries past a truncation are ignored, their indices may hold new points
+        radius = 1
+        while True:
+            x0, x1 = max(cx - radius, 0), min(cx + radius, cells - 1)
+            y0, y1 = max(cy - radius, 0), min(cy + radius, cells - 1)
+            index = self._block(x0, x1, y0, y1)
+            index = index[index < limit]
+            if len(index):
+                distance = np.abs(self.points[index] - point)
+                k = int(np.argmin(distance))
+                if distance[k] <= best_distance:
+                    best, best_distance = int(index[k]), float(distance[k])
+            # Points outside the block are at least as far as its nearest inner edge (grid edges have nothing beyond)
+            edges = [fx - x0 if x0 > 0 else np.inf, x1 + 1 - fx if x1 < cells - 1 else np.inf,
+                     fy - y0 if y0 > 0 else np.inf, y1 + 1 - fy if y1 < cells - 1 else np.inf]
+            if best_distance <= min(edges) * self._size:
+                return best, best_distance
+            radius *= 2
+
+    def _block(self, x0, x1, y0, y1):
+        """Point indices in the cells x0..x1, y0..y1."""
+        rows = np.arange(y0, y1 + 1) * self._cells
+        # Each row of the block is one contiguous run of the cell-sorted order
+        begin = self._starts[rows + x0]
+        counts = self._starts[rows + x1 + 1] - begin
+        offsets = np.repeat(begin - np.cumsum(counts) + counts, counts)
+        return self._order[offsets + np.arange(counts.sum())]
@@ -0,0 +1,118 @@
+"""Time-domain reflectometry (TDR) from swept Γ(f), by FFT.
+
+Low-pass mode needs a harmonic grid (f = Δf, 2Δf, ... N·Δf, see
+harmonic_grid): Γ at DC is extrapolated, the one-sided spectrum is windowed
+and zero-padded and transformed with a real inverse FFT, giving a real
+impulse response and, by summing it, the step response and the impedance
+profile Z(t) = Z0 (1 + ρ) / (1 - ρ). Band-pass mode takes any uniform grid
+and gives the magnitude of the (complex) impulse response only, as a VNA
+does. Impulses are scaled so that a single reflection ρ peaks at ρ.
+
+The same transform applies to S21 for time-domain transmission (TDT).
+
+A TDRTransform fixes the grid, window and FFT size, and allocates its window
+and every buffer once, so recomputing the response after an element value
+changed is a few in-place NumPy calls and one FFT of an unchanged size.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from smith_engine import SPEED_OF_LIGHT, Z0
+
+PAD_FACTOR = 4  # FFT length relative to the (two-sided) spectrum, for a smoother time trace
+PRE_TIME = 1 / 16  # Fraction of the time range shown before t = 0 (the FFT's wrapped negative times)
+KAISER_BETA = 6.0  # Kaiser window shape, a VNA's "normal" window
+STEP_LIMIT = 0.9999  # |ρ| cap of the step response, so Z(t) stays finite at a short or open
+WINDOWS = {
+    'none': np.ones,
+    'hann': np.hanning,
+    'kaiser': lambda n: np.kaiser(n, KAISER_BETA),
+}
+
+# time: s (round trip), distance: m in air (one way, divide by √εeff for a line), impulse: ρ per sample,
+# step: ρ(t), impedance: Ω (step and impedance are None in band-pass mode)
+TDRResult = namedtuple('TDRResult', ['time', 'distance', 'impulse', 'step', 'impedance'])
+
+
+def harmonic_grid(stop, points):
+    """Frequencies Δf, 2Δf, ... stop of a low-pass transform with the given number of points."""
+    return np.arange(1, points + 1) * (stop / points)
+
+
+def resample(frequencies, values, grid):
+    """Complex values interpolated linearly onto grid; outside the data they hold the end values."""
+    return np.interp(grid, frequencies, values.real) + 1j * np.interp(grid, frequencies, values.imag)
+
+
+class TDRTransform:
+    """Γ(f) on a fixed uniform grid -> TDRResult; the returned arrays are reused by the next call."""
+
+    def __init__(self, frequencies, mode='lowpass', window='kaiser', z0=Z0, pad=PAD_FACTOR):
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        n = len(self.frequencies)
+        if n < 2:
+            raise ValueError("TDR needs at least 2 frequency points")
+        df = (self.frequencies[-1] - self.frequencies[0]) / (n - 1)
+        if df <= 0 or not np.allclose(np.diff(self.frequencies), df, rtol=1e-6):
+            raise ValueError("TDR needs uniformly spaced, increasing frequencies")
+        if mode == 'lowpass' and abs(self.frequencies[0] - df) > 1e-6 * df:
+            raise ValueError("Low-pass TDR needs a harmonic grid (see harmonic_grid)")
+        if mode not in ('lowpass', 'bandpass') or window not in WINDOWS:
+            raise ValueError(f"Unknown TDR mode or window: {mode}, {window}")
+        self.mode, self.z0, self.n = mode, z0, n
+
+        if mode == 'lowpass':
+            # Right half of a symmetric window centred on DC, DC included
+            self.window = WINDOWS[window](2 * n + 1)[n:]
+            self.nfft = 1 << int(np.ceil(np.log2(pad * 2 * (n + 1))))
+            self.impulse_scale = self.nfft / (self.window[0] + 2 * self.window[1:].sum())
+            self._spectrum = np.zeros(self.nfft // 2 + 1, dtype=complex)  # Above N·Δf it stays zero
+            self._raw = np.empty(self.nfft)
+            self.step = np.empty(self.nfft)
+            self.impedance = np.empty(self.nfft)
+            self._denominator = np.empty(self.nfft)
+        else:
+            self.window = WINDOWS[window](n)
+            self.nfft = 1 << int(np.ceil(np.log2(pad * n)))
+            self.impulse_scale = self.nfft / self.window.sum()
+            self._spectrum = np.zeros(self.nfft, dtype=complex)
+            self._raw = np.empty(self.nfft, dtype=complex)
+            self._magnitude = np.empty(self.nfft)
+            self.step = self.impedance = None
+        self.impulse = np.empty(self.nfft)
+        # The response to a reflection at t = 0 spreads to both sides of it, and the FFT wraps the part before
+        # t = 0 to the end of its output: it is rotated back to the start, so the step integrates all of it
+        self.pre = int(self.nfft * PRE_TIME)
+        self.time = (np.arange(self.nfft) - self.pre) / (self.nfft * df)  # Alias-free over 1 / Δf
+        self.distance = self.time * (SPEED_OF_LIGHT / 2)
+
+    def __call__(self, gamma):
+        gamma = np.asarray(gamma, dtype=complex)
+        if gamma.shape != (self.n,):
+            raise ValueError(f"Expected {self.n} Γ values, got shape {gamma.shape}")
+        spectrum = self._spectrum
+        if self.mode == 'lowpass':
+            np.multiply(gamma, self.window[1:], out=spectrum[1:self.n + 1])
+            # Γ(DC) is real: extrapolated linearly from the first two harmonics
+            spectrum[0] = np.clip(2 * gamma[0].real - gamma[1].real, -1, 1) * self.window[0]
+            np.fft.irfft(spectrum, self.nfft, out=self._raw)
+            self.rotate(self._raw, self.step)
+            np.multiply(self.step, self.impulse_scale, out=self.impulse)
+            np.cumsum(self.step, out=self.step)
+            np.clip(self.step, -STEP_LIMIT, STEP_LIMIT, out=self._denominator)
+            np.add(1, self._denominator, out=self.impedance)
+            np.subtract(1, self._denominator, out=self._denominator)
+            np.divide(self.impedance, self._denominator, out=self.impedance)
+            self.impedance *= self.z0
+        else:
+            np.multiply(gamma, self.window, out=spectrum[:self.n])
+            np.fft.ifft(spectrum, out=self._raw)
+            self.rotate(np.abs(self._raw, out=self._magnitude), self.impulse)
+            self.impulse *= self.impulse_scale
+        return TDRResult(self.time, self.distance, self.impulse, self.step, self.impedance)
+
+    def rotate(self, source, out):
+        """FFT output reordered to start PRE_TIME before t = 0."""
+        out[:self.pre] = source[self.nfft - self.pre:]
+        out[self.pre:] = source[:self.nfft - self.pre]
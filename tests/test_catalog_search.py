@@ -0,0 +1,27 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from catalog_search import e_series_values, ladder_topologies, search
+from smith_engine import evaluate_network, impedance_to_gamma
+
+
+def test_e_series_values():
+    np.testing.assert_allclose(e_series_values('E12', 1.0, 3.3), [1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3])
+    assert len(e_series_values('E24', 1.0, 100.0)) == 49
+
+
+def test_pruned_search_matches_exhaustive_search():
+    load, frequency = 12 + 20j, np.linspace(0.8e9, 1.2e9, 5)
+    values = e_series_values('E12', 1.0, 3.3)
+    exhaustive = []
+    for topology in ladder_topologies(3):
+        for chosen in itertools.product(values, repeat=len(topology)):
+            gamma = np.abs(impedance_to_gamma(evaluate_network(load, list(zip(topology, chosen)), frequency)))
+            exhaustive.append((float(np.nan_to_num(gamma, nan=1.0).max()), list(zip(topology, chosen))))
+    expected = heapq.nsmallest(6, exhaustive, key=lambda entry: entry[0])
+    found = search(load, frequency, max_elements=3, inductor_series='E12', capacitor_series='E12',
+                   inductor_range=(1.0, 3.3), capacitor_range=(1.0, 3.3), top_k=6, workers=1)
+    np.testing.assert_allclose([match.worst_gamma for match in found], [gamma for gamma, _ in expected], rtol=1e-9)
+    assert found[0].components == expected[0][1]
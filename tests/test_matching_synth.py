@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from matching_synth import l_section, pi_network, solution_components, synthesize, t_network
+from smith_engine import evaluate_network, impedance_to_gamma
+
+LOADS = np.array([10 + 5j, 25 - 40j, 50 + 0j, 120 + 80j, 300 - 150j, 5 + 60j])
+
+
+def matched_gamma(solution, loads, frequency=1e9):
+    # Every valid solution, turned into components and evaluated, must land on z0
+    gammas = []
+    for i, load in enumerate(loads):
+        components = solution_components(solution, frequency, i)
+        if components is not None:
+            gammas.append(impedance_to_gamma(evaluate_network(load, components, frequency)))
+    return np.array(gammas)
+
+
+def test_l_sections_match():
+    solutions = l_section(LOADS)
+    assert all(np.any(np.column_stack([s.valid for s in solutions]), axis=1))  # Some L-section always exists
+    for solution in solutions:
+        np.testing.assert_allclose(np.abs(matched_gamma(solution, LOADS)), 0, atol=1e-9)
+
+
+@pytest.mark.parametrize('build', [pi_network, t_network])
+def test_pi_and_t_match(build):
+    for solution in build(LOADS, q=5):
+        assert solution.reactance.shape == (3, len(LOADS))
+        np.testing.assert_allclose(np.abs(matched_gamma(solution, LOADS)), 0, atol=1e-9)
+
+
+def test_complex_target():
+    target = 30 - 20j
+    for solution in l_section(LOADS, target=target):
+        for i, load in enumerate(LOADS):
+            components = solution_components(solution, 1e9, i)
+            if components is not None:
+                assert evaluate_network(load, components, 1e9) == pytest.approx(target)
+
+
+def test_no_solution_and_no_warnings():
+    with np.errstate(all='raise'):
+        solutions = synthesize(np.array([0j, 10j, np.nan]), q=2)
+    for solution in solutions:
+        assert not solution.valid.any()
+        assert np.isnan(solution.reactance).all()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from network import Element, Network
+from smith_engine import evaluate_network, impedance_to_gamma, physical_length
+
+
+def check(network, frequencies):
+    expected = evaluate_network(network.load, network.components(), frequencies)
+    np.testing.assert_allclose(network.sweep(frequencies), expected, rtol=1e-9)
+    points = network.points()
+    for k, element in enumerate(network):
+        assert points[k + 1] == pytest.approx(element.apply(points[k]))
+
+
+def test_edits_match_a_full_evaluation():
+    frequencies = np.linspace(0.8e9, 1.2e9, 11)
+    network = Network(20 + 30j)
+    network.append(Element("Shunt Capacitor", 2.2, 1e9))
+    network.append(Element("Series Inductor", 5.6, 1e9))
+    check(network, frequencies)
+    network.insert(1, Element("Series Line", 12.0, 1e9, 35.0, 2.2))
+    check(network, frequencies)
+    network.set_element(0, value=3.3)
+    check(network, frequencies)
+    assert network.recomputed == len(network)
+    network.set_element(2, value=4.7)
+    network.sweep(frequencies)
+    assert network.recomputed == 1  # Only the edited element and what follows it
+    network.remove(1)
+    check(network, frequencies)
+
+
+@pytest.mark.parametrize('component', ["Series Inductor", "Shunt Capacitor", "Series Line", "Shunt Open Stub",
+                                       "Shunt Short Stub"])
+def test_paths_end_at_the_next_point(component):
+    value = physical_length(120, 1e9) if "Line" in component or "Stub" in component else 3.0
+    network = Network(30 + 20j, [Element(component, value, 1e9)])
+    path = network.paths()[0]
+    assert path[-1] == pytest.approx(impedance_to_gamma(network.points()[1]))
+    assert np.abs(np.diff(path)).max() < 0.2
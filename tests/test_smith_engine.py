@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from smith_engine import (COMPONENT_TYPES, LINE_TYPES, add_series_line, add_shunt_component, apply_component,
+                          component_reactance, evaluate_network, gamma_to_impedance, impedance_to_gamma,
+                          physical_length, reactance_to_component, return_loss_db, sweep_network, vswr)
+
+
+def test_gamma_round_trip():
+    rng = np.random.default_rng(1)
+    Z = rng.uniform(0, 500, 1000) + 1j * rng.uniform(-500, 500, 1000)
+    for z0 in (50, 75):
+        np.testing.assert_allclose(gamma_to_impedance(impedance_to_gamma(Z, z0), z0), Z, rtol=1e-9, atol=1e-9)
+
+
+def test_scalars_stay_scalars():
+    assert isinstance(impedance_to_gamma(50), complex)
+    assert isinstance(gamma_to_impedance(0.2), complex)
+    assert np.shape(impedance_to_gamma(np.ones((3, 2)))) == (3, 2)
+
+
+def test_special_points():
+    assert impedance_to_gamma(50) == 0
+    assert impedance_to_gamma(0) == -1
+    assert not np.isfinite(gamma_to_impedance(1))
+    assert return_loss_db(0.1) == pytest.approx(20)
+    assert vswr(0.5) == pytest.approx(3)
+    assert np.isinf(vswr(1.0))
+
+
+def test_reactance_round_trip():
+    frequency = 1e9
+    for component, value in (("Series Inductor", 5.6), ("Shunt Capacitor", 2.2)):
+        is_inductor, back = reactance_to_component(component_reactance(component, value, frequency), frequency)
+        assert is_inductor == ("Inductor" in component) and back == pytest.approx(value)
+
+
+def test_shunt_conventions():
+    # Zero reactance adds nothing, and admittances that cancel keep the old impedance
+    assert add_shunt_component(30 + 10j, 0) == 30 + 10j
+    assert add_shunt_component(50, 100) == pytest.approx(1 / (1 / 50 - 1j / 100))
+    assert add_shunt_component(1j * 50, -50) == 1j * 50
+
+
+def test_quarter_wave_transformer():
+    length = physical_length(90, 1e9)
+    assert add_series_line(100, 50, np.pi / 2) == pytest.approx(25)
+    assert apply_component(100, "Series Line", length, 1e9, 50) == pytest.approx(25)
+    assert apply_component(100, "Shunt Short Stub", length, 1e9) == pytest.approx(100)  # A quarter wave short is open
+
+
+@pytest.mark.parametrize('component', COMPONENT_TYPES)
+def test_abcd_cascade_matches_element_by_element(component):
+    rng = np.random.default_rng(2)
+    frequency = np.linspace(0.5e9, 2e9, 7)
+    value = 20.0 if component in LINE_TYPES else 3.3
+    line = (35.0, 2.2) if component in LINE_TYPES else ()
+    components = [("Series Inductor", 4.7), (component, value) + line, ("Shunt Capacitor", 1.5)]
+    load = rng.uniform(5, 200) + 1j * rng.uniform(-100, 100)
+    Z = load
+    for name, element_value, *element_line in components:
+        Z = apply_component(Z, name, element_value, frequency, *element_line)
+    np.testing.assert_allclose(evaluate_network(load, components, frequency), Z, rtol=1e-9)
+
+
+def test_sweep_broadcasts_over_loads():
+    frequency = np.linspace(0.9e9, 1.1e9, 5)
+    loads = np.array([[20 + 5j], [80 - 40j]])
+    gamma, rl = sweep_network(loads, [("Shunt Capacitor", 2.0), ("Series Inductor", 5.0)], frequency)
+    assert gamma.shape == (2, 5)
+    np.testing.assert_allclose(rl, return_loss_db(gamma))
@@ -0,0 +1,57 @@
+import numpy as np
+
+from spatial_index import GridIndex
+
+
+def random_points(rng, n):
+    return rng.uniform(-1, 1, n) + 1j * rng.uniform(-1, 1, n)
+
+
+def brute_nearest(points, point):
+    distance = np.abs(points - point)
+    distance[~np.isfinite(distance)] = np.inf
+    return int(np.argmin(distance))
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(1)
+    points = random_points(rng, 5000)
+    index = GridIndex(points)
+    for query in random_points(rng, 200):
+        assert index.nearest(query)[0] == brute_nearest(points, query)
+
+
+def test_non_finite_points_are_skipped():
+    index = GridIndex([np.nan, 0.5 + 0j, np.inf])
+    assert index.nearest(0.4 + 0j)[0] == 1
+    assert GridIndex([np.nan]).nearest(0j) == (None, np.inf)
+
+
+def test_max_distance():
+    index = GridIndex([0j, 0.5 + 0j])
+    assert index.nearest(0.9 + 0j, 0.1) == (None, 0.1)
+    assert index.nearest(0.45 + 0j, 0.1)[0] == 1
+
+
+def test_truncate_then_extend_finds_the_new_points():
+    rng = np.random.default_rng(2)
+    index = GridIndex(random_points(rng, 2000))
+    index.nearest(0j)  # Builds the grid
+    index.truncate(1900)
+    new = random_points(rng, 100)
+    index.extend(new)
+    assert index.nearest(new[50], 0.01)[0] == 1950
+    points = index.points.copy()
+    for query in random_points(rng, 200):
+        assert index.nearest(query)[0] == brute_nearest(points, query)
+
+
+def test_repeated_edits_match_a_fresh_index():
+    rng = np.random.default_rng(3)
+    index = GridIndex(random_points(rng, 3000))
+    for _ in range(20):
+        index.nearest(0j)
+        index.truncate(int(rng.integers(0, len(index))))
+        index.extend(random_points(rng, int(rng.integers(0, 1500))))
+        for query in random_points(rng, 20):
+            assert index.nearest(query) == GridIndex(index.points).nearest(query)
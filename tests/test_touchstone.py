@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from touchstone import read_touchstone, touchstone_load
+
+S2P = """! Two-port test file
+# MHz S RI R 50
+100 0.1 0.2 3.0 0.5 0.01 0.02 0.3 -0.4
+200 0.2 0.1 2.5 0.7 0.02 0.01 0.4 -0.3
+300 0.3 0.0 2.0 0.9 0.03 0.00 0.5 -0.2
+"""
+NOISE = ["100 1.5 0.5 45 0.4", "200 1.7 0.4 60 0.5", "300 2.0 0.3 90 0.6"]
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('data_format, pair', [('RI', '0.6 -0.8'), ('MA', '1.0 -53.13010235415598'),
+                                               ('DB', '0 -53.13010235415598')])
+def test_one_port_formats(tmp_path, data_format, pair):
+    path = write(tmp_path, 'a.s1p', f"# GHz S {data_format} R 75\n1 {pair}\n2 {pair} ! comment\n")
+    data = read_touchstone(path)
+    np.testing.assert_allclose(data.frequency, [1e9, 2e9])
+    np.testing.assert_allclose(data.s, [0.6 - 0.8j] * 2, atol=1e-12)
+    assert data.z0 == 75 and data.noise is None
+
+
+def test_one_port_load_round_trip(tmp_path):
+    path = write(tmp_path, 'z.s1p', "# Hz Z RI R 50\n1e6 2 1\n")
+    frequency, load = touchstone_load(read_touchstone(path))
+    np.testing.assert_allclose(load, [100 + 50j])
+
+
+def test_chunks_do_not_change_the_result(tmp_path):
+    rows = '\n'.join(f'{f} {0.001 * f} {-f}' for f in range(1, 500))
+    path = write(tmp_path, 'c.s1p', "# MHz S MA R 50\n" + rows + "\n")
+    whole = read_touchstone(path)
+    np.testing.assert_array_equal(read_touchstone(path, chunk_bytes=64).s, whole.s)
+    assert len(whole.frequency) == 499
+
+
+def test_two_port_order(tmp_path):
+    data = read_touchstone(write(tmp_path, 'a.s2p', S2P))
+    assert data.s.shape == (3, 2, 2) and data.noise is None
+    # The file lists S11 S21 S12 S22
+    assert data.s[0, 1, 0] == 3.0 + 0.5j and data.s[0, 0, 1] == 0.01 + 0.02j
+
+
+@pytest.mark.parametrize('lines', [1, 2, 3])
+def test_noise_block_of_any_length(tmp_path, lines):
+    data = read_touchstone(write(tmp_path, 'n.s2p', S2P + '\n'.join(NOISE[:lines]) + '\n'))
+    assert data.s.shape == (3, 2, 2)
+    np.testing.assert_allclose(data.noise.frequency, [100e6, 200e6, 300e6][:lines])
+    np.testing.assert_allclose(data.noise.rn, [20, 25, 30][:lines])
+    np.testing.assert_allclose(data.noise.gamma_opt[0], 0.5 * np.exp(1j * np.pi / 4))
+
+
+def test_incomplete_record(tmp_path):
+    with pytest.raises(ValueError, match='incomplete record'):
+        read_touchstone(write(tmp_path, 'bad.s1p', "# GHz S RI\n1 0.5 0.5\n2 0.5\n"))
@@ -0,0 +1,181 @@
+"""Monte Carlo tolerance analysis of a matching network.
+
+Draws perturbed copies of a network (every L/C value or line length off by
+up to its tolerance, the load off by up to a fraction of its magnitude) and evaluates
+them vectorized across a frequency band, a chunk of samples at a time so
+memory stays bounded by BATCH_VALUES however many samples are drawn.
+Nothing is kept per sample: worst-case return loss and VSWR go into
+fixed-bin streaming histograms (percentiles are read off their cumulative
+counts), and the trajectory points of every sample go into a 2-D density
+grid over the Γ plane that the GUI draws as a cloud.
+
+Element values and load perturbations come from two independent streams of
+one seeded generator, so a seed gives the same result whatever the chunk size.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from smith_engine import (Z0, add_series_line, component_reactance, electrical_length, impedance_to_gamma,
+                          return_loss_db, vswr)
+
+BATCH_VALUES = 2_000_000  # Complex values per chunk (samples x frequencies), about 32 MB
+DENSITY_BINS = 200  # Density grid resolution over -1 <= Γ <= 1 on both axes
+
+# samples drawn, frequency (Hz), worst-case return loss and VSWR histograms, return loss percentiles
+# per frequency {q: array}, passed = samples meeting spec_db everywhere, density (points, bins, bins)
+ToleranceResult = namedtuple('ToleranceResult', ['samples', 'frequency', 'return_loss', 'vswr', 'band_percentiles',
+                                                 'spec_db', 'passed', 'density'])
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram that accumulates chunks of values; values outside the range land in the end bins."""
+
+    def __init__(self, low, high, bins, log=False):
+        self.log = log
+        self.low, self.high = (np.log10(low), np.log10(high)) if log else (low, high)
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    @property
+    def edges(self):
+        edges = np.linspace(self.low, self.high, self.bins + 1)
+        return 10 ** edges if self.log else edges
+
+    def bin_index(self, values):
+        values = np.asarray(values, dtype=float)
+        if self.log:
+            with np.errstate(divide='ignore'):
+                values = np.log10(values)
+        # NaN (a network that shorted out) counts as the worst end, which is the top bin for VSWR
+        values = np.nan_to_num(values, nan=self.high, posinf=self.high, neginf=self.low)
+        index = ((values - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        return np.clip(index, 0, self.bins - 1)
+
+    def add(self, values):
+        self.counts += np.bincount(self.bin_index(values).ravel(), minlength=self.bins)
+
+    def percentile(self, q):
+        """Value below which q percent of the samples fall, interpolated within the bin."""
+        return histogram_percentile(self.counts, self.edges, q)
+
+
+def histogram_percentile(counts, edges, q):
+    """Percentile q (0-100) of a histogram given its counts and bin edges, interpolated linearly within a bin."""
+    cumulative = np.cumsum(counts)
+    if not cumulative[-1]:
+        return np.nan
+    target = q / 100 * cumulative[-1]
+    i = min(int(np.searchsorted(cumulative, target)), len(counts) - 1)
+    below = cumulative[i - 1] if i else 0
+    fraction = (target - below) / counts[i] if counts[i] else 0.0
+    return float(edges[i] + fraction * (edges[i + 1] - edges[i]))
+
+
+def deviation(rng, size, distribution):
+    """Relative deviations: uniform in [-1, 1], or normal with 1 as 3 sigma."""
+    if distribution == 'uniform':
+        return rng.uniform(-1, 1, size)
+    if distribution == 'normal':
+        return rng.standard_normal(size) / 3
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+def add_shunt(Z, reactance):
+    """Shunt element for the sample loop: Z / (1 + YZ) is one multiply-add and one divide.
+
+    Matches smith_engine.add_shunt_component except where the admittances cancel exactly,
+    which gives an open circuit here (|Γ| = 1) instead of keeping the old impedance.
+    """
+    Y = np.divide(-1j, reactance, out=np.zeros(reactance.shape, dtype=complex), where=reactance != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return Z / (1 + Y * Z)
+
+
+def monte_carlo(load, elements, frequency, samples=1_000_000, tolerance=0.05, load_tolerance=0.0,
+                distribution='uniform', spec_db=10.0, seed=None, z0=Z0, percentiles=(5, 50, 95)):
+    """Monte Carlo return loss statistics of a network across a band.
+
+    load is a complex impedance or an array over frequency (Hz). elements are network.Element objects
+    (anything with component, value, frequency, line_impedance and eeff) ordered from the load. tolerance is one fraction
+    for every element or one per element (0.05 for ±5%); load_tolerance moves R and X independently
+    by up to that fraction of |Z_load|. Returns a ToleranceResult.
+    """
+    frequency = np.atleast_1d(np.asarray(frequency, dtype=float))
+    load = np.broadcast_to(np.asarray(load, dtype=complex), frequency.shape)
+    components = [element.component for element in elements]
+    lines = [(element.line_impedance, element.eeff) for element in elements]
+    nominal = np.array([element.value for element in elements], dtype=float)
+    design_frequency = np.array([element.frequency for element in elements], dtype=float)
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=float), nominal.shape)
+    # The trajectory starts from the load at the first element's frequency (the band center without elements)
+    point_frequency = design_frequency[0] if len(elements) else frequency.mean()
+    load_point = complex(np.interp(point_frequency, frequency, load.real),
+                         np.interp(point_frequency, frequency, load.imag))
+
+    element_rng, load_rng = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2)]
+    return_loss = StreamingHistogram(0.0, 60.0, 600)
+    worst_vswr = StreamingHistogram(1.0, 100.0, 600, log=True)
+    band = StreamingHistogram(0.0, 60.0, 120)
+    band_counts = np.zeros((len(frequency), band.bins), dtype=np.int64)
+    density = np.zeros((len(elements) + 1, DENSITY_BINS, DENSITY_BINS), dtype=np.int64)
+    passed = 0
+
+    chunk = max(1, BATCH_VALUES // len(frequency))
+    for start in range(0, samples, chunk):
+        n = min(chunk, samples - start)
+        values = nominal * (1 + tolerance * deviation(element_rng, (n, len(nominal)), distribution))
+        offset = abs(load_point) * load_tolerance * (deviation(load_rng, (n, 2), distribution) @ [1, 1j])
+        Z = load[None, :] + offset[:, None]  # (n, nf)
+        point = load_point + offset  # (n,) trajectory point at each element's own frequency
+        add_density(density[0], impedance_to_gamma(point, z0))
+        for k, component in enumerate(components):
+            line_impedance, eeff = lines[k]
+            if component == "Series Line":  # Only the length varies, not the line impedance
+                Z = add_series_line(Z, line_impedance, electrical_length(values[:, k, None], frequency[None, :], eeff))
+                point = add_series_line(point, line_impedance, electrical_length(values[:, k], design_frequency[k], eeff))
+                add_density(density[k + 1], impedance_to_gamma(point, z0))
+                continue
+            band_reactance = component_reactance(component, values[:, k, None], frequency[None, :], line_impedance, eeff)
+            point_reactance = component_reactance(component, values[:, k], design_frequency[k], line_impedance, eeff)
+            if "Series" in component:
+                Z = Z + 1j * band_reactance
+                point = point + 1j * point_reactance
+            else:
+                Z = add_shunt(Z, band_reactance)
+                point = add_shunt(point, point_reactance)
+            add_density(density[k + 1], impedance_to_gamma(point, z0))
+
+        gamma = np.abs(impedance_to_gamma(Z, z0))
+        gamma[np.isnan(gamma)] = 1.0  # NaN results count as total reflection
+        rl = return_loss_db(gamma)  # (n, nf)
+        worst = rl.min(axis=1)
+        return_loss.add(worst)
+        worst_vswr.add(vswr(gamma.max(axis=1)))
+        passed += int((worst >= spec_db).sum())
+        # Per-frequency histograms in one bincount: frequency index * bins + bin
+        index = band.bin_index(rl) + np.arange(len(frequency))[None, :] * band.bins
+        band_counts += np.bincount(index.ravel(), minlength=band_counts.size).reshape(band_counts.shape)
+
+    band_percentiles = {q: np.array([histogram_percentile(counts, band.edges, q) for counts in band_counts])
+                        for q in percentiles}
+    return ToleranceResult(samples, frequency, return_loss, worst_vswr, band_percentiles, spec_db, passed, density)
+
+
+def add_density(grid, gamma):
+    """Accumulate Γ values into a (bins, bins) grid over the unit square, indexed [y, x]."""
+    gamma = gamma[np.isfinite(gamma)]
+    bins = grid.shape[0]
+    ix = np.clip(((gamma.real + 1) * (bins / 2)).astype(np.int64), 0, bins - 1)
+    iy = np.clip(((gamma.imag + 1) * (bins / 2)).astype(np.int64), 0, bins - 1)
+    grid += np.bincount(iy * bins + ix, minlength=bins * bins).reshape(bins, bins)
+
+
+def summary(result, percentiles=(5, 50, 95)):
+    """One-line text summary: yield against the spec and worst-case return loss / VSWR percentiles."""
+    rl = '/'.join(f'{result.return_loss.percentile(q):.1f}' for q in percentiles)
+    # Low return loss is the bad tail, so the VSWR percentiles are taken from the other end
+    swr = '/'.join(f'{result.vswr.percentile(100 - q):.2f}' for q in percentiles)
+    names = '/'.join(f'P{q}' for q in percentiles)
+    return (f'Yield (RL ≥ {result.spec_db:g} dB): {100 * result.passed / result.samples:.1f}%, '
+            f'worst RL {names} {rl} dB, VSWR {swr}')
@@ -0,0 +1,140 @@
+"""Streaming Touchstone (.s1p/.s2p) reader.
+
+The data section is memory-mapped and parsed chunk by chunk with NumPy's C
+number parser, so files with hundreds of thousands of frequency points load
+into compact complex128 arrays without building a Python object per line.
+Only the Touchstone 1.x layout is supported (the `#` option line plus
+whitespace separated data, `!` comments anywhere). Two-port noise parameters
+after the S-parameters are read into TouchstoneData.noise.
+"""
+import mmap
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from smith_engine import gamma_to_impedance
+
+# frequency: Hz (n,), s: complex128 (n,) for one-port or (n, 2, 2) for two-port, z0: reference resistance,
+# noise: NoiseData of a two-port file with a noise parameter section, else None
+TouchstoneData = namedtuple('TouchstoneData', ['frequency', 's', 'z0', 'noise'], defaults=(None,))
+# frequency: Hz (m,), nf_min_db: minimum noise figure (dB), gamma_opt: complex, rn: noise resistance (Ω)
+NoiseData = namedtuple('NoiseData', ['frequency', 'nf_min_db', 'gamma_opt', 'rn'])
+NOISE_RECORD = 5  # Frequency, NFmin (dB), |Γopt|, ∠Γopt (degrees), Rn / z0
+
+FREQUENCY_UNITS = {'HZ': 1.0, 'KHZ': 1e3, 'MHZ': 1e6, 'GHZ': 1e9}
+CHUNK_BYTES = 16 * 1024 * 1024  # Parse the data section 16 MB at a time
+COMMENT_RE = re.compile(rb'![^\n]*')
+
+
+def parse_option_line(line):
+    """Parse a `# <unit> <parameter> <format> R <z0>` option line into (scale, parameter, format, z0)."""
+    scale, parameter, data_format, z0 = 1e9, 'S', 'MA', 50.0  # Touchstone defaults: GHz S MA R 50
+    tokens = line.lstrip('#').upper().split()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in FREQUENCY_UNITS:
+            scale = FREQUENCY_UNITS[token]
+        elif token in ('S', 'Y', 'Z', 'G', 'H'):
+            parameter = token
+        elif token in ('RI', 'MA', 'DB'):
+            data_format = token
+        elif token == 'R' and i + 1 < len(tokens):
+            z0 = float(tokens[i + 1])
+            i += 1
+        else:
+            raise ValueError(f"Unknown token in Touchstone option line: {token}")
+        i += 1
+    return scale, parameter, data_format, z0
+
+
+def pairs_to_complex(a, b, data_format):
+    """Convert RI/MA/DB number pairs to complex values (angles are in degrees)."""
+    if data_format == 'RI':
+        return a + 1j * b
+    magnitude = a if data_format == 'MA' else 10 ** (a / 20)
+    return magnitude * np.exp(1j * np.deg2rad(b))
+
+
+def read_touchstone(path, chunk_bytes=CHUNK_BYTES):
+    """Read a .s1p or .s2p file and return a TouchstoneData tuple."""
+    ports = 2 if str(path).lower().endswith('.s2p') else 1
+    record = 1 + 2 * ports * ports  # Frequency plus a number pair per parameter
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # Header: comments and the option line, up to the first line holding numbers
+        options = None
+        position = 0
+        while position < len(data):
+            end = data.find(b'\n', position)
+            end = len(data) if end == -1 else end + 1
+            line = data[position:end].split(b'!', 1)[0].strip()
+            if line.startswith(b'#'):
+                if options is None:  # Only the first option line counts
+                    options = parse_option_line(line.decode('ascii'))
+            elif line.startswith(b'['):
+                raise ValueError("Touchstone 2.0 keyword files are not supported")
+            elif line:
+                break
+            position = end
+        scale, parameter, data_format, z0 = options or parse_option_line('#')
+        if parameter != 'S' and ports != 1:
+            raise ValueError(f"Only S-parameters are supported for two-port files, got {parameter}")
+
+        # Data: parse whole chunks, cutting at a newline and carrying incomplete records over
+        chunks = []
+        carry = np.empty(0)
+        while position < len(data):
+            end = min(position + chunk_bytes, len(data))
+            if end < len(data):
+                newline = data.rfind(b'\n', position, end)
+                end = newline + 1 if newline >= position else data.find(b'\n', end) + 1 or len(data)
+            text = data[position:end]
+            if b'!' in text:
+                text = COMMENT_RE.sub(b'', text)
+            values = np.fromstring(text, dtype=float, sep=' ')
+            if carry.size:
+                values = np.concatenate([carry, values])
+            complete = values.size - values.size % record
+            carry = values[complete:]
+            if complete:
+                chunks.append(values[:complete].reshape(-1, record))
+            position = end
+
+    table = np.concatenate(chunks) if chunks else np.empty((0, record))
+    noise = None
+    if ports == 2:
+        # Noise parameters follow the S-parameters, from the first frequency that does not increase. The
+        # restart is looked for in the flat values, since a noise block may be shorter than one S-parameter row
+        values = np.concatenate([table.ravel(), carry])
+        restart = np.flatnonzero(np.diff(values[::record]) <= 0)
+        if restart.size:
+            start = (restart[0] + 1) * record
+            table, values = values[:start].reshape(-1, record), values[start:]
+            complete = values.size - values.size % NOISE_RECORD
+            values, carry = values[:complete].reshape(-1, NOISE_RECORD), values[complete:]
+            noise = NoiseData(values[:, 0] * scale, values[:, 1], pairs_to_complex(values[:, 2], values[:, 3], 'MA'),
+                              values[:, 4] * z0)
+    if carry.size:
+        raise ValueError(f"Touchstone data ends with an incomplete record ({carry.size} values)")
+
+    frequency = table[:, 0] * scale
+    s = pairs_to_complex(table[:, 1::2], table[:, 2::2], data_format)
+    if ports == 1:
+        s = s[:, 0]
+        if parameter == 'Z':  # One-port Z/Y data is normalized to R, convert to reflection coefficient
+            s = (s - 1) / (s + 1)
+        elif parameter == 'Y':
+            s = (1 - s) / (1 + s)
+        elif parameter != 'S':
+            raise ValueError(f"Unsupported one-port parameter type: {parameter}")
+    else:
+        # Two-port files list S11 S21 S12 S22, so transpose into the usual [[S11, S12], [S21, S22]]
+        s = s.reshape(-1, 2, 2).transpose(0, 2, 1)
+    return TouchstoneData(frequency, np.ascontiguousarray(s, dtype=np.complex128), z0, noise)
+
+
+def touchstone_load(data):
+    """Frequency-dependent load impedance (port 1 reflection) from Touchstone data."""
+    s11 = data.s if data.s.ndim == 1 else data.s[:, 0, 0]
+    return data.frequency, gamma_to_impedance(s11, data.z0)
@@ -0,0 +1,89 @@
+"""Two-port amplifier design circles from S-parameters and noise parameters.
+
+Every function is vectorized over frequency: S is (n, 2, 2) as read by
+touchstone.read_touchstone, and the circle functions take levels of shape
+(m,) (or anything broadcasting against (n, m)) and return (center, radius)
+arrays of shape (n, m), so tens of circles at thousands of frequencies are a
+handful of array operations.
+
+Source plane circles (stability, available gain, noise) are loci of Γ_S,
+load plane circles of Γ_L, all normalized to the S-parameter reference z0.
+A circle that does not exist at a frequency (a gain above the maximum, a
+noise figure below NFmin) has a NaN radius.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from smith_engine import Z0
+
+# center: complex, radius: float, both (n,) for stability circles
+StabilityCircles = namedtuple('StabilityCircles', ['source_center', 'source_radius', 'load_center', 'load_radius'])
+
+
+def determinant(S):
+    """Δ = S11 S22 - S12 S21 at every frequency."""
+    return S[:, 0, 0] * S[:, 1, 1] - S[:, 0, 1] * S[:, 1, 0]
+
+
+def rollett_k(S):
+    """Rollett stability factor K; K > 1 and |Δ| < 1 is unconditional stability."""
+    delta = determinant(S)
+    with np.errstate(divide='ignore'):
+        return (1 - np.abs(S[:, 0, 0]) ** 2 - np.abs(S[:, 1, 1]) ** 2 + np.abs(delta) ** 2) / (
+            2 * np.abs(S[:, 0, 1] * S[:, 1, 0]))
+
+
+def mu_factor(S):
+    """Edwards-Sinsky μ (load side); μ > 1 alone is unconditional stability."""
+    delta = determinant(S)
+    return (1 - np.abs(S[:, 0, 0]) ** 2) / (np.abs(S[:, 1, 1] - delta * np.conj(S[:, 0, 0]))
+                                            + np.abs(S[:, 0, 1] * S[:, 1, 0]))
+
+
+def max_gain_db(S):
+    """Maximum available gain where K > 1, maximum stable gain |S21 / S12| elsewhere (dB)."""
+    k = rollett_k(S)
+    ratio = np.abs(S[:, 1, 0] / S[:, 0, 1])
+    with np.errstate(invalid='ignore'):
+        gain = np.where(k > 1, ratio * (k - np.sqrt(np.maximum(k ** 2 - 1, 0))), ratio)
+    return 10 * np.log10(gain)
+
+
+def stability_circles(S):
+    """Source and load plane stability circles (|Γ_in| = 1 and |Γ_out| = 1) at every frequency."""
+    delta = determinant(S)
+    s11, s22 = S[:, 0, 0], S[:, 1, 1]
+    product = np.abs(S[:, 0, 1] * S[:, 1, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        source_denominator = np.abs(s11) ** 2 - np.abs(delta) ** 2
+        load_denominator = np.abs(s22) ** 2 - np.abs(delta) ** 2
+        return StabilityCircles(np.conj(s11 - delta * np.conj(s22)) / source_denominator,
+                                product / np.abs(source_denominator),
+                                np.conj(s22 - delta * np.conj(s11)) / load_denominator,
+                                product / np.abs(load_denominator))
+
+
+def available_gain_circles(S, gains_db):
+    """Source plane circles of constant available gain G_A (dB), shape (n, m)."""
+    delta = determinant(S)[:, None]
+    s11, s22 = S[:, 0, 0, None], S[:, 1, 1, None]
+    product = np.abs(S[:, 0, 1] * S[:, 1, 0])[:, None]
+    k = rollett_k(S)[:, None]
+    g = 10 ** (np.asarray(gains_db, dtype=float) / 10) / np.abs(S[:, 1, 0, None]) ** 2  # Normalized gain
+    denominator = 1 + g * (np.abs(s11) ** 2 - np.abs(delta) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = g * np.conj(s11 - delta * np.conj(s22)) / denominator
+        radius = np.sqrt(1 - 2 * k * product * g + (product * g) ** 2) / np.abs(denominator)
+    return center, radius
+
+
+def noise_circles(nf_min_db, gamma_opt, rn, nf_db, z0=Z0):
+    """Source plane circles of constant noise figure nf_db, from NFmin (dB), Γopt and Rn (Ω), each (n,)."""
+    f_min = 10 ** (np.asarray(nf_min_db, dtype=float)[:, None] / 10)
+    gamma_opt = np.asarray(gamma_opt, dtype=complex)[:, None]
+    f = 10 ** (np.asarray(nf_db, dtype=float) / 10)
+    n = (f - f_min) / (4 * np.asarray(rn, dtype=float)[:, None] / z0) * np.abs(1 + gamma_opt) ** 2
+    with np.errstate(invalid='ignore'):
+        radius = np.sqrt(n * (n + 1 - np.abs(gamma_opt) ** 2)) / (1 + n)
+    return gamma_opt / (1 + n), np.where(n >= 0, radius, np.nan)